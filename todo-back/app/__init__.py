@@ -1,23 +1,31 @@
 from loguru import logger
-import sys
-from app.config import get_settings
-
-settings = get_settings()
-
-logger.remove()
-logger.add(
-    sink=sys.stdout,
-    level="INFO",
-    colorize=True,
-    format="{time:DD.MM.YY — HH:mm:ss} | <level>{level}</level> | <yellow>{file}</yellow> : <cyan>{line}</cyan> | {message}",
-)
-logger.add(
-    "logs.log",
-    rotation="10 MB",
-    retention="2 days",
-    compression="zip",
-    level="INFO",
-    format="{time:DD.MM.YY — HH:mm:ss} | {level} | {file}:{line} | {message}",
-)
-
-__all__ = ["logger", "settings"]
\ No newline at end of file
+
+
+class _LazySettings:
+    """
+    Stands in for the Settings instance. The env file is read and validated on first attribute
+    access rather than on import, so `from app import settings` at the top of a module costs
+    nothing, the password hashing workers never load it, and a missing setting fails where it
+    is first used. Assignments (benchmarks, scripts) go to the real instance.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        from app.config import get_settings
+
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        from app.config import get_settings
+
+        setattr(get_settings(), name, value)
+
+    def __repr__(self) -> str:
+        return "<settings, loaded on first use>"
+
+
+settings = _LazySettings()
+
+
+__all__ = ["logger", "settings"]
@@ -0,0 +1,227 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.config import Settings
+from app.metrics import ADMISSION_IN_FLIGHT, ADMISSION_SHED, ADMISSION_WAIT, REGISTRY
+
+
+ROUTE_CLASSES = ("read", "list", "export", "write", "auth")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """
+    Admission class of a request, by what it costs: `read` a single task or the counter,
+    `list` pages of listings, queries and search, `export` the export and the full task dump,
+    which hold their slot for the whole download, `write` task changes, `auth` bcrypt work
+    (login, new admins). Exports get their own slots so that a few downloads neither take the
+    page requests' slots nor skew their service time. None for CORS preflights, the change
+    feed, whose clients stay connected and are capped by the broker, and metrics scrapes:
+    those are never shed.
+    """
+    if method == "OPTIONS" or path.startswith("/tasks/events") or path == "/metrics":
+        return None
+    if method == "POST" and path in ("/admins/auth", "/admins/"):
+        return "auth"
+    if method in ("GET", "HEAD"):
+        if path.startswith("/task/") or path == "/tasks/length":
+            return "read"
+        if path in ("/tasks", "/tasks/export"):
+            return "export"
+        return "list"
+    return "write"
+
+
+class ClassLimiter:
+    """
+    At most `limit` requests of a class at once and `queue_size` waiting, FIFO. A request that
+    would wait longer than `max_wait` seconds is refused up front, judged from the queue ahead
+    of it and the class's recent service time (an exponential moving average), instead of
+    holding a connection only to time out; one that waits out `max_wait` is refused too.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, max_wait: float):
+        if limit < 1:
+            raise ValueError(f"Admission limit of {name!r} must be at least 1, got {limit}")
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.service_time = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def expected_wait(self) -> float:
+        """Seconds a request arriving now would likely queue."""
+        return (len(self._waiters) // self.limit + 1) * self.service_time
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns why the request is refused instead, if it is."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._report()
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+        if self.expected_wait() > self.max_wait:
+            return "deadline"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            return "timeout"
+        except asyncio.CancelledError:
+            # The client went away; a slot handed over in the meantime goes to the next one
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            self._forget(waiter)
+            raise
+        if REGISTRY.enabled:
+            ADMISSION_WAIT.observe(time.perf_counter() - started, self.name)
+        return None
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the longest waiting request if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+        self._report()
+
+    def observe(self, seconds: float) -> None:
+        self.service_time = seconds if not self.service_time else 0.8 * self.service_time + 0.2 * seconds
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _report(self) -> None:
+        if REGISTRY.enabled:
+            ADMISSION_IN_FLIGHT.set(self.active, self.name)
+
+
+class TokenBuckets:
+    """
+    Per-client token buckets: `burst` requests at once, refilled at `rate` per second.
+    Only the `max_clients` most recently seen clients are tracked; a forgotten one comes back
+    with a full bucket, which is what it would have after being idle anyway.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def take(self, client: str) -> float:
+        """Take a token; returns 0 if there was one, otherwise seconds until there is."""
+        now = time.monotonic()
+        tokens, stamp = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def _refusal(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _per_class(config: Settings, field: str, name: str):
+    """A class's value of a per-class setting; classes the environment leaves out keep the default."""
+    value = getattr(config, field).get(name)
+    return Settings.model_fields[field].default[name] if value is None else value
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware shedding load before it reaches the handlers: a request over its client's
+    rate gets 429, one that cannot start within its class's deadline gets 503, both with
+    Retry-After. Expensive classes queue separately, so a spike of listings or logins leaves
+    single-task reads their own slots. Only installed when admission control is enabled.
+    """
+
+    def __init__(self, app, config: Settings):
+        self.app = app
+        self.limiters: Dict[str, ClassLimiter] = {
+            name: ClassLimiter(
+                name,
+                limit=_per_class(config, "admission_limits", name),
+                queue_size=_per_class(config, "admission_queue", name),
+                max_wait=_per_class(config, "admission_max_wait_ms", name) / 1000,
+            )
+            for name in ROUTE_CLASSES
+        }
+        self.buckets = None
+        if config.admission_client_rate > 0:
+            self.buckets = TokenBuckets(config.admission_client_rate, config.admission_client_burst)
+        self.client_header = config.admission_client_header
+
+    def _client(self, scope) -> str:
+        if self.client_header:
+            value = Headers(scope=scope).get(self.client_header)
+            if value:
+                return value.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = route_class(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        if self.buckets is not None:
+            wait = self.buckets.take(self._client(scope))
+            if wait:
+                if REGISTRY.enabled:
+                    ADMISSION_SHED.inc(name, "rate_limited")
+                await _refusal(429, "Too many requests, retry later", wait)(scope, receive, send)
+                return
+        limiter = self.limiters[name]
+        reason = await limiter.acquire()
+        if reason is not None:
+            if REGISTRY.enabled:
+                ADMISSION_SHED.inc(name, reason)
+            retry_after = max(limiter.expected_wait(), limiter.max_wait)
+            await _refusal(503, "Server is busy, retry later", retry_after)(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.observe(time.perf_counter() - started)
+            limiter.release()
+
+
+__all__ = [
+    "ROUTE_CLASSES",
+    "AdmissionMiddleware",
+    "ClassLimiter",
+    "TokenBuckets",
+    "route_class",
+]
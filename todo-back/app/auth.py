@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import jwt
+
+from app.models import Admin
+from app import settings
+
+
+def create_access_token(admin: Admin) -> str:
+    """Signed token naming the admin by id, with issue time and expiry."""
+    issued_at = int(time.time())
+    payload = {
+        "sub": admin.id,
+        "name": admin.username,
+        "iat": issued_at,
+        "exp": issued_at + settings.jwt_access_token_expire_minutes * 60,
+    }
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+
+def decode_access_token(token: str) -> dict:
+    """Verify signature and expiry; raises jwt.InvalidTokenError on any problem."""
+    return jwt.decode(
+        token,
+        settings.jwt_secret_key,
+        algorithms=[settings.jwt_algorithm],
+        options={"require": ["sub", "iat", "exp"]},
+    )
+
+
+class PrincipalCache:
+    """
+    Small per-process cache of verified admins keyed by id, so an authenticated request
+    doesn't need a database lookup. Entries live `ttl` seconds: that bounds how long another
+    worker may keep accepting a deleted admin. In this process, `revoke` takes effect at once
+    and is remembered until every token issued before it has expired.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._admins: "OrderedDict[str, Tuple[Admin, float]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+
+    def get(self, admin_id: str) -> Optional[Admin]:
+        entry = self._admins.get(admin_id)
+        if entry is None:
+            return None
+        admin, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._admins[admin_id]
+            return None
+        self._admins.move_to_end(admin_id)
+        return admin
+
+    def put(self, admin: Admin) -> None:
+        if self.is_revoked(admin.id):
+            return
+        self._admins[admin.id] = (admin, time.monotonic() + self.ttl)
+        self._admins.move_to_end(admin.id)
+        while len(self._admins) > self.max_size:
+            self._admins.popitem(last=False)
+
+    def revoke(self, admin_id: str) -> None:
+        self._admins.pop(admin_id, None)
+        # After one token lifetime every token issued before the revocation has expired
+        now = time.time()
+        lifetime = settings.jwt_access_token_expire_minutes * 60
+        self._revoked = {
+            key: revoked_at for key, revoked_at in self._revoked.items() if revoked_at + lifetime > now
+        }
+        self._revoked[admin_id] = now
+
+    def is_revoked(self, admin_id: str) -> bool:
+        return admin_id in self._revoked
+
+
+__all__ = ["create_access_token", "decode_access_token", "PrincipalCache"]
@@ -0,0 +1,141 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.database import AsyncDatabaseAPI
+from app.models import Task
+from app.replicas import mark_write
+from app import logger
+
+
+DURABILITY_MODES = ("commit", "enqueue")
+
+_STOP = None
+
+
+class BatchedDatabaseAPI:
+    """
+    Group commit for task creation: `create_task` calls are queued and a single writer coroutine
+    inserts them in batches of up to `batch_size`, one transaction per batch, so concurrent
+    requests no longer take SQLite's write lock one row at a time.
+    A batch is written as soon as it is full, or `max_delay` seconds after its first task;
+    tasks arriving while a batch commits form the next one.
+    With durability "commit" every caller gets its task back once its batch is committed, as
+    without batching. With "enqueue" the task (its id is generated up front) is returned as soon
+    as it is queued: lowest latency, but tasks still queued are lost if the process dies, and
+    failures are only logged. Other methods are passed straight to the wrapped API.
+    """
+
+    def __init__(
+        self,
+        db: AsyncDatabaseAPI,
+        batch_size: int,
+        max_delay: float,
+        max_pending: int,
+        durability: str = "commit",
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.db = db
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.durability = durability
+        # A full queue makes creators wait for the writer instead of growing without bound
+        self._queue: "asyncio.Queue[Optional[Tuple[Task, Optional[asyncio.Future]]]]" = (
+            asyncio.Queue(maxsize=max_pending)
+        )
+        self._writer: Optional[asyncio.Task] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.db, name)
+
+    def start(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Write out everything queued, then stop the writer."""
+        if self._writer is not None:
+            await self._queue.put(_STOP)
+            await self._writer
+            self._writer = None
+
+    async def create_task(self, task: Task) -> Task:
+        if self._writer is None:
+            return await self.db.create_task(task)
+        # The batch commits in the writer's context, which is not this request's
+        mark_write()
+        if self.durability == "enqueue":
+            await self._queue.put((task, None))
+            return task
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((task, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+        # Anything queued behind the stop marker is still written
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                await self._flush([item])
+
+    async def _flush(self, batch: List[Tuple[Task, Optional[asyncio.Future]]]) -> None:
+        try:
+            await self.db.create_tasks([task for task, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _resolve(batch[0], error=e)
+                return
+            # One bad row must not fail the rest: retry each task in its own transaction
+            logger.warning("Batch of {} tasks failed, retrying one by one: {}", len(batch), e)
+            for entry in batch:
+                try:
+                    await self.db.create_task(entry[0])
+                except Exception as error:
+                    _resolve(entry, error=error)
+                else:
+                    _resolve(entry)
+            return
+        for entry in batch:
+            _resolve(entry)
+
+
+def _resolve(entry: Tuple[Task, Optional[asyncio.Future]], error: Optional[Exception] = None) -> None:
+    task, future = entry
+    if future is None:
+        if error is not None:
+            logger.error("Queued task {} was not saved: {}", task.id, error)
+        return
+    if future.done():
+        # The caller went away (request cancelled); the task is saved regardless
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(task)
+
+
+__all__ = ["BatchedDatabaseAPI", "DURABILITY_MODES"]
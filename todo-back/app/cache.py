@@ -0,0 +1,381 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app import logger
+from app.database import AsyncDatabaseAPI
+from app.models import Task
+from app.config import Settings
+from app.metrics import record_cache
+from app.replicas import primary_reads, reads_from_primary
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached values. Values are bytes with a TTL and may be evicted at any time;
+    counters are never evicted, since they carry the version that invalidates list entries.
+    `shared` backends are seen by every worker, so their counters are global.
+    """
+
+    shared: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache bounded by total value size in bytes, with per-entry TTL."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._pop(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._pop(key)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis-backed cache shared by all workers. Size limits and LRU eviction are Redis' job
+    (`maxmemory` with an `allkeys-lru` policy).
+    """
+
+    shared = True
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("Redis cache backend requires the 'redis' package")
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_cache_backend(config: Settings) -> CacheBackend:
+    if config.cache_backend == "memory":
+        return MemoryCacheBackend(max_bytes=config.cache_max_bytes)
+    if config.cache_backend == "redis":
+        return RedisCacheBackend(config.cache_url)
+    raise ValueError(f"Unknown cache backend: {config.cache_backend}")
+
+
+def _dump_tasks(tasks: Sequence[Task]) -> bytes:
+    return json.dumps([task.model_dump() for task in tasks], separators=(",", ":")).encode()
+
+
+def _load_tasks(value: bytes) -> List[Task]:
+    return [Task(**data) for data in json.loads(value)]
+
+
+def _dump_rows(rows: Sequence[dict]) -> bytes:
+    return json.dumps(rows, separators=(",", ":")).encode()
+
+
+def _query_params(filters, sort, fields, offset, limit, after) -> tuple:
+    """Cache key parts of a task query, JSON-serializable and independent of argument order."""
+    return (
+        sorted((filters or {}).items()),
+        list(sort),
+        list(fields) if fields is not None else None,
+        offset,
+        limit,
+        list(after) if after is not None else None,
+    )
+
+
+class CachedDatabaseAPI:
+    """
+    Read-through cache around AsyncDatabaseAPI.
+    Listing pages are keyed on the query parameters plus a task table version that every write bumps,
+    so a write invalidates all pages at once; single tasks are keyed by id and dropped when that task
+    changes. Methods that aren't cached are passed straight to the wrapped API.
+    With read replicas, a write's version reaches every reader at once but the write itself
+    reaches the replicas later. Requests pinned to the primary after a write bypass the cache,
+    and for `primary_window` seconds after a version first shows up, entries are filled from
+    the primary: filled from a lagging replica, a stale page would be stored under the new
+    version and served (and validated by its ETag) for the whole TTL.
+    While the backend fails (e.g. Redis is down), reads go to the database and no ETag is sent.
+    """
+
+    VERSION_KEY = "todo:tasks:version"
+
+    def __init__(
+        self, db: AsyncDatabaseAPI, backend: CacheBackend, ttl: float, primary_window: float = 0
+    ):
+        self.db = db
+        self.backend = backend
+        self.ttl = ttl
+        self.primary_window = primary_window
+        # Newest version seen by this process and when it was first seen (monotonic); another
+        # worker's write shows up here after it happened, so the window only errs long
+        self._newest: Tuple[int, float] = (-1, 0.0)
+        self._backend_down = False
+
+    def __getattr__(self, name: str):
+        return getattr(self.db, name)
+
+    async def version(self) -> int:
+        """Task table version, bumped on every task write."""
+        return await self.backend.get_counter(self.VERSION_KEY)
+
+    async def version_tag(self) -> Optional[str]:
+        """
+        Version string for HTTP validators (ETags), None while the backend is unavailable.
+        A per-process backend doesn't see other workers' writes, so its tag also rolls over
+        every TTL period; a stale validator then lives no longer than a stale cache entry.
+        """
+        try:
+            version = await self.version()
+        except Exception as e:
+            self._backend_failed(e)
+            return None
+        if self.backend.shared:
+            return str(version)
+        return f"{version}.{int(time.time() // self.ttl)}"
+
+    def _backend_failed(self, error: Exception) -> None:
+        if not self._backend_down:
+            logger.warning("Cache backend unavailable, requests go to the database: {}", error)
+            self._backend_down = True
+
+    def _backend_up(self) -> None:
+        if self._backend_down:
+            logger.info("Cache backend is back")
+            self._backend_down = False
+
+    async def _invalidate(self, *task_ids: str) -> None:
+        # Bump first: a reader that fetched the old row sees a new version and skips storing it
+        try:
+            version = await self.backend.incr(self.VERSION_KEY)
+            self._newest = (version, time.monotonic())
+            await self.backend.delete(*(f"todo:task:{task_id}" for task_id in task_ids))
+        except Exception as e:
+            # The write is committed; only entries cached before the outage may outlive it
+            self._backend_failed(e)
+
+    def _recently_written(self, version: int) -> bool:
+        """Whether the replicas may not have the writes of `version` yet."""
+        now = time.monotonic()
+        if version > self._newest[0]:
+            self._newest = (version, now)
+        return now - self._newest[1] < self.primary_window
+
+    async def _fill(self, version: int, fetch):
+        """Read a value to cache under `version`: from the primary while the replicas may lag."""
+        if self.primary_window and self._recently_written(version):
+            with primary_reads():
+                return await fetch()
+        return await fetch()
+
+    async def _cached(self, key: str, version: int, value: bytes) -> None:
+        try:
+            if await self.version() == version:
+                await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            self._backend_failed(e)
+
+    async def _list(
+        self, name: str, params: tuple, fetch, dump=_dump_tasks, load=_load_tasks
+    ) -> list:
+        if reads_from_primary():
+            return await fetch()
+        try:
+            version = await self.version()
+            key = f"todo:tasks:{version}:{name}:{json.dumps(params, separators=(',', ':'))}"
+            cached = await self.backend.get(key)
+        except Exception as e:
+            self._backend_failed(e)
+            return await fetch()
+        self._backend_up()
+        record_cache("list", cached is not None)
+        if cached is not None:
+            return load(cached)
+        result = await self._fill(version, fetch)
+        await self._cached(key, version, dump(result))
+        return result
+
+    # --- Writes ---
+    async def create_task(self, task: Task) -> Task:
+        result = await self.db.create_task(task)
+        await self._invalidate()
+        return result
+
+    async def update_task(self, task_id: str, **kwargs) -> Task:
+        result = await self.db.update_task(task_id, **kwargs)
+        await self._invalidate(task_id)
+        return result
+
+    async def delete_task(self, task_id: str) -> None:
+        await self.db.delete_task(task_id)
+        await self._invalidate(task_id)
+
+    async def create_tasks(self, tasks: List[Task], **kwargs) -> List[Task]:
+        result = await self.db.create_tasks(tasks, **kwargs)
+        await self._invalidate()
+        return result
+
+    async def update_tasks(self, updates: Dict[str, dict], **kwargs) -> List[str]:
+        result = await self.db.update_tasks(updates, **kwargs)
+        await self._invalidate(*result)
+        return result
+
+    async def delete_tasks(self, task_ids: List[str], **kwargs) -> List[str]:
+        result = await self.db.delete_tasks(task_ids, **kwargs)
+        await self._invalidate(*result)
+        return result
+
+    # --- Reads ---
+    async def get_task(self, task_id: str) -> Task:
+        if reads_from_primary():
+            return await self.db.get_task(task_id)
+        key = f"todo:task:{task_id}"
+        try:
+            cached = await self.backend.get(key)
+            version = await self.version() if cached is None else None
+        except Exception as e:
+            self._backend_failed(e)
+            return await self.db.get_task(task_id)
+        self._backend_up()
+        record_cache("task", cached is not None)
+        if cached is not None:
+            return Task(**json.loads(cached))
+        task = await self._fill(version, lambda: self.db.get_task(task_id))
+        await self._cached(key, version, json.dumps(task.model_dump()).encode())
+        return task
+
+    async def count_tasks(self, status: Optional[bool] = None) -> int:
+        if reads_from_primary():
+            return await self.db.count_tasks(status=status)
+        try:
+            version = await self.version()
+            key = f"todo:tasks:{version}:count:{status}"
+            cached = await self.backend.get(key)
+        except Exception as e:
+            self._backend_failed(e)
+            return await self.db.count_tasks(status=status)
+        self._backend_up()
+        record_cache("count", cached is not None)
+        if cached is not None:
+            return int(cached)
+        result = await self._fill(version, lambda: self.db.count_tasks(status=status))
+        await self._cached(key, version, str(result).encode())
+        return result
+
+    async def query_tasks(
+        self,
+        filters: Optional[Dict[str, object]] = None,
+        sort: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: int = 3,
+        after: Optional[Sequence] = None,
+    ) -> List[dict]:
+        params = _query_params(filters, sort, fields, offset, limit, after)
+        return await self._list(
+            "query",
+            params,
+            lambda: self.db.query_tasks(
+                filters=filters, sort=sort, fields=fields, offset=offset, limit=limit, after=after
+            ),
+            dump=_dump_rows,
+            load=json.loads,
+        )
+
+    async def query_tasks_with_total(
+        self,
+        filters: Optional[Dict[str, object]] = None,
+        sort: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: int = 3,
+        after: Optional[Sequence] = None,
+    ) -> Tuple[List[dict], int]:
+        params = _query_params(filters, sort, fields, offset, limit, after)
+        return await self._list(
+            "query_total",
+            params,
+            lambda: self.db.query_tasks_with_total(
+                filters=filters, sort=sort, fields=fields, offset=offset, limit=limit, after=after
+            ),
+            dump=_dump_rows,
+            load=lambda value: tuple(json.loads(value)),
+        )
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "CachedDatabaseAPI",
+    "create_cache_backend",
+]
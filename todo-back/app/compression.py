@@ -0,0 +1,115 @@
+import zlib
+from typing import Callable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.utils import parse_qvalues
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Preferred first when the client rates several equally; brotli only when installed
+ENCODINGS = (("br",) if brotli is not None else ()) + ("gzip",)
+
+# Sent as is: every event must reach the client the moment it is written
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The supported content coding the client rates highest, `*` included, or None for identity."""
+    ratings = parse_qvalues(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = ratings.get(encoding, ratings.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(encoding: str, gzip_level: int, brotli_quality: int) -> Tuple[Callable, Callable]:
+    """(compress chunk, finish) functions of a streaming compressor."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli (when the `brotli` package is installed)
+    or gzip, whichever the client's Accept-Encoding rates higher. Bodies under `minimum_size`,
+    responses that already carry a Content-Encoding and the change feed are sent as is;
+    streamed bodies (exports) are compressed chunk by chunk. A strong ETag becomes weak, since
+    the bytes now depend on the encoding.
+    """
+
+    def __init__(self, app, minimum_size: int, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compress = finish = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compress, finish, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compress is None:
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.startswith(UNCOMPRESSED_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compress, finish = _compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = compress(body) + finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+            chunk = compress(body)
+            if not more_body:
+                chunk += finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+__all__ = ["ENCODINGS", "CompressionMiddleware", "choose_encoding"]
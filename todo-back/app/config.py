@@ -1,24 +1,127 @@
-import os
 from dotenv import load_dotenv
 from functools import lru_cache
+from typing import Dict, List, Optional
 
+from pydantic import NonNegativeFloat, NonNegativeInt, PositiveInt
 from pydantic_settings import BaseSettings
 
 from app import logger
 
-load_dotenv()
-
 
 class Settings(BaseSettings):
-    jwt_secret_key: str = os.environ["JWT_SECRET_KEY"]
-    jwt_algorithm: str = os.environ["JWT_ALGORITHM"]
+    jwt_secret_key: str
+    jwt_algorithm: str
     jwt_access_token_expire_minutes: int = 60 * 24 * 7
+    admin_cache_ttl_seconds: float = 60
+    admin_cache_max_size: int = 1024
+
+    log_enabled: bool = True
+    log_level: str = "INFO"
+    log_file: Optional[str] = "logs.log"
+    # Write records from a background thread instead of inside the request
+    log_enqueue: bool = False
+    log_json: bool = False
+    # Share of requests to hot read endpoints whose routine INFO lines are logged
+    log_sample_rate: float = 1.0
+
+    # Prometheus metrics on /metrics; when off, instrumentation is skipped entirely
+    metrics_enabled: bool = False
+
+    # Per-request profiling: admins send X-Profile: 1, or a sampled share of all requests
+    profiling_enabled: bool = False
+    profile_sample_rate: float = 0.0
+    profile_max_artifacts: int = 50
+    # Same statement shape this many times in one request is reported as a likely N+1
+    profile_repeat_threshold: int = 5
+
+    # bcrypt cost; changing it rehashes admin passwords on their next login
+    bcrypt_rounds: int = 12
+    password_workers: int = 2
+    password_max_pending: int = 32
+
+    db_url: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 30 * 60
+
+    # Read replicas (JSON list in DB_REPLICA_URLS): task reads go round-robin to the healthy ones,
+    # writes and admin lookups to db_url. A failed replica is skipped, then re-checked every
+    # interval. A client that wrote reads from the primary for read_your_writes seconds
+    db_replica_urls: List[str] = []
+    db_replica_check_interval_seconds: float = 5
+    db_read_your_writes_seconds: float = 5
+
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
+    bulk_chunk_size: int = 500
+    bulk_max_items: int = 10_000
+
+    export_batch_size: int = 1000
+
+    # Group commit of single task creations: queued and inserted in batches by one writer.
+    # Durability "commit" answers once the task's batch is committed, "enqueue" once it is queued
+    create_batch_enabled: bool = False
+    create_batch_size: int = 200
+    create_batch_max_delay_ms: float = 2
+    create_batch_max_pending: int = 10_000
+    create_batch_durability: str = "commit"
+
+    # Task change feed (/tasks/events): events kept for resuming with Last-Event-ID,
+    # events a client may fall behind before it is dropped, idle seconds between keep-alives
+    events_history_size: int = 1024
+    events_queue_size: int = 256
+    events_max_subscribers: int = 10_000
+    events_heartbeat_seconds: float = 15
+
+    # Listing routes encode query rows straight to JSON bytes, skipping per-row models and
+    # response_model validation; turn off to go through the validated path
+    fast_json_responses: bool = True
+
+    # Admission control, per route class (read, list, export, write, auth; see app.admission):
+    # at most `limits` requests run at once and `queue` more wait, each for up to `max_wait_ms`.
+    # Requests that could not start in time are shed with 503 right away. Listings are CPU-bound
+    # in the event loop, so a few at once already keep a worker busy; exports hold their slot for
+    # the whole download, so they wait longer instead. Optionally each client (its IP,
+    # or the first value of client_header behind a proxy) gets a token bucket: 429 beyond
+    # client_rate requests per second sustained, client_burst at once. Rate 0 turns it off
+    admission_enabled: bool = False
+    admission_limits: Dict[str, PositiveInt] = {
+        "read": 64, "list": 2, "export": 2, "write": 16, "auth": 2
+    }
+    admission_queue: Dict[str, NonNegativeInt] = {
+        "read": 512, "list": 32, "export": 8, "write": 128, "auth": 16
+    }
+    admission_max_wait_ms: Dict[str, NonNegativeFloat] = {
+        "read": 200, "list": 1000, "export": 5000, "write": 1000, "auth": 3000
+    }
+    admission_client_rate: NonNegativeFloat = 0
+    admission_client_burst: PositiveInt = 50
+    admission_client_header: Optional[str] = None
+
+    # Listing routes also answer in columnar JSON or msgpack (with the `msgpack` package) when
+    # the Accept header asks; responses from this many bytes are compressed with brotli (with the
+    # `brotli` package) or gzip, as Accept-Encoding allows
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Search results are ranked (bm25) up to this many matches, broader queries list newest first
+    search_rank_limit: int = 1000
 
-    db_url: str = os.environ["DB_URL"]
+    # "memory" is per process; use "redis" (cache_url) when running several workers
+    cache_enabled: bool = True
+    cache_backend: str = "memory"
+    cache_url: Optional[str] = None
+    cache_ttl_seconds: float = 60
+    cache_max_bytes: int = 32 * 1024 * 1024
 
 @lru_cache
 def get_settings() -> Settings:
     logger.info("Loading settings...")
+    load_dotenv()
     return Settings()
 
 
@@ -1,198 +1,1218 @@
+import asyncio
+import functools
+import inspect
+import math
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
 from sqlmodel import SQLModel, Session, create_engine, select
-from typing import List
-from sqlalchemy import Column, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import (
+    Boolean,
+    Engine,
+    and_,
+    bindparam,
+    delete,
+    desc,
+    event,
+    func,
+    insert,
+    literal,
+    make_url,
+    or_,
+    text,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy import select as select_columns
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
-from app.models import Task, Admin
-from app.errors import DatabaseError, NotFoundError, UpdateError, DeleteError
+from app.models import Task, TaskCount, Admin, task_search
+from app.errors import (
+    DatabaseError,
+    NotFoundError,
+    UpdateError,
+    DeleteError,
+    CursorError,
+    QueryError,
+    PoolSaturatedError,
+)
+from app.events import EventBroker
+from app.migrations import INDEX_NEW_TASKS, apply_migrations, run_migrations
+from app.metrics import DB_READS, REGISTRY, instrument_pool, instrumented
+from app.replicas import Replica, ReplicaSet, mark_write, reads_from_primary
 from app.utils import get_password_hash
+from app.config import Settings
 from app import settings
 
 
+SORTABLE_FIELDS = {
+    "username": Task.username,
+    "email": Task.email,
+    "status": Task.status,
+}
+
+# Async drivers used when a plain (sync) URL is given to the async engine
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def _check_cursor(columns: Sequence, after: Sequence) -> None:
+    """
+    A cursor holds one value per sort key, of its column's type: bool for status (1 is not
+    True), str for the rest. Anything else would reach SQL as a bad comparison, so it is
+    refused here with the same 400 as a cursor that is not even JSON.
+    """
+    if len(after) != len(columns) or not all(
+        type(value) is bool if isinstance(column.type, Boolean) else isinstance(value, str)
+        for column, value in zip(columns, after)
+    ):
+        raise CursorError("Cursor does not match the requested sort order")
+
+
+# --- Statements shared by the sync and async APIs ---
+def _count_update(status: bool, delta: int):
+    """Move the per-status counter; executed inside the caller's transaction."""
+    return (
+        update(TaskCount)
+        .where(TaskCount.status == status)
+        .values(count=TaskCount.count + delta)
+    )
+
+
+def _counters_statement(status: Optional[bool]):
+    statement = select(func.sum(TaskCount.count), func.count())
+    if status is not None:
+        statement = statement.where(TaskCount.status == status)
+    return statement
+
+
+def _count_all_statement(status: Optional[bool]):
+    statement = select(func.count()).select_from(Task)
+    if status is not None:
+        statement = statement.where(Task.status == status)
+    return statement
+
+
+# --- Generic task query ---
+FILTERABLE_FIELDS = {
+    "status": Task.status,
+    "username": Task.username,
+    "email": Task.email,
+    "edited_by_admin": Task.edited_by_admin,
+}
+
+TASK_FIELDS = tuple(Task.__table__.columns.keys())
+
+
+def query_order(
+    sort: Sequence[str], filters: Optional[Dict[str, object]] = None
+) -> List[Tuple[str, bool]]:
+    """
+    (field, descending) pairs to order by, from `sort` entries like `status` or `-username`.
+    Keys pinned by an equality filter order nothing and are dropped, which keeps the rest in
+    line with an index. `id` closes the list in the direction of the key before it, so the
+    order is total and a single-key sort still walks its (field, id) index in one direction.
+    """
+    filters = filters or {}
+    keys, seen = [], set()
+    for entry in sort:
+        name = entry.lstrip("-+")
+        if name not in SORTABLE_FIELDS and name != "id":
+            raise QueryError(f"Cannot sort by {name!r}")
+        if name in seen:
+            raise QueryError(f"Sort key {name!r} given twice")
+        seen.add(name)
+        if name == "id":
+            keys.append(("id", entry.startswith("-")))
+            break
+        if filters.get(name) is None:
+            keys.append((name, entry.startswith("-")))
+    if not keys or keys[-1][0] != "id":
+        keys.append(("id", keys[-1][1] if keys else False))
+    return keys
+
+
+def _query_columns(fields: Optional[Sequence[str]], keys: Sequence[Tuple[str, bool]]) -> list:
+    """Requested columns plus the sort keys, which the caller needs to build a cursor."""
+    if fields is None:
+        names = list(TASK_FIELDS)
+    else:
+        unknown = [name for name in fields if name not in TASK_FIELDS]
+        if unknown:
+            raise QueryError(f"Unknown task fields: {', '.join(unknown)}")
+        names = list(dict.fromkeys([*fields, *(name for name, _ in keys)]))
+    return [Task.__table__.c[name] for name in names]
+
+
+def _keyset_condition(keys: Sequence[Tuple[str, bool]], after: Sequence):
+    """Rows strictly past `after` in the order of `keys`."""
+    columns = [getattr(Task, name) for name, _ in keys]
+    _check_cursor(columns, after)
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        # One direction: a row-value comparison, which SQLite turns into an index seek
+        position = tuple_(*columns) if len(columns) > 1 else columns[0]
+        value = tuple_(*after) if len(columns) > 1 else after[0]
+        return position < value if directions.pop() else position > value
+    # Mixed directions: (a > x) OR (a = x AND b < y) OR ...
+    # Typed literals, since SQLAlchemy only allows = and != against a bare True/False
+    values = [literal(value, column.type) for column, value in zip(columns, after)]
+    clauses = []
+    for i, (column, (_, descending)) in enumerate(zip(columns, keys)):
+        equal = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, column < values[i] if descending else column > values[i]))
+    return or_(*clauses)
+
+
+def _query_filters(filters: Optional[Dict[str, object]]) -> Dict[str, object]:
+    """Equality filters that are set; None means any value."""
+    filters = {name: value for name, value in (filters or {}).items() if value is not None}
+    for name in filters:
+        if name not in FILTERABLE_FIELDS:
+            raise QueryError(f"Cannot filter by {name!r}")
+    return filters
+
+
+def _query_statement(
+    filters: Dict[str, object],
+    keys: Sequence[Tuple[str, bool]],
+    columns: list,
+    offset: int,
+    limit: int,
+    after: Optional[Sequence] = None,
+):
+    """The single SELECT of a task query."""
+    if after is not None:
+        _check_cursor([getattr(Task, name) for name, _ in keys], after)
+    if len(keys) > 1 and keys[0][0] == "status" and keys[0][1] != keys[1][1]:
+        return _split_statement(filters, keys, columns, offset, limit, after)
+    # SQLAlchemy's select: sqlmodel's turns a one-column select into bare scalars
+    statement = select_columns(*columns)
+    for name, value in filters.items():
+        statement = statement.where(FILTERABLE_FIELDS[name] == value)
+    if after is not None:
+        statement = statement.where(_keyset_condition(keys, after))
+    order = [
+        desc(getattr(Task, name)) if descending else getattr(Task, name) for name, descending in keys
+    ]
+    return statement.order_by(*order).offset(offset).limit(limit)
+
+
+def _split_statement(
+    filters: Dict[str, object],
+    keys: Sequence[Tuple[str, bool]],
+    columns: list,
+    offset: int,
+    limit: int,
+    after: Optional[Sequence],
+):
+    """
+    A sort led by status with the next key in the other direction (`status,-username`).
+    No index can be walked both ways, so SQLite would sort every task of a status to return
+    ten of them. Instead each status gets its own index-ordered branch, cut at the page end,
+    and only those few rows are merged and sorted.
+    """
+    (name, descending), rest = keys[0], keys[1:]
+    values = [True, False] if descending else [False, True]
+    if after is not None:
+        if after[0] not in values:
+            raise CursorError("Cursor does not match the requested sort order")
+        # Statuses before the cursor's are done; within its own, continue after the cursor
+        values = values[values.index(after[0]) :]
+    branches = [
+        select_columns(
+            _query_statement(
+                {**filters, name: value},
+                rest,
+                columns,
+                0,
+                offset + limit,
+                after[1:] if after is not None and value == after[0] else None,
+            ).subquery()
+        )
+        for value in values
+    ]
+    merged = union_all(*branches).subquery()
+    order = [desc(merged.c[key]) if key_descending else merged.c[key] for key, key_descending in keys]
+    return select_columns(merged).order_by(*order).offset(offset).limit(limit)
+
+
+def _prepare_query(
+    filters: Optional[Dict[str, object]],
+    sort: Sequence[str],
+    fields: Optional[Sequence[str]],
+    offset: int,
+    limit: int,
+    after: Optional[Sequence],
+):
+    filters = _query_filters(filters)
+    keys = query_order(sort, filters)
+    return _query_statement(filters, keys, _query_columns(fields, keys), offset, limit, after)
+
+
+def _count_filtered_statement(filters: Dict[str, object]):
+    statement = select(func.count()).select_from(Task)
+    for name, value in filters.items():
+        statement = statement.where(FILTERABLE_FIELDS[name] == value)
+    return statement
+
+
+def _uses_counters(filters: Dict[str, object]) -> bool:
+    """Only a status filter (or none) can be answered from the per-status counters."""
+    return filters.keys() <= {"status"}
+
+
+def _all_tasks_statement():
+    # Plain columns, not ORM entities: rows are serialized without building Task objects
+    return select(*Task.__table__.columns).order_by(Task.id)
+
+
+def _export_statement(batch_size: Optional[int]):
+    # Plain columns, not ORM entities: rows stream out without building Task objects
+    batch_size = batch_size or settings.export_batch_size
+    return (
+        select(*Task.__table__.columns)
+        .order_by(Task.id)
+        .execution_options(yield_per=batch_size, stream_results=True)
+    )
+
+
+def _chunks(items: Sequence, size: Optional[int]) -> Iterator[Sequence]:
+    size = size or settings.bulk_chunk_size
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _existing_statement(task_ids: Sequence[str]):
+    # Locked until commit (a no-op on SQLite, which serializes writers), so the statuses the
+    # counter deltas are computed from can't be changed by a concurrent write in between
+    return select(Task.id, Task.status).where(Task.id.in_(task_ids)).with_for_update()
+
+
+def _bulk_update_rows(
+    existing: Dict[str, bool], updates: Dict[str, dict]
+) -> Tuple[List[dict], Dict[bool, int]]:
+    """Rows for an UPDATE-by-primary-key executemany, plus the counter deltas they cause."""
+    rows, deltas = [], {False: 0, True: 0}
+    for task_id, values in updates.items():
+        if task_id not in existing:
+            continue
+        values = {
+            key: value
+            for key, value in values.items()
+            if key in Task.model_fields and key != "id"
+        }
+        rows.append({"id": task_id, **values})
+        new_status = values.get("status", existing[task_id])
+        if new_status != existing[task_id]:
+            deltas[existing[task_id]] -= 1
+            deltas[new_status] += 1
+    return rows, deltas
+
+
+def _apply_update(task: Task, values: dict) -> Optional[bool]:
+    """Set fields on a task; returns the previous status if it changed."""
+    old_status = task.status
+    for key, value in values.items():
+        if hasattr(task, key):
+            setattr(task, key, value)
+    return old_status if task.status != old_status else None
+
+
+def _publish(events: Optional[EventBroker], type: str, tasks: Iterable[dict]) -> None:
+    """
+    Announce committed task changes on the change feed, when the API has one, and to read
+    routing, so the writing client reads them back from the primary.
+    """
+    mark_write()
+    if events is not None:
+        events.publish(type, tasks)
+
+
+# --- Search ---
+# SQLite rowids are signed 64-bit; a first newest-first page starts above all of them
+_MAX_ROWID = 2**63 - 1
+
+_INDEX_NEW_TASKS_SQL = text(INDEX_NEW_TASKS)
+
+# Fields of Task that the search index covers
+SEARCH_FIELDS = ("text", "username", "email")
+
+_UNINDEX_TASKS_SQL = text(
+    "DELETE FROM task_fts WHERE rowid IN"
+    " (SELECT position FROM task_search WHERE task_id IN :task_ids)"
+).bindparams(bindparam("task_ids", expanding=True))
+
+_REINDEX_TASKS_SQL = text(
+    "INSERT INTO task_fts (rowid, text, username, email)"
+    " SELECT task_search.position, task.text, task.username, task.email"
+    " FROM task_search JOIN task ON task.id = task_search.task_id"
+    " WHERE task_search.task_id IN :task_ids ORDER BY task_search.position"
+).bindparams(bindparam("task_ids", expanding=True))
+
+_MATCHES_SQL = text(
+    "SELECT rowid FROM task_fts WHERE task_fts MATCH :query AND rowid < :before"
+    " ORDER BY rowid DESC LIMIT :limit"
+)
+
+_RANKED_SQL = text(
+    "SELECT rowid, rank FROM task_fts WHERE task_fts MATCH :query ORDER BY rowid DESC LIMIT :limit"
+)
+
+
+def _fts_query(query: str) -> Optional[str]:
+    """
+    FTS5 query from free text; None if it has no words. Every whitespace-separated term must match;
+    the last one, still being typed, as a prefix. A term of several words (`alice@corp.io`) is
+    matched as a phrase, which is also much cheaper than intersecting `corp` and `io` separately.
+    """
+    phrases = [" ".join(re.findall(r"\w+", term)) for term in query.split()]
+    phrases = [f'"{phrase}"' for phrase in phrases if phrase]
+    if not phrases:
+        return None
+    phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+def _is_rowid(value) -> bool:
+    return type(value) is int and -_MAX_ROWID - 1 <= value <= _MAX_ROWID
+
+
+def _is_rank(value) -> bool:
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+def _search_cursor(after: Optional[Sequence]) -> Optional[list]:
+    """A search position is [rank, rowid] in a ranked result and [rowid] in a newest-first one."""
+    if after is None:
+        return None
+    if not (
+        (len(after) == 2 and _is_rank(after[0]) and _is_rowid(after[1]))
+        or (len(after) == 1 and _is_rowid(after[0]))
+    ):
+        raise CursorError("Cursor does not match the search order")
+    return list(after)
+
+
+def _matches_statement(fts_query: str, before: Optional[int], limit: int):
+    return _MATCHES_SQL.bindparams(
+        query=fts_query, before=_MAX_ROWID if before is None else before, limit=limit
+    )
+
+
+def _ranked_statement(fts_query: str, limit: int):
+    return _RANKED_SQL.bindparams(query=fts_query, limit=limit)
+
+
+def _rank_page(matches: Sequence[Tuple[int, float]], after: Optional[list], limit: int) -> List[list]:
+    """Positions of the `limit` best (rowid, rank) matches after `after`; newer first on equal rank."""
+    ranked = sorted(matches, key=lambda match: (match[1], -match[0]))
+    if after is not None:
+        ranked = [match for match in ranked if (match[1], -match[0]) > (after[0], -after[1])]
+    return [[rank, rowid] for rowid, rank in ranked[:limit]]
+
+
+def _search_rows_statement(rowids: Sequence[int]):
+    return (
+        select(task_search.c.position, Task)
+        .join(Task, Task.id == task_search.c.task_id)
+        .where(task_search.c.position.in_(rowids))
+    )
+
+
+def _has_search(engine) -> bool:
+    """The full-text index (migration 3) exists on SQLite only."""
+    return engine.dialect.name == "sqlite"
+
+
+def _search_edits(rows: Sequence[dict]) -> List[str]:
+    """Ids of bulk update rows that change a searchable field."""
+    return [row["id"] for row in rows if row.keys() & set(SEARCH_FIELDS)]
+
+
+def _reindex_statements(task_ids: Sequence[str]) -> tuple:
+    """Statements replacing the index entries of edited tasks with their current values."""
+    params = {"task_ids": list(task_ids)}
+    return _UNINDEX_TASKS_SQL.params(params), _REINDEX_TASKS_SQL.params(params)
+
+
+def _require_search(engine) -> None:
+    if not _has_search(engine):
+        raise DatabaseError("Full-text search requires SQLite FTS5", status_code=501)
+
+
+# --- Engines ---
+def _is_memory_sqlite(db_url: str) -> bool:
+    url = make_url(db_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _sqlite_pragmas(config: Settings):
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}")
+        cursor.close()
+
+    return on_connect
+
+
+def _engine_options(db_url: str, config: Settings) -> dict:
+    options = {"echo": False, "pool_pre_ping": True}
+    if not _is_memory_sqlite(db_url):
+        options.update(
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_recycle=config.db_pool_recycle,
+        )
+    return options
+
+
+def create_db_engine(db_url: Optional[str] = None, config: Optional[Settings] = None) -> Engine:
+    """
+    Create the engine and connection pool shared by the whole process.
+    Pool limits come from settings; SQLite connections are tuned on connect.
+    """
+    db_url, config = db_url or settings.db_url, config or settings
+    engine = create_engine(db_url, **_engine_options(db_url, config))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas(config))
+    if REGISTRY.enabled:
+        instrument_pool(engine.pool)
+    return engine
+
+
+def async_db_url(db_url: str) -> str:
+    """Swap a sync driver for its async counterpart, e.g. sqlite:// -> sqlite+aiosqlite://."""
+    url = make_url(db_url)
+    backend = url.get_backend_name()
+    if url.get_driver_name() != ASYNC_DRIVERS.get(backend, url.get_driver_name()):
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+def create_async_db_engine(
+    db_url: Optional[str] = None, config: Optional[Settings] = None
+) -> AsyncEngine:
+    """Async counterpart of `create_db_engine` (aiosqlite locally, asyncpg for PostgreSQL)."""
+    db_url, config = async_db_url(db_url or settings.db_url), config or settings
+    engine = create_async_engine(db_url, **_engine_options(db_url, config))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas(config))
+    if REGISTRY.enabled:
+        instrument_pool(engine.sync_engine.pool)
+    return engine
+
+
+# --- Read replicas ---
+# Engine of the replica serving the read in progress; None reads from the primary
+_read_engine: ContextVar = ContextVar("read_engine", default=None)
+
+
+def _pick_replica(replicas: Optional[ReplicaSet]) -> Optional[Replica]:
+    """A replica for the next read, or None to read from the primary."""
+    if replicas is None:
+        return None
+    replica = None if reads_from_primary() else replicas.pick()
+    if REGISTRY.enabled:
+        DB_READS.inc("replica" if replica is not None else "primary")
+    return replica
+
+
+def _replica_failed(error: Exception) -> bool:
+    """Whether a read failed in the database itself rather than in its arguments."""
+    return isinstance(error, DatabaseError) and isinstance(error.__context__, (DBAPIError, OSError))
+
+
+def _routed_read(method):
+    """
+    Run a task read on a replica from `self.replicas`, unless the request has to see its
+    client's writes. A replica failing with a database error is marked down and the read is
+    retried on the primary, so callers only get errors the primary gives as well.
+    Method bodies open their sessions on `self._reader()`.
+    """
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            replica = _pick_replica(self.replicas)
+            if replica is None:
+                return await method(self, *args, **kwargs)
+            token = _read_engine.set(replica.engine)
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as e:
+                if not _replica_failed(e):
+                    raise
+                self.replicas.mark_down(replica, e.__context__)
+            finally:
+                _read_engine.reset(token)
+            if REGISTRY.enabled:
+                DB_READS.inc("fallback")
+            return await method(self, *args, **kwargs)
+
+        return wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        replica = _pick_replica(self.replicas)
+        if replica is None:
+            return method(self, *args, **kwargs)
+        token = _read_engine.set(replica.engine)
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as e:
+            if not _replica_failed(e):
+                raise
+            self.replicas.mark_down(replica, e.__context__)
+        finally:
+            _read_engine.reset(token)
+        if REGISTRY.enabled:
+            DB_READS.inc("fallback")
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# --- Operations shared by the sync and async APIs ---
+# Each runs on a sync Session: DatabaseAPI calls it directly, AsyncDatabaseAPI through
+# AsyncSession.run_sync, so one body serves both and a fix lands in both at once.
+@contextmanager
+def _errors(error: type, message: str) -> Iterator[None]:
+    """Re-raise unexpected failures as `error`; not found and a full hashing pool pass as is."""
+    try:
+        yield
+    except (NotFoundError, PoolSaturatedError):
+        raise
+    except Exception as e:
+        raise error(f"{message}: {e}")
+
+
+def _create_task(session: Session, task: Task, events: Optional[EventBroker]) -> Task:
+    session.add(task)
+    session.exec(_count_update(task.status, 1))
+    if _has_search(session.get_bind()):
+        session.exec(_INDEX_NEW_TASKS_SQL)
+    session.commit()
+    session.refresh(task)
+    _publish(events, "created", [task.model_dump()])
+    return task
+
+
+def _get_task(session: Session, task_id: str, lock: bool = False) -> Task:
+    task = session.get(Task, task_id, with_for_update=lock)
+    if not task:
+        raise NotFoundError(f"Task with id {task_id} not found")
+    return task
+
+
+def _update_task(
+    session: Session, task_id: str, values: dict, events: Optional[EventBroker]
+) -> Task:
+    task = _get_task(session, task_id, lock=True)
+    old_status = _apply_update(task, values)
+    if old_status is not None:
+        session.exec(_count_update(old_status, -1))
+        session.exec(_count_update(task.status, 1))
+    if _has_search(session.get_bind()) and values.keys() & set(SEARCH_FIELDS):
+        session.flush()
+        for statement in _reindex_statements([task_id]):
+            session.exec(statement)
+    session.commit()
+    session.refresh(task)
+    _publish(events, "updated", [task.model_dump()])
+    return task
+
+
+def _delete_task(session: Session, task_id: str, events: Optional[EventBroker]) -> None:
+    task = _get_task(session, task_id, lock=True)
+    session.delete(task)
+    session.exec(_count_update(task.status, -1))
+    session.commit()
+    _publish(events, "deleted", [{"id": task_id}])
+
+
+def _create_tasks(
+    session: Session, tasks: List[Task], chunk_size: Optional[int], events: Optional[EventBroker]
+) -> List[Task]:
+    for chunk in _chunks(tasks, chunk_size):
+        session.exec(insert(Task), params=[task.model_dump() for task in chunk])
+    for status in (False, True):
+        created = sum(1 for task in tasks if task.status == status)
+        if created:
+            session.exec(_count_update(status, created))
+    if _has_search(session.get_bind()):
+        session.exec(_INDEX_NEW_TASKS_SQL)
+    session.commit()
+    _publish(events, "created", (task.model_dump() for task in tasks))
+    return tasks
+
+
+def _update_tasks(
+    session: Session, updates: Dict[str, dict], chunk_size: Optional[int], events: Optional[EventBroker]
+) -> List[str]:
+    existing = {}
+    for chunk in _chunks(list(updates), chunk_size):
+        existing.update(session.exec(_existing_statement(chunk)).all())
+    rows, deltas = _bulk_update_rows(existing, updates)
+    search = _has_search(session.get_bind())
+    for chunk in _chunks(rows, chunk_size):
+        session.exec(update(Task), params=chunk)
+        if search:
+            for statement in _reindex_statements(_search_edits(chunk)):
+                session.exec(statement)
+    for status, delta in deltas.items():
+        if delta:
+            session.exec(_count_update(status, delta))
+    session.commit()
+    _publish(events, "updated", rows)
+    return [row["id"] for row in rows]
+
+
+def _delete_tasks(
+    session: Session, task_ids: List[str], chunk_size: Optional[int], events: Optional[EventBroker]
+) -> List[str]:
+    deleted = {}
+    for chunk in _chunks(task_ids, chunk_size):
+        # Counted from what this statement removed, not from a read that a concurrent delete
+        # of the same tasks could also have made
+        statement = delete(Task).where(Task.id.in_(chunk)).returning(Task.id, Task.status)
+        deleted.update(session.exec(statement).all())
+    for status in (False, True):
+        removed = sum(1 for value in deleted.values() if value == status)
+        if removed:
+            session.exec(_count_update(status, -removed))
+    session.commit()
+    _publish(events, "deleted", ({"id": task_id} for task_id in deleted))
+    return list(deleted)
+
+
+def _count_tasks(session: Session, status: Optional[bool]) -> int:
+    total, rows = session.exec(_counters_statement(status)).one()
+    if rows:
+        return total or 0
+    return session.exec(_count_all_statement(status)).one()
+
+
+def _insert_admin(session: Session, admin: Admin) -> Admin:
+    """Store an admin whose password is already hashed."""
+    statement = select(Admin).where(Admin.username == admin.username)
+    if session.exec(statement).first():
+        raise DatabaseError(f"Admin with username {admin.username} already exists")
+    session.add(admin)
+    session.commit()
+    session.refresh(admin)
+    return admin
+
+
+def _update_admin_password(session: Session, admin_id: str, hashed_password: str) -> None:
+    session.exec(update(Admin).where(Admin.id == admin_id).values(password=hashed_password))
+    session.commit()
+
+
+def _get_admin(session: Session, admin_id: str) -> Admin:
+    admin = session.get(Admin, admin_id)
+    if not admin:
+        raise NotFoundError(f"Admin with id {admin_id} not found")
+    return admin
+
+
+def _delete_admin(session: Session, admin_id: str) -> None:
+    session.delete(_get_admin(session, admin_id))
+    session.commit()
+
+
+def _get_admin_by_username(session: Session, username: str) -> Admin:
+    admin = session.exec(select(Admin).where(Admin.username == username)).first()
+    if not admin:
+        raise NotFoundError(f"Admin with username {username} not found")
+    return admin
+
+
+def _search_tasks(
+    session: Session,
+    fts_query: str,
+    after: Optional[list],
+    limit: int,
+    rank_limit: Optional[int],
+) -> List[Tuple[Task, list]]:
+    rank_limit = rank_limit or settings.search_rank_limit
+    if after is None:
+        probe = session.exec(_matches_statement(fts_query, None, rank_limit + 1)).all()
+        ranked = len(probe) <= rank_limit
+    else:
+        ranked = len(after) == 2
+    if ranked:
+        matches = session.exec(_ranked_statement(fts_query, rank_limit)).all()
+        positions = _rank_page(matches, after, limit)
+    else:
+        before = after[0] if after else None
+        matches = session.exec(_matches_statement(fts_query, before, limit)).all()
+        positions = [[rowid] for rowid, in matches]
+    tasks = dict(session.exec(_search_rows_statement([p[-1] for p in positions])).all())
+    # A task deleted between the two reads is simply left out
+    return [(tasks[p[-1]], p) for p in positions if p[-1] in tasks]
+
+
+def _query_rows(session: Session, statement) -> List[dict]:
+    return [dict(row) for row in session.exec(statement).mappings()]
+
+
+def _query_rows_with_total(
+    session: Session, statement, filters: Dict[str, object]
+) -> Tuple[List[dict], int]:
+    rows = _query_rows(session, statement)
+    if _uses_counters(filters):
+        total, counters = session.exec(_counters_statement(filters.get("status"))).one()
+        if counters:
+            return rows, total or 0
+    return rows, session.exec(_count_filtered_statement(filters)).one()
+
+
 class DatabaseAPI:
     """
     Class for interacting with SQLite database via SQLModel.
     Supports CRUD operations for tasks and admins, as well as methods for sorting and paginating tasks.
     All methods raise exceptions on errors for handling in endpoints.
+    Pass a shared `engine` to reuse its connection pool; otherwise one is created from `db_url`.
+    Task writes are announced on `events` (an EventBroker) once committed, when one is given.
+    Task reads go to `replica_urls` when given (see `_routed_read`); writes and admin lookups,
+    which must never be stale, always use the primary.
+    The API serves scripts and benchmarks; the web app uses AsyncDatabaseAPI.
     """
 
-    def __init__(self, db_url: str = settings.db_url):
+    def __init__(
+        self,
+        db_url: Optional[str] = None,
+        engine: Optional[Engine] = None,
+        events: Optional[EventBroker] = None,
+        replica_urls: Sequence[str] = (),
+    ):
+        self.events = events
         try:
-            self.engine = create_engine(db_url, echo=False)
-            SQLModel.metadata.create_all(self.engine)
+            if engine is None:
+                engine = create_db_engine(db_url)
+                SQLModel.metadata.create_all(engine)
+                run_migrations(engine)
+            self.engine = engine
+            self.replicas = None
+            if replica_urls:
+                self.replicas = ReplicaSet(
+                    [create_db_engine(url) for url in replica_urls],
+                    retry_after=settings.db_replica_check_interval_seconds,
+                )
         except Exception as e:
             raise DatabaseError(f"Database initialization error: {e}")
 
+    def _reader(self) -> Engine:
+        return _read_engine.get() or self.engine
+
+    def close(self) -> None:
+        """Close the connection pools of the primary and the replicas."""
+        for replica in self.replicas.replicas if self.replicas else ():
+            replica.engine.dispose()
+        self.engine.dispose()
+
+    @instrumented
     def create_task(self, task: Task) -> Task:
         """Create a new task."""
-        try:
-            with Session(self.engine) as session:
-                session.add(task)
-                session.commit()
-                session.refresh(task)
-                return task
-        except Exception as e:
-            raise DatabaseError(f"Error creating task: {e}")
+        with _errors(DatabaseError, "Error creating task"), Session(self.engine) as session:
+            return _create_task(session, task, self.events)
 
+    @instrumented
+    @_routed_read
     def get_task(self, task_id: str) -> Task:
         """Get a task by id."""
-        try:
-            with Session(self.engine) as session:
-                task = session.get(Task, task_id)
-                if not task:
-                    raise NotFoundError(f"Task with id {task_id} not found")
-                return task
-        except NotFoundError:
-            raise
-        except Exception as e:
-            raise DatabaseError(f"Error getting task: {e}")
+        with _errors(DatabaseError, "Error getting task"), Session(self._reader()) as session:
+            return _get_task(session, task_id)
 
+    @instrumented
     def update_task(self, task_id: str, **kwargs) -> Task:
         """Update a task by id."""
-        try:
-            with Session(self.engine) as session:
-                task = session.get(Task, task_id)
-                if not task:
-                    raise NotFoundError(f"Task with id {task_id} not found")
-                for key, value in kwargs.items():
-                    if hasattr(task, key):
-                        setattr(task, key, value)
-                session.commit()
-                session.refresh(task)
-                return task
-        except NotFoundError:
-            raise
-        except Exception as e:
-            raise UpdateError(f"Error updating task: {e}")
+        with _errors(UpdateError, "Error updating task"), Session(self.engine) as session:
+            return _update_task(session, task_id, kwargs, self.events)
 
+    @instrumented
     def delete_task(self, task_id: str) -> None:
         """Delete a task by id."""
-        try:
-            with Session(self.engine) as session:
-                task = session.get(Task, task_id)
-                if not task:
-                    raise NotFoundError(f"Task with id {task_id} not found")
-                session.delete(task)
-                session.commit()
-        except NotFoundError:
-            raise
-        except Exception as e:
-            raise DeleteError(f"Error deleting task: {e}")
+        with _errors(DeleteError, "Error deleting task"), Session(self.engine) as session:
+            _delete_task(session, task_id, self.events)
 
-    def get_all_tasks(self) -> List[Task]:
-        """Get all tasks."""
-        try:
-            with Session(self.engine) as session:
-                statement = select(Task)
-                return list(session.exec(statement))
-        except Exception as e:
-            raise DatabaseError(f"Error getting all tasks: {e}")
+    @instrumented
+    def create_tasks(self, tasks: List[Task], chunk_size: Optional[int] = None) -> List[Task]:
+        """Insert many tasks in one transaction, chunk_size rows per INSERT executemany."""
+        with _errors(DatabaseError, "Error creating tasks"), Session(self.engine) as session:
+            return _create_tasks(session, tasks, chunk_size, self.events)
+
+    @instrumented
+    def update_tasks(
+        self, updates: Dict[str, dict], chunk_size: Optional[int] = None
+    ) -> List[str]:
+        """
+        Update many tasks (id -> new values) in one transaction.
+        Returns the ids that were updated; ids that don't exist are skipped.
+        """
+        with _errors(UpdateError, "Error updating tasks"), Session(self.engine) as session:
+            return _update_tasks(session, updates, chunk_size, self.events)
+
+    @instrumented
+    def delete_tasks(
+        self, task_ids: List[str], chunk_size: Optional[int] = None
+    ) -> List[str]:
+        """Delete many tasks in one transaction; returns the ids that existed and were deleted."""
+        with _errors(DeleteError, "Error deleting tasks"), Session(self.engine) as session:
+            return _delete_tasks(session, task_ids, chunk_size, self.events)
+
+    @instrumented
+    @_routed_read
+    def get_all_tasks(self) -> List[dict]:
+        """Get all tasks as plain dicts, ordered by id."""
+        with _errors(DatabaseError, "Error getting all tasks"), Session(self._reader()) as session:
+            return _query_rows(session, _all_tasks_statement())
 
+    def iter_task_rows(self, batch_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Iterate over every task as a plain dict using a server-side cursor,
+        holding at most `batch_size` rows in memory.
+        """
+        # Streams are not retried: a replica failing halfway has already yielded rows
+        replica = _pick_replica(self.replicas)
+        with _errors(DatabaseError, "Error streaming tasks"):
+            with Session(replica.engine if replica else self.engine) as session:
+                for row in session.exec(_export_statement(batch_size)).mappings():
+                    yield dict(row)
+
+    @instrumented
+    @_routed_read
+    def count_tasks(self, status: Optional[bool] = None) -> int:
+        """
+        Count tasks, optionally only those with the given status.
+        Reads the maintained counters; falls back to COUNT(*) if they haven't been seeded yet.
+        """
+        with _errors(DatabaseError, "Error counting tasks"), Session(self._reader()) as session:
+            return _count_tasks(session, status)
+
+    @instrumented
     def create_admin(self, admin: Admin) -> Admin:
         """Create a new admin."""
-        try:
+        with _errors(DatabaseError, "Error creating admin"):
             admin.password = get_password_hash(admin.password)
             with Session(self.engine) as session:
+                return _insert_admin(session, admin)
 
-                statement = select(Admin).where(Admin.username == admin.username)
-                if session.exec(statement).first():
-                    raise DatabaseError(
-                        f"Admin with username {admin.username} already exists"
-                    )
-
-                session.add(admin)
-                session.commit()
-                session.refresh(admin)
-                return admin
-        except Exception as e:
-            raise DatabaseError(f"Error creating admin: {e}")
+    @instrumented
+    def update_admin_password(self, admin_id: str, hashed_password: str) -> None:
+        """Replace an admin's stored password hash (used to rehash with a new bcrypt cost)."""
+        with _errors(UpdateError, "Error updating admin password"), Session(self.engine) as session:
+            _update_admin_password(session, admin_id, hashed_password)
 
+    @instrumented
     def delete_admin(self, admin_id: str) -> None:
         """Delete an admin by id."""
-        try:
-            with Session(self.engine) as session:
-                admin = session.get(Admin, admin_id)
-                if not admin:
-                    raise NotFoundError(f"Admin with id {admin_id} not found")
-                session.delete(admin)
-                session.commit()
-        except NotFoundError:
-            raise
-        except Exception as e:
-            raise DeleteError(f"Error deleting admin: {e}")
+        with _errors(DeleteError, "Error deleting admin"), Session(self.engine) as session:
+            _delete_admin(session, admin_id)
 
+    @instrumented
+    def get_admin(self, admin_id: str) -> Admin:
+        """Get admin by id."""
+        with _errors(DatabaseError, "Error getting admin"), Session(self.engine) as session:
+            return _get_admin(session, admin_id)
+
+    @instrumented
     def get_admin_by_username(self, username: str) -> Admin:
         """Get admin by username."""
-        try:
-            with Session(self.engine) as session:
-                statement = select(Admin).where(Admin.username == username)
-                admin = session.exec(statement).first()
-                if not admin:
-                    raise NotFoundError(f"Admin with username {username} not found")
-                return admin
-        except NotFoundError:
-            raise
-        except Exception as e:
-            raise DatabaseError(f"Error getting admin: {e}")
+        with _errors(DatabaseError, "Error getting admin"), Session(self.engine) as session:
+            return _get_admin_by_username(session, username)
 
-    def get_tasks_paginated(self, offset: int = 0, limit: int = 3) -> List[Task]:
-        """Get tasks with pagination."""
-        try:
-            with Session(self.engine) as session:
-                statement = select(Task).offset(offset).limit(limit)
-                return list(session.exec(statement))
-        except Exception as e:
-            raise DatabaseError(f"Error getting paginated tasks: {e}")
+    @instrumented
+    @_routed_read
+    def search_tasks(
+        self,
+        query: str,
+        after: Optional[Sequence] = None,
+        limit: int = 10,
+        rank_limit: Optional[int] = None,
+    ) -> List[Tuple[Task, list]]:
+        """
+        Full-text search over text, username and email (see `_fts_query` for the syntax).
+        A query with at most `rank_limit` matches is ordered by relevance (bm25); a broader one
+        newest first, since bm25 scans every match of each term and a common word has hundreds of
+        thousands at a million tasks. Returns each task with its position, which `after` takes.
+        """
+        _require_search(self.engine)
+        fts_query = _fts_query(query)
+        if fts_query is None:
+            return []
+        after = _search_cursor(after)
+        with _errors(DatabaseError, "Error searching tasks"), Session(self._reader()) as session:
+            return _search_tasks(session, fts_query, after, limit, rank_limit)
 
-    def get_tasks_sorted_by_username(
-        self, offset: int = 0, limit: int = 3, reverse: bool = False
-    ) -> List[Task]:
-        """Get tasks sorted by username with pagination."""
+    @instrumented
+    @_routed_read
+    def query_tasks(
+        self,
+        filters: Optional[Dict[str, object]] = None,
+        sort: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: int = 3,
+        after: Optional[Sequence] = None,
+    ) -> List[dict]:
+        """
+        Tasks matching every equality filter (status, username, email, edited_by_admin; None
+        means any), ordered by `sort` keys (`-` prefix for descending), as dicts of `fields`
+        plus the sort keys. Pages by `offset`, or by keyset when `after` holds the sort key
+        values of the last row seen. Compiles to a single SELECT.
+        """
+        statement = _prepare_query(filters, sort, fields, offset, limit, after)
+        with _errors(DatabaseError, "Error querying tasks"), Session(self._reader()) as session:
+            return _query_rows(session, statement)
+
+    @instrumented
+    @_routed_read
+    def query_tasks_with_total(
+        self,
+        filters: Optional[Dict[str, object]] = None,
+        sort: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: int = 3,
+        after: Optional[Sequence] = None,
+    ) -> Tuple[List[dict], int]:
+        """
+        `query_tasks` plus the number of tasks matching the filters, read in the same session.
+        The total comes from the per-status counters when at most status is filtered,
+        otherwise from a COUNT(*) that the filter's index serves.
+        """
+        statement = _prepare_query(filters, sort, fields, offset, limit, after)
+        filters = _query_filters(filters)
+        with _errors(DatabaseError, "Error querying tasks"), Session(self._reader()) as session:
+            return _query_rows_with_total(session, statement, filters)
+
+
+class AsyncDatabaseAPI:
+    """
+    Async twin of DatabaseAPI built on SQLAlchemy's async engine. Each method runs the same
+    shared operation as its DatabaseAPI counterpart inside AsyncSession.run_sync and raises
+    the same exceptions, so endpoints await them without tying up threadpool workers.
+    Passwords are hashed by `hasher` (a PasswordHasher) when given, otherwise in a thread.
+    Committed task writes are announced on `events` (an EventBroker) when given.
+    Task reads go to `replica_urls` when given, as in DatabaseAPI.
+    """
+
+    def __init__(
+        self,
+        db_url: Optional[str] = None,
+        engine: Optional[AsyncEngine] = None,
+        hasher=None,
+        events: Optional[EventBroker] = None,
+        replica_urls: Sequence[str] = (),
+    ):
+        self.hasher = hasher
+        self.events = events
         try:
-            with Session(self.engine) as session:
-                if reverse:
-                    statement = (
-                        select(Task).order_by(desc(Task.username)).offset(offset).limit(limit)
-                    )
-                else:
-                    statement = (
-                        select(Task).order_by(Task.username).offset(offset).limit(limit)
-                    )
-                return list(session.exec(statement))
+            self.engine = engine if engine is not None else create_async_db_engine(db_url)
+            self.replicas = None
+            if replica_urls:
+                self.replicas = ReplicaSet(
+                    [create_async_db_engine(url) for url in replica_urls],
+                    retry_after=settings.db_replica_check_interval_seconds,
+                )
         except Exception as e:
-            raise DatabaseError(f"Error sorting tasks by username: {e}")
+            raise DatabaseError(f"Database initialization error: {e}")
 
-    def get_tasks_sorted_by_email(
-        self, offset: int = 0, limit: int = 3, reverse: bool = False
-    ) -> List[Task]:
-        """Get tasks sorted by email with pagination."""
+    def _reader(self) -> AsyncEngine:
+        return _read_engine.get() or self.engine
+
+    async def close(self) -> None:
+        """Stop replica health checks and close the connection pools."""
+        if self.replicas:
+            await self.replicas.close()
+            for replica in self.replicas.replicas:
+                await replica.engine.dispose()
+        await self.engine.dispose()
+
+    async def create_schema(self) -> int:
+        """Create missing tables and apply pending migrations; returns the schema version."""
         try:
-            with Session(self.engine) as session:
-                if reverse:
-                    statement = (
-                        select(Task).order_by(desc(Task.email)).offset(offset).limit(limit)
-                    )
-                else:
-                    statement = (
-                        select(Task).order_by(Task.email).offset(offset).limit(limit)
-                    )
-                return list(session.exec(statement))
+            async with self.engine.begin() as connection:
+                await connection.run_sync(SQLModel.metadata.create_all)
+                return await connection.run_sync(apply_migrations)
         except Exception as e:
-            raise DatabaseError(f"Error sorting tasks by email: {e}")
+            raise DatabaseError(f"Database initialization error: {e}")
 
-    def get_tasks_sorted_by_status(
-        self, offset: int = 0, limit: int = 3, reverse: bool = False
+    async def _run(self, engine: AsyncEngine, operation, *args):
+        """Run a shared operation on a session of `engine`."""
+        async with AsyncSession(engine) as session:
+            return await session.run_sync(operation, *args)
+
+    @instrumented
+    async def create_task(self, task: Task) -> Task:
+        """Create a new task."""
+        with _errors(DatabaseError, "Error creating task"):
+            return await self._run(self.engine, _create_task, task, self.events)
+
+    @instrumented
+    @_routed_read
+    async def get_task(self, task_id: str) -> Task:
+        """Get a task by id."""
+        with _errors(DatabaseError, "Error getting task"):
+            return await self._run(self._reader(), _get_task, task_id)
+
+    @instrumented
+    async def update_task(self, task_id: str, **kwargs) -> Task:
+        """Update a task by id."""
+        with _errors(UpdateError, "Error updating task"):
+            return await self._run(self.engine, _update_task, task_id, kwargs, self.events)
+
+    @instrumented
+    async def delete_task(self, task_id: str) -> None:
+        """Delete a task by id."""
+        with _errors(DeleteError, "Error deleting task"):
+            await self._run(self.engine, _delete_task, task_id, self.events)
+
+    @instrumented
+    async def create_tasks(
+        self, tasks: List[Task], chunk_size: Optional[int] = None
     ) -> List[Task]:
-        """Get tasks sorted by status with pagination."""
-        try:
-            with Session(self.engine) as session:
-                if reverse:
-                    statement = (
-                        select(Task).order_by(desc(Column("status"))).offset(offset).limit(limit)
-                    )
-                else:
-                    statement = (
-                        select(Task).order_by(Column("status")).offset(offset).limit(limit)
-                    )
-                return list(session.exec(statement))
-        except Exception as e:
-            raise DatabaseError(f"Error sorting tasks by status: {e}")
+        """Insert many tasks in one transaction, chunk_size rows per INSERT executemany."""
+        with _errors(DatabaseError, "Error creating tasks"):
+            return await self._run(self.engine, _create_tasks, tasks, chunk_size, self.events)
+
+    @instrumented
+    async def update_tasks(
+        self, updates: Dict[str, dict], chunk_size: Optional[int] = None
+    ) -> List[str]:
+        """Update many tasks in one transaction; returns the ids that were updated."""
+        with _errors(UpdateError, "Error updating tasks"):
+            return await self._run(self.engine, _update_tasks, updates, chunk_size, self.events)
+
+    @instrumented
+    async def delete_tasks(
+        self, task_ids: List[str], chunk_size: Optional[int] = None
+    ) -> List[str]:
+        """Delete many tasks in one transaction; returns the ids that existed and were deleted."""
+        with _errors(DeleteError, "Error deleting tasks"):
+            return await self._run(self.engine, _delete_tasks, task_ids, chunk_size, self.events)
+
+    @instrumented
+    @_routed_read
+    async def get_all_tasks(self) -> List[dict]:
+        """Get all tasks as plain dicts, ordered by id."""
+        with _errors(DatabaseError, "Error getting all tasks"):
+            return await self._run(self._reader(), _query_rows, _all_tasks_statement())
+
+    async def stream_task_rows(
+        self, batch_size: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """Async version of DatabaseAPI.iter_task_rows."""
+        replica = _pick_replica(self.replicas)
+        with _errors(DatabaseError, "Error streaming tasks"):
+            async with AsyncSession(replica.engine if replica else self.engine) as session:
+                result = await session.stream(_export_statement(batch_size))
+                async for row in result.mappings():
+                    yield dict(row)
+
+    @instrumented
+    @_routed_read
+    async def count_tasks(self, status: Optional[bool] = None) -> int:
+        """Count tasks from the maintained counters, falling back to COUNT(*)."""
+        with _errors(DatabaseError, "Error counting tasks"):
+            return await self._run(self._reader(), _count_tasks, status)
+
+    @instrumented
+    async def create_admin(self, admin: Admin) -> Admin:
+        """Create a new admin."""
+        with _errors(DatabaseError, "Error creating admin"):
+            # bcrypt is CPU-bound, keep it off the event loop
+            if self.hasher is not None:
+                admin.password = await self.hasher.hash(admin.password)
+            else:
+                admin.password = await asyncio.to_thread(get_password_hash, admin.password)
+            return await self._run(self.engine, _insert_admin, admin)
+
+    @instrumented
+    async def update_admin_password(self, admin_id: str, hashed_password: str) -> None:
+        """Replace an admin's stored password hash."""
+        with _errors(UpdateError, "Error updating admin password"):
+            await self._run(self.engine, _update_admin_password, admin_id, hashed_password)
+
+    @instrumented
+    async def delete_admin(self, admin_id: str) -> None:
+        """Delete an admin by id."""
+        with _errors(DeleteError, "Error deleting admin"):
+            await self._run(self.engine, _delete_admin, admin_id)
+
+    @instrumented
+    async def get_admin(self, admin_id: str) -> Admin:
+        """Get admin by id."""
+        with _errors(DatabaseError, "Error getting admin"):
+            return await self._run(self.engine, _get_admin, admin_id)
+
+    @instrumented
+    async def get_admin_by_username(self, username: str) -> Admin:
+        """Get admin by username."""
+        with _errors(DatabaseError, "Error getting admin"):
+            return await self._run(self.engine, _get_admin_by_username, username)
+
+    @instrumented
+    @_routed_read
+    async def search_tasks(
+        self,
+        query: str,
+        after: Optional[Sequence] = None,
+        limit: int = 10,
+        rank_limit: Optional[int] = None,
+    ) -> List[Tuple[Task, list]]:
+        """Async version of DatabaseAPI.search_tasks."""
+        _require_search(self.engine)
+        fts_query = _fts_query(query)
+        if fts_query is None:
+            return []
+        after = _search_cursor(after)
+        with _errors(DatabaseError, "Error searching tasks"):
+            return await self._run(
+                self._reader(), _search_tasks, fts_query, after, limit, rank_limit
+            )
+
+    @instrumented
+    @_routed_read
+    async def query_tasks(
+        self,
+        filters: Optional[Dict[str, object]] = None,
+        sort: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: int = 3,
+        after: Optional[Sequence] = None,
+    ) -> List[dict]:
+        """Filtered, sorted and projected task query, see DatabaseAPI.query_tasks."""
+        statement = _prepare_query(filters, sort, fields, offset, limit, after)
+        with _errors(DatabaseError, "Error querying tasks"):
+            return await self._run(self._reader(), _query_rows, statement)
+
+    @instrumented
+    @_routed_read
+    async def query_tasks_with_total(
+        self,
+        filters: Optional[Dict[str, object]] = None,
+        sort: Sequence[str] = (),
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        limit: int = 3,
+        after: Optional[Sequence] = None,
+    ) -> Tuple[List[dict], int]:
+        """Task query plus its total, see DatabaseAPI.query_tasks_with_total."""
+        statement = _prepare_query(filters, sort, fields, offset, limit, after)
+        filters = _query_filters(filters)
+        with _errors(DatabaseError, "Error querying tasks"):
+            return await self._run(self._reader(), _query_rows_with_total, statement, filters)
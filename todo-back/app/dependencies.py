@@ -1,30 +1,87 @@
+import time
+from typing import Tuple
+
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
-from app.database import DatabaseAPI
+from app.auth import PrincipalCache, decode_access_token
+from app.database import AsyncDatabaseAPI
+from app.events import EventBroker
+from app.metrics import AUTH_DURATION, REGISTRY, record_cache
 from app.models import Admin
-from app import settings
+from app.passwords import PasswordHasher
+from app.profiling import ProfileStore
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admins/auth")
 
-def get_current_admin(token: str = Depends(oauth2_scheme)) -> Admin:
+
+def get_db(request: Request) -> AsyncDatabaseAPI:
+    """AsyncDatabaseAPI bound to the process-wide engine created in the app lifespan."""
+    return request.app.state.db
+
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.app.state.password_hasher
+
+
+def get_principal_cache(request: Request) -> PrincipalCache:
+    return request.app.state.principals
+
+
+def get_event_broker(request: Request) -> EventBroker:
+    return request.app.state.events
+
+
+def get_profile_store(request: Request) -> ProfileStore:
+    """Profile artifacts; 404 while profiling is disabled."""
+    profiles = getattr(request.app.state, "profiles", None)
+    if profiles is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return profiles
+
+
+async def get_current_admin(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncDatabaseAPI = Depends(get_db),
+    principals: PrincipalCache = Depends(get_principal_cache),
+) -> Admin:
+    start = time.perf_counter()
+    source = "rejected"
+    try:
+        admin, source = await _authenticate(token, db, principals)
+        return admin
+    finally:
+        if REGISTRY.enabled:
+            AUTH_DURATION.observe(time.perf_counter() - start, source)
+
+
+async def _authenticate(
+    token: str, db: AsyncDatabaseAPI, principals: PrincipalCache
+) -> Tuple[Admin, str]:
+    """Resolve the bearer token to an admin; also says where it came from ("cache" or "db")."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        username = payload.get("sub")
-        if not isinstance(username, str):
+        payload = decode_access_token(token)
+        admin_id = payload.get("sub")
+        if not isinstance(admin_id, str):
             raise credentials_exception
-    except jwt.exceptions.DecodeError:
+    except jwt.exceptions.InvalidTokenError:
         raise credentials_exception
-    db = DatabaseAPI()
+    if principals.is_revoked(admin_id):
+        raise credentials_exception
+    admin = principals.get(admin_id)
+    record_cache("principal", admin is not None)
+    if admin is not None:
+        return admin, "cache"
     try:
-        admin = db.get_admin_by_username(username)
-        return admin
+        admin = await db.get_admin(admin_id)
     except Exception:
         raise credentials_exception
+    principals.put(admin)
+    return admin, "db"
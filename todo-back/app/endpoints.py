@@ -1,42 +1,125 @@
-import jwt
-from pydantic import HttpUrl
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from pydantic import BaseModel, HttpUrl, ValidationError
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Body,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import hashlib
 import traceback
-from typing import List
+from collections import Counter
+from typing import Any, List, Literal, Optional, Tuple, Type, Union
 
 from app.database import (
-    DatabaseAPI,
+    AsyncDatabaseAPI,
     DatabaseError,
     NotFoundError,
     UpdateError,
     DeleteError,
+    CursorError,
+    QueryError,
+    PoolSaturatedError,
+    query_order,
 )
 from app.schemas import (
     TaskCreate,
     TaskRead,
+    TaskPage,
+    TaskProjection,
+    TaskProjectionPage,
+    TaskBulkUpdate,
+    BulkItemResult,
+    BulkResult,
     AdminCreate,
     AdminRead,
     AdminAuth,
     TokenResponse,
+    ProfileInfo,
+    ProfileDetail,
 )
 from app.models import Task, Admin
-from app.dependencies import get_current_admin
-from app.utils import verify_password
+from app.auth import PrincipalCache, create_access_token
+from app.dependencies import (
+    get_current_admin,
+    get_db,
+    get_event_broker,
+    get_password_hasher,
+    get_principal_cache,
+    get_profile_store,
+)
+from app.passwords import PasswordHasher
+from app.errors import FeedFullError
+from app.events import EventBroker, Subscription
+from app.export import MEDIA_TYPES, encode_rows, gzip_chunks
+from app.responses import JSON, page_response, response_format, rows_response
+from app.utils import encode_cursor, decode_cursor
+from app.log import sampled_logger
+from app.metrics import CONTENT_TYPE, REGISTRY
+from app.profiling import ProfileArtifact, ProfileStore
 from app import logger, settings
 
 
 router = APIRouter()
 
-db = DatabaseAPI()
+CURSOR_DESCRIPTION = (
+    "Курсор следующей страницы (next_cursor из предыдущего ответа). "
+    "Пустое значение включает курсорную пагинацию с первой страницы"
+)
+
+TOTAL_DESCRIPTION = (
+    "Вернуть страницу в конверте {items, total, next_cursor} с общим числом задач, "
+    "чтобы не запрашивать /tasks/length отдельно"
+)
+
+
+async def not_modified(
+    request: Request, response: Response, db: AsyncDatabaseAPI, match_any: bool = True
+) -> Optional[Response]:
+    """
+    Attach a strong ETag built from the task table version and the request URL.
+    Returns a ready 304 response when the client's If-None-Match still matches,
+    so the handler can skip the database and serialization entirely.
+    Needs the cache layer, which owns the version counter; without it, or while its backend
+    is unavailable, no ETag is sent.
+    The negotiated response format is part of the tag, since each one is a different body.
+    `If-None-Match: *` means "any current representation", which a listing always has; routes
+    for a single resource pass match_any=False, since checking it exists needs the lookup.
+    """
+    version_tag = getattr(db, "version_tag", None)
+    tag = await version_tag() if version_tag is not None else None
+    if tag is None:
+        return None
+    media_type = response_format(request.headers.get("accept"))
+    url = f"{request.url.path}?{request.url.query}"
+    if media_type != JSON:
+        url = f"{url}#{media_type}"
+    digest = hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+    etag = f'"{tag}-{digest}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["Vary"] = "Accept"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or (match_any and "*" in candidates):
+            return Response(status_code=304, headers=dict(response.headers))
+    return None
 
 
 # --- Task CRUD ---
 @router.post("/task/", response_model=TaskRead)
-def create_task(task: TaskCreate):
-    logger.info(f"POST /task/ | payload: {task.model_dump()}")
+async def create_task(task: TaskCreate, db: AsyncDatabaseAPI = Depends(get_db)):
+    logger.info("POST /task/")
+    logger.opt(lazy=True).debug("POST /task/ | payload: {}", task.model_dump)
     try:
-        result = db.create_task(Task(**task.model_dump()))
-        logger.info(f"Task created: {result.id}")
+        result = await db.create_task(Task(**task.model_dump()))
+        logger.info("Task created: {}", result.id)
         return TaskRead(**result.model_dump())
     except DatabaseError as e:
         logger.error(str(e))
@@ -49,11 +132,19 @@ def create_task(task: TaskCreate):
 
 
 @router.get("/task/{task_id}", response_model=TaskRead)
-def get_task(task_id: str):
-    logger.info(f"GET /task/{task_id}")
+async def get_task(
+    task_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    log = sampled_logger(settings.log_sample_rate)
+    log.info("GET /task/{}", task_id)
     try:
-        result = db.get_task(task_id)
-        logger.info(f"Task fetched: {result.id}")
+        if cached := await not_modified(request, response, db, match_any=False):
+            return cached
+        result = await db.get_task(task_id)
+        log.info("Task fetched: {}", result.id)
         return TaskRead(**result.model_dump())
     except NotFoundError as e:
         logger.warning(str(e))
@@ -69,15 +160,19 @@ def get_task(task_id: str):
 
 
 @router.patch("/task/{task_id}", response_model=TaskRead)
-def update_task(task_id: str, data: TaskCreate, admin=Depends(get_current_admin)):
-    logger.info(
-        f"PATCH /task/{task_id} | admin: {admin.username} | payload: {data.model_dump()}"
-    )
+async def update_task(
+    task_id: str,
+    data: TaskCreate,
+    admin=Depends(get_current_admin),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    logger.info("PATCH /task/{} | admin: {}", task_id, admin.username)
+    logger.opt(lazy=True).debug("PATCH /task/{} | payload: {}", lambda: task_id, data.model_dump)
     try:
         update_data = data.model_dump()
         update_data['edited_by_admin'] = True
-        result = db.update_task(task_id, **update_data)
-        logger.info(f"Task updated: {result.id}")
+        result = await db.update_task(task_id, **update_data)
+        logger.info("Task updated: {}", result.id)
         return TaskRead(**result.model_dump())
     except NotFoundError as e:
         logger.warning(str(e))
@@ -93,11 +188,13 @@ def update_task(task_id: str, data: TaskCreate, admin=Depends(get_current_admin)
 
 
 @router.delete("/task/{task_id}")
-def delete_task(task_id: str, admin=Depends(get_current_admin)):
-    logger.info(f"DELETE /task/{task_id} | admin: {admin.username}")
+async def delete_task(
+    task_id: str, admin=Depends(get_current_admin), db: AsyncDatabaseAPI = Depends(get_db)
+):
+    logger.info("DELETE /task/{} | admin: {}", task_id, admin.username)
     try:
-        db.delete_task(task_id)
-        logger.info(f"Task deleted: {task_id}")
+        await db.delete_task(task_id)
+        logger.info("Task deleted: {}", task_id)
         return {"success": True}
     except NotFoundError as e:
         logger.warning(str(e))
@@ -112,14 +209,144 @@ def delete_task(task_id: str, admin=Depends(get_current_admin)):
         )
 
 
+# --- Bulk Task Operations ---
+def validate_bulk_items(
+    items: List[Any], schema: Type[BaseModel]
+) -> Tuple[List[Tuple[int, BaseModel]], List[BulkItemResult]]:
+    """Validate items one by one so a bad item is reported instead of failing the whole batch."""
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items: {len(items)} > {settings.bulk_max_items}",
+        )
+    valid, failed = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            )
+            failed.append(BulkItemResult(index=index, success=False, error=error))
+    return valid, failed
+
+
+def reject_duplicate_ids(
+    valid: List[Tuple[int, BaseModel]]
+) -> Tuple[List[Tuple[int, BaseModel]], List[BulkItemResult]]:
+    """Report every item whose id appears more than once: which of them should win is unclear."""
+    counts = Counter(item.id for _, item in valid)
+    unique, failed = [], []
+    for index, item in valid:
+        if counts[item.id] > 1:
+            error = f"Task id {item.id} appears more than once in the batch"
+            failed.append(BulkItemResult(index=index, id=item.id, success=False, error=error))
+        else:
+            unique.append((index, item))
+    return unique, failed
+
+
+def bulk_result(results: List[BulkItemResult]) -> BulkResult:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.success)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, items=results)
+
+
+@router.post("/tasks/bulk", response_model=BulkResult)
+async def create_tasks_bulk(
+    items: List[Any] = Body(...), db: AsyncDatabaseAPI = Depends(get_db)
+):
+    logger.info("POST /tasks/bulk | items: {}", len(items))
+    try:
+        valid, results = validate_bulk_items(items, TaskCreate)
+        tasks = [Task(**item.model_dump()) for _, item in valid]
+        await db.create_tasks(tasks)
+        results += [
+            BulkItemResult(index=index, id=task.id, success=True)
+            for (index, _), task in zip(valid, tasks)
+        ]
+        logger.info("Tasks created: {}, rejected: {}", len(tasks), len(items) - len(tasks))
+        return bulk_result(results)
+    except DatabaseError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
+
+
+@router.patch("/tasks/bulk", response_model=BulkResult)
+async def update_tasks_bulk(
+    items: List[Any] = Body(...),
+    admin=Depends(get_current_admin),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    logger.info("PATCH /tasks/bulk | admin: {} | items: {}", admin.username, len(items))
+    try:
+        valid, results = validate_bulk_items(items, TaskBulkUpdate)
+        valid, duplicates = reject_duplicate_ids(valid)
+        results += duplicates
+        updates = {
+            item.id: {**item.model_dump(exclude={"id"}), "edited_by_admin": True}
+            for _, item in valid
+        }
+        updated = set(await db.update_tasks(updates))
+        results += [
+            BulkItemResult(
+                index=index,
+                id=item.id,
+                success=item.id in updated,
+                error=None if item.id in updated else f"Task with id {item.id} not found",
+            )
+            for index, item in valid
+        ]
+        logger.info("Tasks updated: {}", len(updated))
+        return bulk_result(results)
+    except UpdateError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
+
+
+@router.delete("/tasks/bulk", response_model=BulkResult)
+async def delete_tasks_bulk(
+    task_ids: List[str] = Body(...),
+    admin=Depends(get_current_admin),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    logger.info("DELETE /tasks/bulk | admin: {} | items: {}", admin.username, len(task_ids))
+    try:
+        if len(task_ids) > settings.bulk_max_items:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many items: {len(task_ids)} > {settings.bulk_max_items}",
+            )
+        deleted = set(await db.delete_tasks(task_ids))
+        results = [
+            BulkItemResult(
+                index=index,
+                id=task_id,
+                success=task_id in deleted,
+                error=None if task_id in deleted else f"Task with id {task_id} not found",
+            )
+            for index, task_id in enumerate(task_ids)
+        ]
+        logger.info("Tasks deleted: {}", len(deleted))
+        return bulk_result(results)
+    except DeleteError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
+
+
 # --- Admin CRUD ---
 @router.post("/admins/", response_model=AdminRead)
-def create_admin(admin: AdminCreate):
-    logger.info(f"POST /admins/ | payload: {admin.model_dump()}")
+async def create_admin(admin: AdminCreate, db: AsyncDatabaseAPI = Depends(get_db)):
+    logger.info("POST /admins/ | username: {}", admin.username)
     try:
-        result = db.create_admin(Admin(**admin.model_dump()))
-        logger.info(f"Admin created: {result.username}")
+        result = await db.create_admin(Admin(**admin.model_dump()))
+        logger.info("Admin created: {}", result.username)
         return AdminRead(**result.model_dump())
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"}
+        )
     except DatabaseError as e:
         logger.error(str(e))
         raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
@@ -131,11 +358,16 @@ def create_admin(admin: AdminCreate):
 
 
 @router.delete("/admins/{admin_id}")
-def delete_admin(admin_id: str):
-    logger.info(f"DELETE /admins/{admin_id}")
+async def delete_admin(
+    admin_id: str,
+    db: AsyncDatabaseAPI = Depends(get_db),
+    principals: PrincipalCache = Depends(get_principal_cache),
+):
+    logger.info("DELETE /admins/{}", admin_id)
     try:
-        db.delete_admin(admin_id)
-        logger.info(f"Admin deleted: {admin_id}")
+        await db.delete_admin(admin_id)
+        principals.revoke(admin_id)
+        logger.info("Admin deleted: {}", admin_id)
         return {"success": True}
     except NotFoundError as e:
         logger.warning(str(e))
@@ -151,117 +383,334 @@ def delete_admin(admin_id: str):
 
 
 @router.post("/admins/auth", response_model=TokenResponse)
-def admin_login(auth_data: AdminAuth):
-    logger.info(f"POST /admins/auth | username: {auth_data.username}")
+async def admin_login(
+    auth_data: AdminAuth,
+    db: AsyncDatabaseAPI = Depends(get_db),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+):
+    logger.info("POST /admins/auth | username: {}", auth_data.username)
     try:
-        admin = db.get_admin_by_username(auth_data.username)
-        if not verify_password(auth_data.password, admin.password):
-            logger.warning(f"Failed login for {auth_data.username}")
+        admin = await db.get_admin_by_username(auth_data.username)
+        if not await hasher.verify(auth_data.password, admin.password):
+            logger.warning("Failed login for {}", auth_data.username)
             raise HTTPException(
                 status_code=401, detail="Incorrect username or password"
             )
-        token_data = {"sub": admin.username}
-        access_token = jwt.encode(
-            token_data, settings.jwt_secret_key, algorithm=settings.jwt_algorithm
-        )
-        logger.info(f"Admin {admin.username} authenticated successfully")
+        if hasher.needs_rehash(admin.password):
+            # The password is known only now, so this is the moment to move it to the new cost
+            try:
+                await db.update_admin_password(admin.id, await hasher.hash(auth_data.password))
+                logger.info("Password of {} rehashed with the current bcrypt cost", admin.username)
+            except (PoolSaturatedError, UpdateError) as e:
+                logger.warning("Rehash skipped for {}: {}", admin.username, e)
+        access_token = create_access_token(admin)
+        logger.info("Admin {} authenticated successfully", admin.username)
         return TokenResponse(access_token=access_token)
     except NotFoundError:
-        logger.warning(f"Failed login for {auth_data.username}")
+        logger.warning("Failed login for {}", auth_data.username)
         raise HTTPException(status_code=401, detail="Incorrect username or password")
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"}
+        )
 
 
 # --- Task Queries ---
-@router.get("/tasks/", response_model=List[TaskRead])
-def get_tasks_paginated(offset: int = Query(0), limit: int = Query(3)):
-    logger.info(f"GET /tasks/ | offset: {offset}, limit: {limit}")
-    try:
-        result = db.get_tasks_paginated(offset=offset, limit=limit)
-        logger.info(f"Fetched {len(result)} tasks (paginated)")
-        return [TaskRead(**task.model_dump()) for task in result]
-    except DatabaseError as e:
-        logger.error(str(e))
-        raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
-    except Exception as e:
-        logger.error(traceback.format_exc())
-        raise HTTPException(
-            status_code=500, detail="Unexpected error while getting tasks"
+def split_param(value: Optional[str]) -> List[str]:
+    """Comma-separated query parameter as a list; empty when not given."""
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+async def fetch_query(
+    db: AsyncDatabaseAPI,
+    filters: dict,
+    sort: List[str],
+    fields: Optional[List[str]],
+    offset: int,
+    limit: int,
+    cursor: Optional[str],
+    with_total: bool = False,
+) -> Tuple[List[dict], Optional[str], Optional[int]]:
+    """
+    Run a task query; returns its rows, the cursor of the row that ends the page and the total.
+    With a cursor (empty for the first page) it pages by keyset, ignoring `offset`.
+    The cursor is built only for envelope responses (cursor or `with_total`); the total, read in
+    the same database session as the page, only with `with_total`.
+    """
+    if cursor is None and not with_total:
+        rows = await db.query_tasks(filters, sort, fields, offset=offset, limit=limit)
+        return rows, None, None
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None:
+        offset = 0
+    # One extra row tells whether there is a next page without a second query
+    total = None
+    if with_total:
+        rows, total = await db.query_tasks_with_total(
+            filters, sort, fields, offset=offset, limit=limit + 1, after=after
         )
+    else:
+        rows = await db.query_tasks(filters, sort, fields, offset=offset, limit=limit + 1, after=after)
+    rows, has_more = rows[:limit], len(rows) > limit
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor([rows[-1][name] for name, _ in query_order(sort, filters)])
+    return rows, next_cursor, total
 
 
-@router.get("/tasks/sorted/username", response_model=List[TaskRead])
-def get_tasks_sorted_by_username(
-    offset: int = Query(0), 
-    limit: int = Query(3), 
-    reverse: bool = Query(False, description="Сортировка в обратном порядке")
-):
-    logger.info(f"GET /tasks/sorted/username | offset: {offset}, limit: {limit}, reverse: {reverse}")
+def page_fields(next_cursor: Optional[str], total: Optional[int], include_total: bool) -> dict:
+    """Envelope fields besides items; `total` stays unset, so out of the response, unless asked for."""
+    fields = {"next_cursor": next_cursor}
+    if include_total:
+        fields["total"] = total
+    return fields
+
+
+async def list_tasks(
+    request: Request,
+    response: Response,
+    db: AsyncDatabaseAPI,
+    sort_by: Optional[str],
+    offset: int,
+    limit: int,
+    reverse: bool,
+    cursor: Optional[str],
+    include_total: bool,
+) -> Union[List[TaskRead], TaskPage]:
+    """Task listing by id or by one key; a task query without filters."""
+    log = sampled_logger(settings.log_sample_rate)
+    route = f"/tasks/sorted/{sort_by}" if sort_by else "/tasks/"
+    log.info(
+        "GET {} | offset: {}, limit: {}, reverse: {}, cursor: {}, total: {}",
+        route, offset, limit, reverse, cursor, include_total,
+    )
     try:
-        result = db.get_tasks_sorted_by_username(offset=offset, limit=limit, reverse=reverse)
-        logger.info(f"Fetched {len(result)} tasks (sorted by username, reverse: {reverse})")
-        return [TaskRead(**task.model_dump()) for task in result]
+        if cached := await not_modified(request, response, db):
+            return cached
+        sort = [f"-{sort_by}" if reverse else sort_by] if sort_by else []
+        rows, next_cursor, total = await fetch_query(
+            db, {}, sort, None, offset, limit, cursor, include_total
+        )
+        log.info("Fetched {} tasks ({}, reverse: {})", len(rows), route, reverse)
+        envelope = cursor is not None or include_total
+        # Compact formats are always encoded straight from the rows
+        media_type = response_format(request.headers.get("accept"))
+        if settings.fast_json_responses or media_type != JSON:
+            headers = dict(response.headers)
+            if envelope:
+                page = page_fields(next_cursor, total, include_total)
+                return page_response(rows, page, headers, media_type)
+            return rows_response(rows, headers, media_type)
+        items = [TaskRead(**row) for row in rows]
+        if not envelope:
+            return items
+        return TaskPage(items=items, **page_fields(next_cursor, total, include_total))
+    except CursorError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except DatabaseError as e:
         logger.error(str(e))
         raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
     except Exception as e:
         logger.error(traceback.format_exc())
-        raise HTTPException(
-            status_code=500,
-            detail="Unexpected error while getting tasks sorted by username",
-        )
+        what = f"tasks sorted by {sort_by}" if sort_by else "tasks"
+        raise HTTPException(status_code=500, detail=f"Unexpected error while getting {what}")
+
+
+@router.get(
+    "/tasks/",
+    response_model=Union[List[TaskRead], TaskPage],
+    response_model_exclude_unset=True,
+)
+async def get_tasks_paginated(
+    request: Request,
+    response: Response,
+    offset: int = Query(0),
+    limit: int = Query(3),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(False, description=TOTAL_DESCRIPTION),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    return await list_tasks(request, response, db, None, offset, limit, False, cursor, include_total)
+
+
+@router.get(
+    "/tasks/sorted/username",
+    response_model=Union[List[TaskRead], TaskPage],
+    response_model_exclude_unset=True,
+)
+async def get_tasks_sorted_by_username(
+    request: Request,
+    response: Response,
+    offset: int = Query(0),
+    limit: int = Query(3),
+    reverse: bool = Query(False, description="Сортировка в обратном порядке"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(False, description=TOTAL_DESCRIPTION),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    return await list_tasks(
+        request, response, db, "username", offset, limit, reverse, cursor, include_total
+    )
+
+
+@router.get(
+    "/tasks/sorted/email",
+    response_model=Union[List[TaskRead], TaskPage],
+    response_model_exclude_unset=True,
+)
+async def get_tasks_sorted_by_email(
+    request: Request,
+    response: Response,
+    offset: int = Query(0),
+    limit: int = Query(3),
+    reverse: bool = Query(False, description="Сортировка в обратном порядке"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(False, description=TOTAL_DESCRIPTION),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    return await list_tasks(
+        request, response, db, "email", offset, limit, reverse, cursor, include_total
+    )
+
+
+@router.get(
+    "/tasks/sorted/status",
+    response_model=Union[List[TaskRead], TaskPage],
+    response_model_exclude_unset=True,
+)
+async def get_tasks_sorted_by_status(
+    request: Request,
+    response: Response,
+    offset: int = Query(0),
+    limit: int = Query(3),
+    reverse: bool = Query(False, description="Сортировка в обратном порядке"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(False, description=TOTAL_DESCRIPTION),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    return await list_tasks(
+        request, response, db, "status", offset, limit, reverse, cursor, include_total
+    )
 
 
-@router.get("/tasks/sorted/email", response_model=List[TaskRead])
-def get_tasks_sorted_by_email(
-    offset: int = Query(0), 
-    limit: int = Query(3), 
-    reverse: bool = Query(False, description="Сортировка в обратном порядке")
+@router.get(
+    "/tasks/query",
+    response_model=Union[List[TaskProjection], TaskProjectionPage],
+    response_model_exclude_unset=True,
+)
+async def query_tasks(
+    request: Request,
+    response: Response,
+    status: Optional[bool] = Query(None, description="Только задачи с этим статусом"),
+    username: Optional[str] = Query(None, description="Только задачи этого пользователя"),
+    email: Optional[str] = Query(None, description="Только задачи с этим email"),
+    edited_by_admin: Optional[bool] = Query(
+        None, description="Только задачи, отредактированные (или нет) администратором"
+    ),
+    sort: Optional[str] = Query(
+        None,
+        description="Поля сортировки через запятую, '-' перед полем — по убыванию: status,-username",
+    ),
+    fields: Optional[str] = Query(
+        None, description="Возвращаемые поля задачи через запятую; по умолчанию все"
+    ),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: bool = Query(False, description=TOTAL_DESCRIPTION),
+    db: AsyncDatabaseAPI = Depends(get_db),
 ):
-    logger.info(f"GET /tasks/sorted/email | offset: {offset}, limit: {limit}, reverse: {reverse}")
+    """Filter, sort and project tasks in one SQL query."""
+    log = sampled_logger(settings.log_sample_rate)
+    log.info("GET /tasks/query | {}", request.url.query)
+    filters = {
+        "status": status,
+        "username": username,
+        "email": email,
+        "edited_by_admin": edited_by_admin,
+    }
+    selected = split_param(fields) or None
     try:
-        result = db.get_tasks_sorted_by_email(offset=offset, limit=limit, reverse=reverse)
-        logger.info(f"Fetched {len(result)} tasks (sorted by email, reverse: {reverse})")
-        return [TaskRead(**task.model_dump()) for task in result]
+        if cached := await not_modified(request, response, db):
+            return cached
+        rows, next_cursor, total = await fetch_query(
+            db, filters, split_param(sort), selected, offset, limit, cursor, include_total
+        )
+        if selected is not None:
+            # Sort keys come along for the cursor; leave out those that weren't asked for
+            rows = [{name: row[name] for name in selected} for row in rows]
+        log.info("Fetched {} tasks (query)", len(rows))
+        envelope = cursor is not None or include_total
+        # Compact formats are always encoded straight from the rows
+        media_type = response_format(request.headers.get("accept"))
+        if settings.fast_json_responses or media_type != JSON:
+            headers = dict(response.headers)
+            if envelope:
+                page = page_fields(next_cursor, total, include_total)
+                return page_response(rows, page, headers, media_type)
+            return rows_response(rows, headers, media_type)
+        items = [TaskProjection(**row) for row in rows]
+        if not envelope:
+            return items
+        return TaskProjectionPage(items=items, **page_fields(next_cursor, total, include_total))
+    except (QueryError, CursorError) as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except DatabaseError as e:
         logger.error(str(e))
         raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
     except Exception as e:
         logger.error(traceback.format_exc())
         raise HTTPException(
-            status_code=500,
-            detail="Unexpected error while getting tasks sorted by email",
+            status_code=500, detail="Unexpected error while querying tasks"
         )
 
 
-@router.get("/tasks/sorted/status", response_model=List[TaskRead])
-def get_tasks_sorted_by_status(
-    offset: int = Query(0), 
-    limit: int = Query(3), 
-    reverse: bool = Query(False, description="Сортировка в обратном порядке")
+@router.get("/tasks/search", response_model=TaskPage, response_model_exclude_unset=True)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос по тексту, имени и email"),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    db: AsyncDatabaseAPI = Depends(get_db),
 ):
-    logger.info(f"GET /tasks/sorted/status | offset: {offset}, limit: {limit}, reverse: {reverse}")
+    """Ranked full-text search; every word matches as a prefix."""
+    log = sampled_logger(settings.log_sample_rate)
+    log.info("GET /tasks/search | q: {}, limit: {}, cursor: {}", q, limit, cursor)
     try:
-        result = db.get_tasks_sorted_by_status(offset=offset, limit=limit, reverse=reverse)
-        logger.info(f"Fetched {len(result)} tasks (sorted by status, reverse: {reverse})")
-        return [TaskRead(**task.model_dump()) for task in result]
+        after = decode_cursor(cursor) if cursor else None
+        found = await db.search_tasks(q, after=after, limit=limit + 1)
+        items, has_more = found[:limit], len(found) > limit
+        log.info("Found {} tasks", len(items))
+        return TaskPage(
+            items=[TaskRead(**task.model_dump()) for task, _ in items],
+            next_cursor=encode_cursor(items[-1][1]) if has_more else None,
+        )
+    except CursorError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except DatabaseError as e:
         logger.error(str(e))
         raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
     except Exception as e:
         logger.error(traceback.format_exc())
         raise HTTPException(
-            status_code=500,
-            detail="Unexpected error while getting tasks sorted by status",
+            status_code=500, detail="Unexpected error while searching tasks"
         )
 
 
 @router.get("/tasks", response_model=List[TaskRead])
-def get_all_tasks():
-    logger.info(f"GET /tasks")
+async def get_all_tasks(request: Request, db: AsyncDatabaseAPI = Depends(get_db)):
+    log = sampled_logger(settings.log_sample_rate)
+    log.info("GET /tasks")
     try:
-        result = db.get_all_tasks()
-        logger.info(f"Fetched {len(result)} tasks (all)")
-        return [TaskRead(**task.model_dump()) for task in result]
+        rows = await db.get_all_tasks()
+        log.info("Fetched {} tasks (all)", len(rows))
+        media_type = response_format(request.headers.get("accept"))
+        if settings.fast_json_responses or media_type != JSON:
+            return rows_response(rows, {}, media_type)
+        return [TaskRead(**row) for row in rows]
     except DatabaseError as e:
         logger.error(str(e))
         raise HTTPException(status_code=e.status_code, detail=f"Database error: {e}")
@@ -273,10 +722,14 @@ def get_all_tasks():
 
 
 @router.get("/tasks/length", response_model=int)
-def get_tasks_length():
-    logger.info("GET /tasks/length")
+async def get_tasks_length(
+    status: Optional[bool] = Query(None, description="Считать только задачи с этим статусом"),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    log = sampled_logger(settings.log_sample_rate)
+    log.info("GET /tasks/length | status: {}", status)
     try:
-        result = len(db.get_all_tasks())
+        result = await db.count_tasks(status=status)
         return result
     except DatabaseError as e:
         logger.error(str(e))
@@ -284,5 +737,170 @@ def get_tasks_length():
     except Exception as e:
         logger.error(traceback.format_exc())
         raise HTTPException(
-            status_code=500, detail="Unexpected error while getting all tasks"
+            status_code=500, detail="Unexpected error while counting tasks"
         )
+
+
+@router.get("/tasks/export")
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Формат выгрузки"),
+    gzip: bool = Query(False, description="Сжимать выгрузку gzip на лету"),
+    db: AsyncDatabaseAPI = Depends(get_db),
+):
+    """Stream every task row by row, so memory use doesn't grow with the table."""
+    logger.info("GET /tasks/export | format: {}, gzip: {}", format, gzip)
+    chunks = encode_rows(db.stream_task_rows(), format)
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+# --- Task Change Feed ---
+LAST_EVENT_ID_DESCRIPTION = (
+    "Id последнего полученного события, чтобы получить пропущенные. "
+    "EventSource при переподключении сам передаёт его заголовком Last-Event-ID"
+)
+
+# Milliseconds an EventSource waits before reconnecting after the stream ends
+SSE_RETRY_MS = 3000
+
+
+async def sse_frames(subscription: Subscription):
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+        async for event in subscription.events(settings.events_heartbeat_seconds):
+            # A comment line keeps proxies from closing an idle stream
+            yield event.sse if event is not None else b": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+@router.get("/tasks/events")
+async def task_events(
+    request: Request,
+    last_event_id: Optional[str] = Query(None, description=LAST_EVENT_ID_DESCRIPTION),
+    broker: EventBroker = Depends(get_event_broker),
+):
+    """
+    Server-Sent Events feed of task changes: `created`, `updated` and `deleted` events carry
+    the task (only its id when deleted); `reset` means missed events are gone, reload the list.
+    A client that falls too far behind is disconnected and resumes from its last event id.
+    """
+    resume = request.headers.get("last-event-id") or last_event_id
+    logger.info("GET /tasks/events | last event: {}", resume)
+    try:
+        subscription = broker.subscribe(resume)
+    except FeedFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=e.status_code, detail=str(e), headers={"Retry-After": "5"}
+        )
+    return StreamingResponse(
+        sse_frames(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/tasks/events/ws")
+async def task_events_ws(
+    websocket: WebSocket,
+    last_event_id: Optional[str] = Query(None, description=LAST_EVENT_ID_DESCRIPTION),
+):
+    """The task change feed over WebSocket: one JSON message per event, `ping` when idle."""
+    logger.info("WS /tasks/events/ws | last event: {}", last_event_id)
+    broker: EventBroker = websocket.app.state.events
+    try:
+        subscription = broker.subscribe(last_event_id)
+    except FeedFullError as e:
+        logger.warning(str(e))
+        await websocket.close(code=1013, reason=str(e))
+        return
+    await websocket.accept()
+    try:
+        async for event in subscription.events(settings.events_heartbeat_seconds):
+            await websocket.send_text(event.data if event is not None else '{"type":"ping"}')
+        if subscription.overflowed:
+            await websocket.close(code=1013, reason="Too far behind, resume from the last event")
+        else:
+            await websocket.close(code=1001)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
+
+# --- Metrics ---
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape target; 404 while metrics are disabled."""
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+# --- Profiling ---
+def profile_info(artifact: ProfileArtifact) -> ProfileInfo:
+    return ProfileInfo(
+        id=artifact.id,
+        method=artifact.method,
+        path=artifact.path,
+        status=artifact.status,
+        duration_ms=artifact.duration_ms,
+        created_at=artifact.created_at,
+        query_count=len(artifact.queries),
+    )
+
+
+def get_profile(profiles: ProfileStore, profile_id: str) -> ProfileArtifact:
+    artifact = profiles.get(profile_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return artifact
+
+
+@router.get("/profiles/", response_model=List[ProfileInfo])
+async def list_profiles(
+    admin=Depends(get_current_admin), profiles: ProfileStore = Depends(get_profile_store)
+):
+    """Profiled requests of this worker, newest first."""
+    return [profile_info(artifact) for artifact in profiles.list()]
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail)
+async def read_profile(
+    profile_id: str,
+    sort: Literal["cumulative", "tottime", "ncalls"] = Query(
+        "cumulative", description="Сортировка функций в отчёте профилировщика"
+    ),
+    limit: int = Query(40, ge=1, le=500, description="Количество функций в отчёте"),
+    admin=Depends(get_current_admin),
+    profiles: ProfileStore = Depends(get_profile_store),
+):
+    """pstats report and SQL log of one profiled request, with likely N+1 statements."""
+    artifact = get_profile(profiles, profile_id)
+    report = artifact.query_report(settings.profile_repeat_threshold)
+    return ProfileDetail(
+        **profile_info(artifact).model_dump(),
+        summary=artifact.summary(limit=limit, sort=sort),
+        query_total_ms=report["total_ms"],
+        repeated_queries=report["repeated"],
+        queries=report["queries"],
+    )
+
+
+@router.get("/profiles/{profile_id}/pstats")
+async def download_profile(
+    profile_id: str,
+    admin=Depends(get_current_admin),
+    profiles: ProfileStore = Depends(get_profile_store),
+):
+    """Raw cProfile dump, for pstats, snakeviz or a flame graph converter."""
+    artifact = get_profile(profiles, profile_id)
+    return Response(
+        content=artifact.stats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'},
+    )
@@ -20,3 +20,27 @@ class DeleteError(Exception):
     def __init__(self, message, status_code=500):
         super().__init__(message)
         self.status_code = status_code
+
+
+class CursorError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PoolSaturatedError(Exception):
+    def __init__(self, message, status_code=429):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class QueryError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FeedFullError(Exception):
+    def __init__(self, message, status_code=503):
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import secrets
+from collections import deque
+from typing import AsyncIterator, Deque, Iterable, List, Optional, Set
+
+from app.errors import FeedFullError
+from app.metrics import EVENT_SUBSCRIBERS, EVENT_SUBSCRIBERS_DROPPED, REGISTRY
+
+
+class TaskEvent:
+    """
+    One task change, encoded once (JSON `data` for WebSocket, a whole SSE frame for `sse`)
+    and sent as is to every subscriber.
+    """
+
+    __slots__ = ("id", "type", "data", "sse")
+
+    def __init__(self, event_id: str, type: str, task: Optional[dict]):
+        self.id = event_id
+        self.type = type
+        self.data = json.dumps({"id": event_id, "type": type, "task": task}, separators=(",", ":"))
+        self.sse = f"id: {event_id}\nevent: {type}\ndata: {self.data}\n\n".encode()
+
+
+class Subscription:
+    """
+    Events pending for one client. When more than `max_pending` pile up the client is too slow:
+    the subscription is closed as overflowed, and the client resumes from its last event id.
+    """
+
+    def __init__(self, broker: "EventBroker", max_pending: int):
+        self.broker = broker
+        self.max_pending = max_pending
+        self.overflowed = False
+        self.closed = False
+        self._pending: Deque[TaskEvent] = deque()
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: TaskEvent) -> None:
+        if self.closed:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.overflowed = True
+            self.close()
+            return
+        self._pending.append(event)
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._pending.clear()
+        self._wakeup.set()
+        self.broker._unsubscribe(self)
+
+    async def events(self, heartbeat: float) -> AsyncIterator[Optional[TaskEvent]]:
+        """Pending events as they arrive; None after `heartbeat` idle seconds. Ends once closed."""
+        while not self.closed:
+            if not self._pending:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+            while self._pending and not self.closed:
+                yield self._pending.popleft()
+
+
+class EventBroker:
+    """
+    In-process fan-out of task changes to feed subscribers.
+    Publishing only schedules the delivery on the event loop, so a write returns without waiting
+    on clients however many there are; delivery appends to a bounded history and to each
+    subscriber's queue. Event ids are "<boot>-<seq>": a client that reconnects
+    with its last id gets the events it missed from the history, or a "reset" event telling it
+    to refetch when they are gone (history overrun, or a restarted process).
+    Subscribers only see writes made by this process; with several workers, point clients that
+    need every change at one worker or put a shared bus behind the broker.
+    """
+
+    def __init__(self, history_size: int, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.boot = secrets.token_hex(4)
+        self.sequence = 0
+        self._history: Deque[TaskEvent] = deque(maxlen=history_size)
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        EVENT_SUBSCRIBERS.function = lambda: len(self._subscriptions)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, type: str, tasks: Iterable[dict]) -> None:
+        """
+        Record one event per task, delivered on the subscribers' event loop right after the
+        caller yields to it. Safe to call from any thread.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # No subscriber loop (yet): only the history needs the events
+            self._deliver(type, tasks)
+        elif _running_in(loop):
+            loop.call_soon(self._deliver, type, tasks)
+        else:
+            loop.call_soon_threadsafe(self._deliver, type, tasks)
+
+    def _deliver(self, type: str, tasks: List[dict]) -> None:
+        for task in tasks:
+            self.sequence += 1
+            event = TaskEvent(f"{self.boot}-{self.sequence}", type, task)
+            self._history.append(event)
+            for subscription in list(self._subscriptions):
+                subscription.push(event)
+                if subscription.overflowed and REGISTRY.enabled:
+                    EVENT_SUBSCRIBERS_DROPPED.inc("overflow")
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        New subscription; with `last_event_id` it starts with the events published after it.
+        Raises FeedFullError when `max_subscribers` are already connected.
+        """
+        if len(self._subscriptions) >= self.max_subscribers:
+            if REGISTRY.enabled:
+                EVENT_SUBSCRIBERS_DROPPED.inc("full")
+            raise FeedFullError("Too many event feed subscribers")
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, self.queue_size)
+        if last_event_id:
+            for event in self._missed(last_event_id):
+                subscription._pending.append(event)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def _missed(self, last_event_id: str) -> List[TaskEvent]:
+        boot, _, sequence = last_event_id.partition("-")
+        if boot == self.boot and sequence.isdigit():
+            sequence = int(sequence)
+            oldest = self.sequence - len(self._history)
+            if oldest <= sequence <= self.sequence:
+                return list(self._history)[sequence - oldest:]
+        # Missed events are no longer known: the client has to reload what it shows
+        return [TaskEvent(f"{self.boot}-{self.sequence}", "reset", None)]
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def close(self) -> None:
+        """End every subscription, so open streams finish on shutdown."""
+        for subscription in list(self._subscriptions):
+            subscription.close()
+
+
+def _running_in(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+__all__ = ["EventBroker", "Subscription", "TaskEvent"]
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator
+
+from app.schemas import TaskRead
+
+
+EXPORT_FIELDS = list(TaskRead.model_fields)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Flush serialized rows once this many bytes are buffered
+CHUNK_BYTES = 64 * 1024
+
+
+async def encode_rows(rows: AsyncIterator[dict], format: str) -> AsyncIterator[bytes]:
+    """Serialize rows one by one into NDJSON or CSV, yielding ~64 KB chunks."""
+    buffer = io.StringIO()
+    writer = None
+    if format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    async for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps({field: row[field] for field in EXPORT_FIELDS}))
+            buffer.write("\n")
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly into a single gzip member."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+__all__ = ["encode_rows", "gzip_chunks", "MEDIA_TYPES"]
@@ -0,0 +1,67 @@
+import random
+import sys
+from typing import TextIO
+
+from loguru import logger
+
+
+CONSOLE_FORMAT = "{time:DD.MM.YY — HH:mm:ss} | <level>{level}</level> | <yellow>{file}</yellow> : <cyan>{line}</cyan> | {message}"
+FILE_FORMAT = "{time:DD.MM.YY — HH:mm:ss} | {level} | {file}:{line} | {message}"
+
+
+def configure_logging(config, stream: TextIO = sys.stdout) -> None:
+    """
+    Install the console and file sinks.
+    With `log_enqueue` records go through a queue to a background writer thread, so handlers
+    never wait on stdout or disk; `log_json` writes one JSON object per record instead of text.
+    """
+    logger.remove()
+    if not config.log_enabled:
+        return
+    logger.add(
+        sink=stream,
+        level=config.log_level,
+        colorize=not config.log_json,
+        format=CONSOLE_FORMAT,
+        serialize=config.log_json,
+        enqueue=config.log_enqueue,
+    )
+    if config.log_file:
+        logger.add(
+            config.log_file,
+            rotation="10 MB",
+            retention="2 days",
+            compression="zip",
+            level=config.log_level,
+            format=FILE_FORMAT,
+            serialize=config.log_json,
+            enqueue=config.log_enqueue,
+        )
+
+
+class _MutedLogger:
+    """Stands in for the logger on requests left out of the sample; every call is a no-op."""
+
+    def _noop(self, *args, **kwargs) -> None:
+        pass
+
+    debug = info = success = _noop
+
+    def opt(self, *args, **kwargs) -> "_MutedLogger":
+        return self
+
+
+MUTED = _MutedLogger()
+
+
+def sampled_logger(rate: float):
+    """
+    Logger for routine messages of hot read endpoints: only a `rate` share of requests gets
+    the real one. Warnings and errors should always go to `logger` directly.
+    """
+    if rate >= 1 or random.random() < rate:
+        return logger
+    return MUTED
+
+
+__all__ = ["configure_logging", "sampled_logger"]
@@ -0,0 +1,357 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Seconds; covers a cached read (~0.1 ms) up to a slow bulk write
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (0, 1, 3, 10, 30, 100, 300, 1000, 3000, 10000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Base of a metric family: one series per combination of label values."""
+
+    type: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """Gauge set directly, or read from `function` at scrape time when one is given."""
+
+    type = "gauge"
+
+    def __init__(self, *args, function: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.function = function
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> List[str]:
+        if self.function is not None:
+            return [f"{self.name} {_number(self.function())}"]
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; buckets are upper bounds, `+Inf` is implied."""
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-local set of metrics rendered in the Prometheus text format.
+    Every recording site checks `enabled` first, so disabled metrics cost one attribute lookup.
+    Off until the app's lifespan sets it from settings, so importing metrics reads no settings.
+    Values are per worker process; Prometheus sums them across targets.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being served")
+
+DB_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Database API call latency by method", ("method",)
+)
+DB_ROWS = REGISTRY.histogram(
+    "db_query_rows", "Rows returned or written per database API call", ("method",), buckets=ROW_BUCKETS
+)
+DB_ERRORS = REGISTRY.counter(
+    "db_query_errors_total", "Database API calls that raised, by exception type", ("method", "error")
+)
+DB_POOL_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool, including waiting"
+)
+DB_POOL_CHECKED_OUT = REGISTRY.gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool", function=lambda: 0
+)
+
+DB_READS = REGISTRY.counter(
+    "db_reads_total",
+    "Routed reads by where they ran: replica, primary, or fallback (primary after a replica failed)",
+    ("target",),
+)
+DB_REPLICAS_HEALTHY = REGISTRY.gauge(
+    "db_replicas_healthy", "Read replicas currently taking reads", function=lambda: 0
+)
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Read cache lookups by kind and result (hit/miss)", ("kind", "result")
+)
+
+ADMISSION_SHED = REGISTRY.counter(
+    "admission_shed_total",
+    "Requests turned away by admission control, by route class and reason",
+    ("route_class", "reason"),
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "admission_wait_seconds", "Time admitted requests queued for a slot, by route class", ("route_class",)
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "admission_in_flight", "Requests holding a slot, by route class", ("route_class",)
+)
+
+AUTH_DURATION = REGISTRY.histogram(
+    "auth_duration_seconds", "Bearer token verification time by principal source", ("source",)
+)
+
+EVENT_SUBSCRIBERS = REGISTRY.gauge(
+    "event_subscribers", "Clients connected to the task change feed", function=lambda: 0
+)
+EVENT_SUBSCRIBERS_DROPPED = REGISTRY.counter(
+    "event_subscribers_dropped_total",
+    "Feed clients dropped for falling behind (overflow) or turned away (full)",
+    ("reason",),
+)
+
+
+def _row_count(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, tuple):
+        # (rows, total) from query_tasks_with_total: the rows are what was read
+        rows, _ = result
+        return len(rows)
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def instrumented(func):
+    """
+    Record latency, row count and errors of a database API method under its name.
+    Works on both sync and async methods; a no-op pass-through while metrics are disabled.
+    """
+    name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                DB_ERRORS.inc(name, type(e).__name__)
+                raise
+            finally:
+                DB_DURATION.observe(time.perf_counter() - start, name)
+            DB_ROWS.observe(_row_count(result), name)
+            return result
+
+        return wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not REGISTRY.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            DB_ERRORS.inc(name, type(e).__name__)
+            raise
+        finally:
+            DB_DURATION.observe(time.perf_counter() - start, name)
+        DB_ROWS.observe(_row_count(result), name)
+        return result
+
+    return wrapper
+
+
+def instrument_pool(pool) -> None:
+    """Time every connection checkout of `pool` and expose how many connections are out."""
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+    checkedout = getattr(pool, "checkedout", None)
+    if checkedout is not None:
+        DB_POOL_CHECKED_OUT.function = checkedout
+
+
+def record_cache(kind: str, hit: bool) -> None:
+    if REGISTRY.enabled:
+        CACHE_REQUESTS.inc(kind, "hit" if hit else "miss")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every request by method and route template (`/task/{task_id}`,
+    not the raw path, to keep label cardinality bounded) and counting requests in flight.
+    Only installed when metrics are enabled.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            HTTP_DURATION.observe(elapsed, method, path)
+            HTTP_REQUESTS.inc(method, path, str(status_code))
+
+
+__all__ = [
+    "REGISTRY",
+    "CONTENT_TYPE",
+    "MetricsRegistry",
+    "MetricsMiddleware",
+    "instrumented",
+    "instrument_pool",
+    "record_cache",
+]
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    select,
+)
+from sqlalchemy.engine import Connection
+
+from app.models import Task, TaskCount
+from app import logger
+
+
+Migration = Tuple[int, str, Callable[[Connection], None]]
+
+MIGRATIONS: List[Migration] = []
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def migration(version: int, description: str):
+    """Register a schema change. Versions are applied once, in ascending order."""
+
+    def decorator(func: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        MIGRATIONS.append((version, description, func))
+        return func
+
+    return decorator
+
+
+@migration(1, "Composite indexes for sortable task columns")
+def add_task_sort_indexes(connection: Connection) -> None:
+    for index in Task.__table__.indexes:
+        if index.name in ("ix_task_username_id", "ix_task_email_id", "ix_task_status_id"):
+            index.create(connection, checkfirst=True)
+
+
+@migration(2, "Per-status task counters")
+def seed_task_counts(connection: Connection) -> None:
+    TaskCount.__table__.create(connection, checkfirst=True)
+    counts = dict(
+        connection.execute(select(Task.status, func.count()).group_by(Task.status)).all()
+    )
+    connection.execute(TaskCount.__table__.delete())
+    connection.execute(
+        TaskCount.__table__.insert(),
+        [{"status": status, "count": counts.get(status, 0)} for status in (False, True)],
+    )
+
+
+# Search index: task_search gives every task a stable integer key (an explicit INTEGER PRIMARY KEY
+# survives VACUUM, task's implicit rowid doesn't) and task_fts indexes text, username and email
+# under that key. Triggers register new tasks and drop deleted ones from the index.
+# New and edited tasks are (re)indexed by DatabaseAPI writes, not by triggers: FTS5 flushes its
+# pending terms at every statement savepoint, so a per-row trigger makes an executemany of N rows
+# write N tiny index segments (bulk inserts and updates ~10x slower at 100k rows).
+SEARCH_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS task_search ("
+    " position INTEGER PRIMARY KEY, task_id VARCHAR NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    " text, username, email, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6')",
+    "CREATE TRIGGER IF NOT EXISTS task_search_insert AFTER INSERT ON task BEGIN"
+    " INSERT INTO task_search (task_id) VALUES (new.id);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS task_search_delete AFTER DELETE ON task BEGIN"
+    " DELETE FROM task_fts WHERE rowid = (SELECT position FROM task_search WHERE task_id = old.id);"
+    " DELETE FROM task_search WHERE task_id = old.id;"
+    " END",
+)
+
+# Index every registered task above the highest indexed key. Keys only grow (a deleted top key is
+# reused only after its index row is gone), so the unindexed tasks are always this suffix.
+# Rows go in key order: FTS5 flushes its pending terms whenever a rowid arrives out of order.
+INDEX_NEW_TASKS = (
+    "INSERT INTO task_fts (rowid, text, username, email)"
+    " SELECT task_search.position, task.text, task.username, task.email"
+    " FROM task_search JOIN task ON task.id = task_search.task_id"
+    " WHERE task_search.position >"
+    " coalesce((SELECT rowid FROM task_fts ORDER BY rowid DESC LIMIT 1), 0)"
+    " ORDER BY task_search.position"
+)
+
+
+@migration(3, "Full-text search index on task text, username and email (SQLite FTS5)")
+def add_task_search(connection: Connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in SEARCH_SCHEMA:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql("INSERT INTO task_search (task_id) SELECT id FROM task ORDER BY rowid")
+    connection.exec_driver_sql(INDEX_NEW_TASKS)
+
+
+@migration(4, "Composite indexes for status-filtered task queries")
+def add_task_query_indexes(connection: Connection) -> None:
+    for index in Task.__table__.indexes:
+        if index.name in ("ix_task_status_username_id", "ix_task_status_email_id"):
+            index.create(connection, checkfirst=True)
+
+
+def apply_migrations(connection: Connection) -> int:
+    """
+    Bring an existing database up to date within the caller's transaction.
+    `SQLModel.metadata.create_all` creates missing tables only and never alters existing ones,
+    so indexes and other changes to old databases are applied here. Returns the schema version.
+    """
+    schema_version.create(connection, checkfirst=True)
+    applied = set(connection.scalars(select(schema_version.c.version)))
+    for version, description, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}: {description}")
+        func(connection)
+        connection.execute(
+            schema_version.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.now(timezone.utc),
+            )
+        )
+        applied.add(version)
+    return max(applied, default=0)
+
+
+def run_migrations(engine: Engine) -> int:
+    """Apply pending migrations in one transaction on a sync engine."""
+    with engine.begin() as connection:
+        return apply_migrations(connection)
+
+
+__all__ = ["run_migrations", "apply_migrations", "migration", "INDEX_NEW_TASKS"]
@@ -1,8 +1,19 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table
 from shortuuid import uuid
 
 
 class Task(SQLModel, table=True):
+    # `id` is the tie-breaker of every sort, so each index covers ORDER BY <field>, id.
+    # The status-prefixed pairs serve "tasks with this status, by username/email" (query_tasks)
+    __table_args__ = (
+        Index("ix_task_username_id", "username", "id"),
+        Index("ix_task_email_id", "email", "id"),
+        Index("ix_task_status_id", "status", "id"),
+        Index("ix_task_status_username_id", "status", "username", "id"),
+        Index("ix_task_status_email_id", "status", "email", "id"),
+    )
+
     id: str = Field(default_factory=uuid, primary_key=True)
     username: str = Field(
         min_length=2,
@@ -18,3 +29,19 @@ class Admin(SQLModel, table=True):
     id: str = Field(default_factory=uuid, primary_key=True)
     username: str = Field(min_length=2, max_length=30, unique=True)
     password: str = Field(min_length=3)
+
+
+class TaskCount(SQLModel, table=True):
+    # Kept in step with `task` by DatabaseAPI writes, so counting is a two-row read
+    status: bool = Field(primary_key=True)
+    count: int = Field(default=0)
+
+
+# Key of each task in the SQLite full-text index (task_fts rowid). Created and kept up to date
+# by migration 3 and its triggers, so it lives outside SQLModel.metadata and create_all.
+task_search = Table(
+    "task_search",
+    MetaData(),
+    Column("position", Integer, primary_key=True),
+    Column("task_id", String, nullable=False, unique=True),
+)
@@ -0,0 +1,52 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+from app.errors import PoolSaturatedError
+from app.utils import get_password_hash, password_needs_rehash, set_bcrypt_rounds, verify_password
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a dedicated process pool, so a burst of logins
+    uses its own CPUs instead of the GIL and the request threadpool.
+    At most `max_pending` operations may be queued or running; beyond that callers get
+    PoolSaturatedError (429) instead of waiting.
+    Workers start on first use and are handed the bcrypt cost, so they skip loading settings.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        # spawn: forking a process that already runs an event loop and DB pools is unsafe
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=set_bcrypt_rounds,
+            initargs=(rounds,),
+        )
+
+    async def _run(self, func: Callable, *args):
+        if self.pending >= self.max_pending:
+            raise PoolSaturatedError("Too many password operations in progress, retry later")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return password_needs_rehash(hashed_password)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ["PasswordHasher"]
@@ -0,0 +1,221 @@
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import re
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import jwt
+from sqlalchemy import Engine, event
+
+from app.auth import decode_access_token
+from app.config import Settings
+
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Queries of the request being profiled; None outside a profiled request
+_query_log: ContextVar[Optional[List["QueryRecord"]]] = ContextVar("query_log", default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration_ms: float
+    rows: int
+
+
+@dataclass
+class ProfileArtifact:
+    """One profiled request: cProfile stats plus every SQL statement it ran."""
+
+    id: str
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    created_at: float
+    stats: bytes
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    def summary(self, limit: int = 40, sort: str = "cumulative") -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile(), stream=stream)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def query_report(self, repeat_threshold: int) -> dict:
+        """
+        Query totals, plus statements that ran at least `repeat_threshold` times with only their
+        literals differing: the shape of an N+1 loop.
+        """
+        shapes = Counter(_LITERALS.sub("?", query.statement) for query in self.queries)
+        return {
+            "count": len(self.queries),
+            "total_ms": round(sum(query.duration_ms for query in self.queries), 3),
+            "repeated": [
+                {"statement": statement, "count": count}
+                for statement, count in shapes.most_common()
+                if count >= repeat_threshold
+            ],
+            "queries": [vars(query) for query in self.queries],
+        }
+
+    def _profile(self) -> "_LoadedStats":
+        return _LoadedStats(marshal.loads(self.stats))
+
+
+class _LoadedStats:
+    """Adapter letting pstats.Stats read a stats dict that was dumped with marshal."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class ProfileStore:
+    """Last `max_size` profile artifacts of this process, oldest dropped first."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._artifacts: "OrderedDict[str, ProfileArtifact]" = OrderedDict()
+
+    def add(self, artifact: ProfileArtifact) -> None:
+        self._artifacts[artifact.id] = artifact
+        while len(self._artifacts) > self.max_size:
+            self._artifacts.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[ProfileArtifact]:
+        return self._artifacts.get(profile_id)
+
+    def list(self) -> List[ProfileArtifact]:
+        return list(reversed(self._artifacts.values()))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _query_log.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _query_log.get()
+    if queries is None:
+        return
+    started = conn.info["profile_query_start"].pop()
+    queries.append(
+        QueryRecord(
+            statement=statement,
+            duration_ms=round((time.perf_counter() - started) * 1000, 3),
+            rows=cursor.rowcount,
+        )
+    )
+
+
+def install_query_log() -> None:
+    """Hook every engine's cursor execution; statements are only recorded inside profiled requests."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    """
+    Runs selected requests under cProfile and records their SQL statements.
+    A request is profiled when it sends `X-Profile: 1` with a valid admin bearer token, or
+    when it falls into the `profile_sample_rate` share. The artifact id is returned in the
+    `X-Profile-Id` response header and the artifact is kept in `app.state.profiles`.
+    cProfile follows the event loop thread, so coroutines of concurrent requests that run
+    meanwhile show up in the stats too; only one request is profiled at a time.
+    """
+
+    def __init__(self, app, config: Settings):
+        self.app = app
+        self.sample_rate = config.profile_sample_rate
+        self._busy = False
+
+    def _requested_by_admin(self, scope) -> bool:
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER.encode()) not in (b"1", b"true"):
+            return False
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            admin_id = decode_access_token(token).get("sub")
+        except jwt.exceptions.InvalidTokenError:
+            return False
+        principals = getattr(scope["app"].state, "principals", None)
+        return isinstance(admin_id, str) and not (principals and principals.is_revoked(admin_id))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy:
+            await self.app(scope, receive, send)
+            return
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not (sampled or self._requested_by_admin(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER.lower().encode(), profile_id.encode()),
+                ]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler owns the interpreter (e.g. the server runs under one)
+            await self.app(scope, receive, send)
+            return
+        self._busy = True
+        queries: List[QueryRecord] = []
+        token = _query_log.set(queries)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            _query_log.reset(token)
+            self._busy = False
+            profiler.create_stats()
+            scope["app"].state.profiles.add(
+                ProfileArtifact(
+                    id=profile_id,
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=round(duration_ms, 3),
+                    created_at=time.time(),
+                    stats=marshal.dumps(profiler.stats),
+                    queries=queries,
+                )
+            )
+
+
+__all__ = [
+    "ProfileArtifact",
+    "ProfileStore",
+    "ProfilingMiddleware",
+    "install_query_log",
+]
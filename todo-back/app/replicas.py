@@ -0,0 +1,193 @@
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.metrics import DB_REPLICAS_HEALTHY, REGISTRY
+from app import logger
+
+
+# Sent with every response to a request that wrote; a client echoes it back so that its reads
+# go to the primary until then and see its own writes despite replication lag
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+
+
+class _RequestState:
+    __slots__ = ("primary", "wrote")
+
+    def __init__(self, primary: bool):
+        self.primary = primary
+        self.wrote = False
+
+
+# Read routing of the request being served; None outside a request (scripts, benchmarks)
+_request: ContextVar[Optional[_RequestState]] = ContextVar("read_routing", default=None)
+
+
+def reads_from_primary() -> bool:
+    """Whether the current request must read from the primary to see its client's writes."""
+    state = _request.get()
+    return state is not None and state.primary
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Send the reads made inside the block to the primary, in a request or outside one."""
+    token = _request.set(_RequestState(primary=True))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def mark_write() -> None:
+    """Note a write in the current request: its later reads and the client's next ones go to the primary."""
+    state = _request.get()
+    if state is not None:
+        state.primary = True
+        state.wrote = True
+
+
+class Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        # monotonic time until which the replica gets no reads; 0 while healthy
+        self.down_until = 0.0
+
+
+class ReplicaSet:
+    """
+    Read replicas taken round-robin. A replica that fails a read or a health check gets no
+    reads for `retry_after` seconds and is then tried again; while none is healthy, reads go
+    to the primary. Holds sync or async engines, matching the API that owns it.
+    """
+
+    def __init__(self, engines: Sequence, retry_after: float):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.retry_after = retry_after
+        self._order = itertools.cycle(self.replicas)
+        self._checker: Optional[asyncio.Task] = None
+        if REGISTRY.enabled:
+            DB_REPLICAS_HEALTHY.function = lambda: len(self.healthy())
+
+    def healthy(self) -> List[Replica]:
+        now = time.monotonic()
+        return [replica for replica in self.replicas if replica.down_until <= now]
+
+    def pick(self) -> Optional[Replica]:
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            replica = next(self._order)
+            if replica.down_until <= now:
+                return replica
+        return None
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        if replica.down_until == 0:
+            logger.warning("Read replica {} is down, its reads go elsewhere: {}", replica.name, error)
+        replica.down_until = time.monotonic() + self.retry_after
+
+    def mark_up(self, replica: Replica) -> None:
+        if replica.down_until:
+            logger.info("Read replica {} is back", replica.name)
+            replica.down_until = 0.0
+
+    def check(self) -> None:
+        """Probe every replica with SELECT 1 (sync engines)."""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception as e:
+                self.mark_down(replica, e)
+            else:
+                self.mark_up(replica)
+
+    async def check_async(self) -> None:
+        """Probe every replica with SELECT 1 (async engines)."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except Exception as e:
+                self.mark_down(replica, e)
+            else:
+                self.mark_up(replica)
+
+    def start(self, interval: float) -> None:
+        """Health-check the (async) replicas every `interval` seconds in the background."""
+        if self._checker is None:
+            self._checker = asyncio.create_task(self._run_checks(interval))
+
+    async def close(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            try:
+                await self._checker
+            except asyncio.CancelledError:
+                pass
+            self._checker = None
+
+    async def _run_checks(self, interval: float) -> None:
+        while True:
+            await self.check_async()
+            await asyncio.sleep(interval)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware giving each request its read routing. A request carrying an unexpired
+    X-Primary-Until reads from the primary; a request that wrote answers with a new one,
+    `window` seconds ahead. Values further ahead than `window` are ignored, so a client cannot
+    pin itself to the primary for good. Only installed when replicas are configured.
+    """
+
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+
+    def _pinned(self, scope) -> bool:
+        value = Headers(scope=scope).get(PRIMARY_UNTIL_HEADER)
+        if value is None:
+            return False
+        try:
+            until = float(value)
+        except ValueError:
+            return False
+        now = time.time()
+        return now < until <= now + self.window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = _RequestState(primary=self._pinned(scope))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                headers = MutableHeaders(scope=message)
+                headers.append(PRIMARY_UNTIL_HEADER, f"{time.time() + self.window:.3f}")
+            await send(message)
+
+        token = _request.set(state)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request.reset(token)
+
+
+__all__ = [
+    "PRIMARY_UNTIL_HEADER",
+    "Replica",
+    "ReplicaSet",
+    "ReadYourWritesMiddleware",
+    "mark_write",
+    "primary_reads",
+    "reads_from_primary",
+]
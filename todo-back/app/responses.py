@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from typing_extensions import NotRequired, TypedDict
+
+from app.utils import parse_qvalues
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON = "application/json"
+# {"id": [...], "username": [...], ...}: field names once per page instead of once per task
+COLUMNAR = "application/vnd.todo.columnar+json"
+MSGPACK = "application/msgpack"
+
+# Offered in this order when the client rates several equally; msgpack only when installed
+RESPONSE_FORMATS = (JSON, COLUMNAR) + ((MSGPACK,) if msgpack is not None else ())
+
+
+class TaskRow(TypedDict, total=False):
+    """A task row as `query_tasks` returns it; projections carry only some of the keys."""
+    id: str
+    username: str
+    email: str
+    text: str
+    status: bool
+    edited_by_admin: bool
+
+
+class TaskRowPage(TypedDict):
+    items: List[TaskRow]
+    total: NotRequired[int]
+    next_cursor: Optional[str]
+
+
+# Built once: serializing through a ready core schema skips model construction and validation
+_ROWS = TypeAdapter(List[TaskRow])
+_PAGE = TypeAdapter(TaskRowPage)
+
+
+def response_format(accept: Optional[str]) -> str:
+    """
+    Media type to answer with, from the Accept header: the supported type the client rates
+    highest, directly or through `type/*` and `*/*`; JSON when it rates none of them above 0.
+    """
+    ratings = parse_qvalues(accept)
+    if "application/x-msgpack" in ratings:
+        ratings.setdefault(MSGPACK, ratings["application/x-msgpack"])
+    best, best_quality = JSON, 0.0
+    for media_type in RESPONSE_FORMATS:
+        wildcard = ratings.get(media_type.split("/")[0] + "/*", ratings.get("*/*", 0.0))
+        quality = ratings.get(media_type, wildcard)
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def _columns(rows: Sequence[dict]) -> Dict[str, list]:
+    """Rows as parallel arrays; every row of a page has the same keys."""
+    if not rows:
+        return {}
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+def _vary(headers: Dict[str, str]) -> Dict[str, str]:
+    """Response headers marked as depending on Accept, unless the ETag code already did."""
+    if any(name.lower() == "vary" for name in headers):
+        return headers
+    return {**headers, "Vary": "Accept"}
+
+
+def rows_response(
+    rows: Sequence[dict], headers: Dict[str, str], media_type: str = JSON
+) -> Response:
+    """
+    List of task rows, encoded straight to bytes in the negotiated `media_type`. The rows come
+    from the database, which only holds validated tasks, so the route's response_model is
+    documentation here only.
+    """
+    if media_type == JSON:
+        body = _ROWS.dump_json(rows)
+    elif media_type == COLUMNAR:
+        body = to_json(_columns(rows))
+    else:
+        body = msgpack.packb(list(rows))
+    return Response(body, media_type=media_type, headers=_vary(headers))
+
+
+def page_response(
+    rows: Sequence[dict], page: dict, headers: Dict[str, str], media_type: str = JSON
+) -> Response:
+    """Envelope {items, total, next_cursor} of task rows; `page` holds the fields besides items."""
+    if media_type == JSON:
+        body = _PAGE.dump_json({"items": rows, **page})
+    elif media_type == COLUMNAR:
+        body = to_json({"items": _columns(rows), **page})
+    else:
+        body = msgpack.packb({"items": list(rows), **page})
+    return Response(body, media_type=media_type, headers=_vary(headers))
+
+
+__all__ = [
+    "TaskRow",
+    "JSON",
+    "COLUMNAR",
+    "MSGPACK",
+    "RESPONSE_FORMATS",
+    "response_format",
+    "rows_response",
+    "page_response",
+]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 
 class TaskCreate(BaseModel):
     username: str = Field(..., min_length=2, max_length=30)
@@ -16,6 +16,41 @@ class TaskRead(BaseModel):
     status: bool
     edited_by_admin: bool
 
+class TaskPage(BaseModel):
+    items: List[TaskRead]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class TaskProjection(BaseModel):
+    """A task reduced to the fields a query asked for."""
+    id: Optional[str] = None
+    username: Optional[str] = None
+    email: Optional[str] = None
+    text: Optional[str] = None
+    status: Optional[bool] = None
+    edited_by_admin: Optional[bool] = None
+
+class TaskProjectionPage(BaseModel):
+    items: List[TaskProjection]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class TaskBulkUpdate(TaskCreate):
+    id: str
+    # Replaces the stored value, so an explicit null is an error rather than a NULL status
+    status: bool = False
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BulkItemResult]
+
 class AdminCreate(BaseModel):
     username: str = Field(..., min_length=2, max_length=30)
     password: str = Field(..., min_length=3)
@@ -31,3 +66,27 @@ class AdminAuth(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+class QueryRecordRead(BaseModel):
+    statement: str
+    duration_ms: float
+    rows: int
+
+class RepeatedQuery(BaseModel):
+    statement: str
+    count: int
+
+class ProfileInfo(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    created_at: float
+    query_count: int
+
+class ProfileDetail(ProfileInfo):
+    summary: str
+    query_total_ms: float
+    repeated_queries: List[RepeatedQuery]
+    queries: List[QueryRecordRead]
@@ -1,10 +1,85 @@
-from passlib.context import CryptContext
+import base64
+import json
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+from app.errors import CursorError
+
+
+# Set in password hashing workers, so they never load the settings
+_bcrypt_rounds: Optional[int] = None
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Fix the bcrypt cost of this process; the process pool runs it as worker initializer."""
+    global _bcrypt_rounds
+    _bcrypt_rounds = rounds
+    _pwd_context.cache_clear()
+
+
+@lru_cache
+def _pwd_context():
+    """
+    The bcrypt context, built on first use: passlib and its bcrypt backend are only loaded
+    by the processes that actually hash passwords.
+    """
+    from passlib.context import CryptContext
+
+    rounds = _bcrypt_rounds
+    if rounds is None:
+        from app import settings
+
+        rounds = settings.bcrypt_rounds
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with another bcrypt cost than the configured one."""
+    return _pwd_context().needs_update(hashed_password)
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Pack the (sort key, id) of the last row into an opaque url-safe token."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if not isinstance(values, list) or not values:
+        raise CursorError("Invalid cursor")
+    return values
+
+
+def parse_qvalues(header: Optional[str]) -> Dict[str, float]:
+    """
+    Rating of each value of an Accept-style header, keyed in lowercase with wildcards kept as
+    they are: 1 without a q parameter, 0 (excluded) for q=0 or a q that isn't a number.
+    """
+    ratings = {}
+    for entry in (header or "").split(","):
+        value, *params = (part.strip() for part in entry.split(";"))
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(number), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        ratings[value.lower()] = quality
+    return ratings
@@ -0,0 +1,101 @@
+"""
+Harness shared by the benchmarks, so every script seeds, times and summarises the same way:
+the wall-clock timer, the seeded task table, the in-process client and the latency summary.
+"""
+import contextlib
+import socket
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+import httpx
+from shortuuid import uuid
+from sqlalchemy import insert
+
+from app.migrations import seed_task_counts
+from app.models import Task
+
+
+def samples_ms(func: Callable, repeat: int) -> List[float]:
+    """Wall time of each of `repeat` calls of `func`, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def median_ms(func: Callable, repeat: int) -> float:
+    """Median wall time of `func` in milliseconds."""
+    return statistics.median(samples_ms(func, repeat))
+
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, float]:
+    """Mean, nearest-rank percentiles and max of latency samples in ms; zeros when empty."""
+    ordered = sorted(samples)
+    if not ordered:
+        return dict.fromkeys(("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"), 0.0)
+
+    def percentile(share: float) -> float:
+        return ordered[min(int(share * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1],
+    }
+
+
+def print_latencies(results: Dict[str, Sequence[float]], width: int = 32) -> None:
+    """Mean, p50 and p99 per setup, one line each."""
+    print(f"{'setup':<{width}}{'mean':>8}{'p50':>8}{'p99':>8}")
+    for name, samples in results.items():
+        summary = latency_summary(samples)
+        print(
+            f"{name:<{width}}{summary['mean_ms']:>8.3f}{summary['p50_ms']:>8.3f}"
+            f"{summary['p99_ms']:>8.3f}"
+        )
+
+
+def task_row(i: int) -> dict:
+    """Task number `i` of a seeded table: 5,000 users, a third done, one in twenty edited."""
+    return {
+        "id": uuid(),
+        "username": f"user{i % 5000:05d}",
+        "email": f"user{i:07d}@example.com",
+        "text": f"benchmark task number {i}",
+        "status": i % 3 == 0,
+        "edited_by_admin": i % 20 == 0,
+    }
+
+
+def task_rows(start: int, stop: int, row: Callable[[int], dict] = task_row) -> List[dict]:
+    return [row(i) for i in range(start, stop)]
+
+
+def seed_tasks(engine, rows: int, row: Callable[[int], dict] = task_row, chunk: int = 50_000) -> None:
+    """
+    Insert `rows` tasks built by `row` in bulk, bypassing the database API (and so the search
+    index of new tasks), then recount the per-status counters as the migration does.
+    """
+    with engine.begin() as connection:
+        for start in range(0, rows, chunk):
+            connection.execute(insert(Task), task_rows(start, min(start + chunk, rows), row))
+        seed_task_counts(connection)
+
+
+@contextlib.asynccontextmanager
+async def asgi_client(app, timeout: float = 60):
+    """A client calling `app` in this process over ASGI, with no network in between."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+        yield client
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
@@ -0,0 +1,102 @@
+"""
+Cheap reads during a spike of expensive ones, with admission control off and on. A probe reads
+one task (GET /task/{id}) back to back while --spike clients fetch the whole list (GET /tasks)
+as fast as they can; reported are the probe's latencies and failures, the spike's completed
+and shed requests. Measured in-process (no network) on a database of --rows tasks, read cache off.
+
+Usage (from todo-back/): python -m benchmarks.admission --rows 20000 --spike 64 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app import settings
+from app.admission import AdmissionMiddleware
+from app.database import DatabaseAPI
+from benchmarks._common import asgi_client, latency_summary, seed_tasks
+import main
+
+
+async def probe(client: httpx.AsyncClient, url: str, until: float) -> tuple:
+    """Latencies of the probe's reads, in ms, and how many of them failed."""
+    samples, failed = [], 0
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        failed += response.status_code != 200
+    return samples, failed
+
+
+async def spike(client: httpx.AsyncClient, until: float, counts: dict) -> None:
+    while time.perf_counter() < until:
+        response = await client.get("/tasks")
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        if response.status_code != 200:
+            # A shed client backs off briefly instead of hammering the server
+            await asyncio.sleep(0.05)
+
+
+async def measure(app, task_url: str, clients: int, seconds: float) -> tuple:
+    async with asgi_client(app, timeout=120) as client:
+        until = time.perf_counter() + seconds
+        counts = {}
+        spikes = [asyncio.create_task(spike(client, until, counts)) for _ in range(clients)]
+        # Let the spike build up before probing
+        await asyncio.sleep(0.2)
+        samples, failed = await probe(client, task_url, until)
+        await asyncio.gather(*spikes)
+    return samples, failed, counts
+
+
+async def run(rows: int, clients: int, seconds: float, export_limit: int) -> None:
+    settings.log_enabled = False
+    settings.cache_enabled = False
+    if export_limit:
+        settings.admission_limits = {**settings.admission_limits, "export": export_limit}
+    setups = {
+        "admission off": main.app,
+        "admission on": AdmissionMiddleware(main.app, config=settings),
+    }
+    async with main.lifespan(main.app):
+        async with asgi_client(main.app) as client:
+            created = await client.post(
+                "/task/", json={"username": "bench", "email": "bench@example.com", "text": "t"}
+            )
+        task_url = f"/task/{created.json()['id']}"
+        results = {name: await measure(app, task_url, clients, seconds) for name, app in setups.items()}
+
+    print(f"\n{rows:,} tasks, {clients} clients listing all tasks for {seconds:.0f} s")
+    print(f"admission limits {settings.admission_limits}")
+    print(
+        f"{'setup':<16}{'probes':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        f"{'failed':>8}{'lists ok':>10}{'shed':>7}"
+    )
+    for name, (samples, failed, counts) in results.items():
+        summary = latency_summary(samples)
+        shed = sum(count for status, count in counts.items() if status != 200)
+        print(
+            f"{name:<16}{len(samples):>8}{summary['p50_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+            f"{summary['max_ms']:>9.1f}{failed:>8}{counts.get(200, 0):>10}{shed:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--spike", type=int, default=64, help="concurrent clients listing all tasks")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument(
+        "--export-limit", type=int, default=0, help="override ADMISSION_LIMITS for the full list"
+    )
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        settings.db_url = f"sqlite:///{os.path.join(directory, 'admission.db')}"
+        db = DatabaseAPI(settings.db_url)
+        seed_tasks(db.engine, args.rows)
+        db.close()
+        asyncio.run(run(args.rows, args.spike, args.seconds, args.export_limit))
@@ -0,0 +1,51 @@
+"""
+Insert N tasks one create_task call at a time vs. one create_tasks call.
+
+Usage (from todo-back/): python -m benchmarks.bulk_insert --rows 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.database import DatabaseAPI
+from app.migrations import run_migrations
+from app.models import Task
+
+
+def make_tasks(rows: int) -> list:
+    return [
+        Task(username=f"user{i:05d}", email=f"user{i}@example.com", text="benchmark task", status=i % 2 == 0)
+        for i in range(rows)
+    ]
+
+
+def run(rows: int, chunk_size: int) -> None:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("single", "bulk"):
+            db = DatabaseAPI(f"sqlite:///{os.path.join(directory, f'{mode}.db')}")
+            run_migrations(db.engine)
+            tasks = make_tasks(rows)
+            started = time.perf_counter()
+            if mode == "single":
+                for task in tasks:
+                    db.create_task(task)
+            else:
+                db.create_tasks(tasks, chunk_size=chunk_size)
+            results[mode] = time.perf_counter() - started
+            assert db.count_tasks() == rows
+            db.engine.dispose()
+
+    print(f"{rows:,} inserts (chunk size {chunk_size})")
+    for mode, elapsed in results.items():
+        print(f"{mode:<8}{elapsed:>10.2f} s{rows / elapsed:>12,.0f} rows/s")
+    print(f"speedup {results['single'] / results['bulk']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    run(args.rows, args.chunk_size)
@@ -0,0 +1,103 @@
+"""
+Cold start of a fresh backend process: `import main` in a new interpreter, then a new uvicorn
+worker from spawn to its first answered request and its first admin login (which starts the
+password hashing pool). Medians over --runs fresh processes each.
+
+With --budget-ms the import is also a check: exit status 1 when its median exceeds the budget,
+so CI can catch a heavy import creeping into startup.
+
+Usage (from todo-back/): python -m benchmarks.cold_start --runs 5 --budget-ms 1500
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.database import DatabaseAPI
+from app.models import Admin
+from benchmarks._common import free_port
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+USERNAME, PASSWORD = "coldstart", "coldstart-password"
+
+
+def import_seconds(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        env=env, cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def worker_start(env: dict) -> tuple:
+    """Seconds from spawning uvicorn to its first 200, and the first login's duration."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=BACKEND_DIR, start_new_session=True,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            while True:
+                try:
+                    if client.get("/tasks/length").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                time.sleep(0.005)
+            ready = time.perf_counter() - started
+            login_started = time.perf_counter()
+            response = client.post("/admins/auth", json={"username": USERNAME, "password": PASSWORD})
+            response.raise_for_status()
+            return ready, time.perf_counter() - login_started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        try:
+            os.killpg(server.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+def main(runs: int, budget_ms: float) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f"sqlite:///{os.path.join(directory, 'coldstart.db')}"
+        db = DatabaseAPI(db_url)
+        db.create_admin(Admin(username=USERNAME, password=PASSWORD))
+        db.close()
+        env = {**os.environ, "DB_URL": db_url, "LOG_ENABLED": "false"}
+
+        imports = [import_seconds(env) * 1000 for _ in range(runs)]
+        starts = [worker_start(env) for _ in range(runs)]
+
+    ready = [seconds * 1000 for seconds, _ in starts]
+    logins = [seconds * 1000 for _, seconds in starts]
+    print(f"\nmedian of {runs} fresh processes")
+    print(f"{'import main':<32}{statistics.median(imports):>9.0f} ms  (min {min(imports):.0f})")
+    print(f"{'uvicorn spawn to first 200':<32}{statistics.median(ready):>9.0f} ms  (min {min(ready):.0f})")
+    print(f"{'first admin login':<32}{statistics.median(logins):>9.0f} ms  (min {min(logins):.0f})")
+    if budget_ms and statistics.median(imports) > budget_ms:
+        print(f"import main exceeds its budget of {budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail above this import time")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.budget_ms))
@@ -0,0 +1,82 @@
+"""
+Burst of concurrent POST /task/ requests, one transaction per task against group commit
+(BatchedDatabaseAPI) in both durability modes. In-process (no network), read cache off.
+
+Usage (from todo-back/): python -m benchmarks.create_burst --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app import settings
+from app.batching import BatchedDatabaseAPI
+from app.database import AsyncDatabaseAPI
+from app.log import configure_logging
+from benchmarks._common import asgi_client, latency_summary
+import main
+
+
+async def burst(client: httpx.AsyncClient, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            payload = {"username": f"user{i % 500:03d}", "email": f"u{i}@example.com", "text": "burst"}
+            started = time.perf_counter()
+            response = await client.post("/task/", json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"rate": requests / elapsed, **latency_summary(latencies), "errors": errors}
+
+
+async def run(requests: int, concurrency: int, batch_size: int, delay_ms: float) -> None:
+    configure_logging(settings.model_copy(update={"log_enabled": False}))
+    setups = {
+        "one transaction per task": None,
+        "group commit, durability=commit": "commit",
+        "group commit, durability=enqueue": "enqueue",
+    }
+    results = {}
+    for name, durability in setups.items():
+        with tempfile.TemporaryDirectory() as directory:
+            db = AsyncDatabaseAPI(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            await db.create_schema()
+            api = db
+            if durability is not None:
+                api = BatchedDatabaseAPI(
+                    db, batch_size, delay_ms / 1000, max_pending=10_000, durability=durability
+                )
+                api.start()
+            main.app.state.db = api
+            async with asgi_client(main.app) as client:
+                results[name] = await burst(client, requests, concurrency)
+            if durability is not None:
+                await api.close()
+            assert await db.count_tasks() == requests - results[name]["errors"]
+            await db.engine.dispose()
+
+    print(f"\n{requests:,} POST /task/, {concurrency} concurrent, batches of up to {batch_size}")
+    print(f"{'':<36}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<36}{r['rate']:>9.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=settings.create_batch_size)
+    parser.add_argument("--delay-ms", type=float, default=settings.create_batch_max_delay_ms)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.batch_size, args.delay_ms))
@@ -0,0 +1,65 @@
+"""
+Change feed fan-out: time for one task write to reach every subscriber of the in-process
+broker, and the cost of publishing it, with thousands of subscribers reading concurrently.
+
+Usage (from todo-back/): python -m benchmarks.event_fanout --subscribers 1000 5000 --events 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.events import EventBroker
+
+
+TASK = {
+    "id": "x" * 22,
+    "username": "user00042",
+    "email": "user0000042@example.com",
+    "text": "benchmark task",
+    "status": False,
+    "edited_by_admin": False,
+}
+
+
+async def consume(subscription, pending: list, delivered: asyncio.Event) -> None:
+    """Count down the event's subscribers; the last one to receive it sets `delivered`."""
+    async for event in subscription.events(heartbeat=60):
+        pending[0] -= 1
+        if pending[0] == 0:
+            delivered.set()
+
+
+async def run(subscribers: int, events: int) -> None:
+    broker = EventBroker(history_size=1024, queue_size=256, max_subscribers=subscribers)
+    pending = [0]
+    delivered = asyncio.Event()
+    consumers = [
+        asyncio.create_task(consume(broker.subscribe(), pending, delivered))
+        for _ in range(subscribers)
+    ]
+    await asyncio.sleep(0)
+    publish_ms, delivery_ms = [], []
+    for _ in range(events):
+        pending[0] = subscribers
+        delivered.clear()
+        started = time.perf_counter()
+        broker.publish("created", [TASK])
+        publish_ms.append((time.perf_counter() - started) * 1000)
+        await delivered.wait()
+        delivery_ms.append((time.perf_counter() - started) * 1000)
+    broker.close()
+    await asyncio.gather(*consumers)
+    print(
+        f"{subscribers:>6} subscribers  publish {statistics.median(publish_ms):7.3f} ms"
+        f"  delivered to all {statistics.median(delivery_ms):7.3f} ms (median of {events})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+    for count in args.subscribers:
+        asyncio.run(run(count, args.events))
@@ -0,0 +1,105 @@
+"""
+Cost of turning a 1,000-row task page into JSON bytes: per-row models plus response_model
+validation (the validated path) against the precompiled TypeAdapter of app.responses.
+Encoding alone, then whole requests in-process with `fast_json_responses` off and on.
+
+Usage (from todo-back/): python -m benchmarks.json_encoding --rows 100000 --page 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import settings
+from app.database import AsyncDatabaseAPI, DatabaseAPI
+from app.log import configure_logging
+from app.responses import rows_response
+from app.schemas import TaskRead
+from benchmarks._common import asgi_client, print_latencies, samples_ms, seed_tasks, task_rows
+import main
+
+
+READ_LIST = TypeAdapter(List[TaskRead])
+
+
+def validated_stdlib(rows: list) -> bytes:
+    """Models per row, response_model validation, jsonable dump and json.dumps."""
+    value = READ_LIST.validate_python([TaskRead(**row) for row in rows])
+    content = READ_LIST.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def validated_dump_json(rows: list) -> bytes:
+    """Models per row, response_model validation, then pydantic's own JSON encoder."""
+    return READ_LIST.dump_json(READ_LIST.validate_python([TaskRead(**row) for row in rows]))
+
+
+def fast(rows: list) -> bytes:
+    return rows_response(rows, {}).body
+
+
+def report(title: str, results: dict) -> None:
+    print(f"\n{title}")
+    print_latencies(results, width=40)
+
+
+def encoding(page: int, repeat: int) -> None:
+    rows = task_rows(0, page)
+    assert json.loads(fast(rows)) == json.loads(validated_stdlib(rows))
+    report(
+        f"Encoding a {page:,}-row page, ms",
+        {
+            "models + validation + json.dumps": samples_ms(lambda: validated_stdlib(rows), repeat),
+            "models + validation + dump_json": samples_ms(lambda: validated_dump_json(rows), repeat),
+            "TypeAdapter over rows": samples_ms(lambda: fast(rows), repeat),
+        },
+    )
+
+
+async def requests(rows: int, page: int, repeat: int) -> None:
+    configure_logging(settings.model_copy(update={"log_enabled": False}))
+    urls = {
+        "/tasks/": f"/tasks/?limit={page}&offset={{offset}}",
+        "/tasks/sorted/email + total": (
+            f"/tasks/sorted/email?limit={page}&offset={{offset}}&include_total=true"
+        ),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        sync_db = DatabaseAPI(url)
+        seed_tasks(sync_db.engine, rows)
+        sync_db.engine.dispose()
+        db = AsyncDatabaseAPI(url)
+        await db.create_schema()
+        # No read cache: every request runs its query and encodes the page
+        main.app.state.db = db
+        async with asgi_client(main.app) as client:
+            for route, template in urls.items():
+                for mode in (False, True):
+                    settings.fast_json_responses = mode
+                    samples = []
+                    for i in range(repeat):
+                        offset = (i % 20) * page
+                        started = time.perf_counter()
+                        response = await client.get(template.format(offset=offset))
+                        samples.append((time.perf_counter() - started) * 1000)
+                        assert response.status_code == 200, response.text
+                    results[f"{route} ({'fast' if mode else 'validated'})"] = samples
+        await db.engine.dispose()
+    report(f"Requests for {page:,}-row pages, {rows:,} rows, no cache, ms", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    encoding(args.page, args.repeat)
+    asyncio.run(requests(args.rows, args.page, args.repeat))
@@ -0,0 +1,60 @@
+"""
+Closed-loop HTTP load generator: N concurrent clients hammer one URL for a fixed time.
+
+Usage (server already running):
+    python -m benchmarks.load http://127.0.0.1:8000/tasks/?limit=10 --clients 500 --duration 20
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks._common import latency_summary
+
+
+async def client_loop(client: httpx.AsyncClient, url: str, deadline: float, latencies: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(url: str, clients: int, duration: float) -> dict:
+    latencies: list = []
+    errors: list = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client_loop(client, url, deadline, latencies, errors) for _ in range(clients))
+        )
+        elapsed = time.perf_counter() - started
+    summary = latency_summary(latencies)
+    return {
+        "url": url,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(summary["p50_ms"], 2),
+        "p95_ms": round(summary["p95_ms"], 2),
+        "p99_ms": round(summary["p99_ms"], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+    print(asyncio.run(run(args.url, args.clients, args.duration)))
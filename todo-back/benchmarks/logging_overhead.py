@@ -0,0 +1,67 @@
+"""
+Request latency with different logging setups, measured in-process (no network).
+
+Usage (from todo-back/): python -m benchmarks.logging_overhead --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app import settings
+from app.log import configure_logging
+from benchmarks._common import asgi_client, print_latencies
+import main
+
+
+SETUPS = {
+    "off": {"log_enabled": False},
+    "sync text": {"log_enqueue": False, "log_json": False, "log_sample_rate": 1.0},
+    "enqueue text": {"log_enqueue": True, "log_json": False, "log_sample_rate": 1.0},
+    "enqueue json": {"log_enqueue": True, "log_json": True, "log_sample_rate": 1.0},
+    "enqueue json, 10% sampled": {"log_enqueue": True, "log_json": True, "log_sample_rate": 0.1},
+}
+
+
+async def measure(client: httpx.AsyncClient, urls: list, requests: int) -> list:
+    samples = []
+    for i in range(requests):
+        started = time.perf_counter()
+        response = await client.get(urls[i % len(urls)])
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return samples
+
+
+async def run(requests: int) -> None:
+    results = {}
+    async with main.lifespan(main.app):
+        async with asgi_client(main.app) as client:
+            created = await client.post(
+                "/task/", json={"username": "bench", "email": "bench@example.com", "text": "t"}
+            )
+            urls = [f"/task/{created.json()['id']}", "/tasks/?limit=10", "/tasks/length"]
+            with tempfile.TemporaryDirectory() as directory:
+                for name, overrides in SETUPS.items():
+                    config = settings.model_copy(
+                        update={"log_file": os.path.join(directory, "bench.log"), **overrides}
+                    )
+                    settings.log_sample_rate = config.log_sample_rate
+                    with open(os.path.join(directory, "stdout.log"), "w") as stream:
+                        configure_logging(config, stream=stream)
+                        await measure(client, urls, requests // 10)
+                        results[name] = await measure(client, urls, requests)
+                        configure_logging(config.model_copy(update={"log_enabled": False}))
+
+    print(f"{requests} requests per setup, latency in ms")
+    print_latencies(results, width=28)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
@@ -0,0 +1,59 @@
+"""
+Request latency with metrics disabled and enabled, measured in-process (no network).
+
+Usage (from todo-back/): python -m benchmarks.metrics_overhead --requests 2000
+"""
+import argparse
+import asyncio
+import time
+
+from app import settings
+from app.metrics import REGISTRY, MetricsMiddleware
+from benchmarks._common import asgi_client, print_latencies
+import main
+
+
+async def measure(app, urls: list, requests: int) -> list:
+    samples = []
+    async with asgi_client(app) as client:
+        for i in range(requests):
+            started = time.perf_counter()
+            response = await client.get(urls[i % len(urls)])
+            samples.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+    return samples
+
+
+async def run(requests: int) -> None:
+    # The lifespan installs the log sinks from settings
+    settings.log_enabled = False
+    setups = {
+        "disabled": (False, main.app),
+        "enabled": (True, MetricsMiddleware(main.app)),
+    }
+    results = {}
+    async with main.lifespan(main.app):
+        async with asgi_client(main.app) as client:
+            created = await client.post(
+                "/task/", json={"username": "bench", "email": "bench@example.com", "text": "t"}
+            )
+        urls = [f"/task/{created.json()['id']}", "/tasks/?limit=10", "/tasks/length"]
+        # Alternate rounds so drift (cache warm-up, GC) hits both setups alike
+        for _ in range(5):
+            for name, (enabled, app) in setups.items():
+                REGISTRY.enabled = enabled
+                results.setdefault(name, []).extend(await measure(app, urls, requests // 5))
+        REGISTRY.enabled = settings.metrics_enabled
+
+    print(f"{requests} requests per setup, latency in ms")
+    print_latencies(results, width=12)
+    render_started = time.perf_counter()
+    REGISTRY.render()
+    print(f"/metrics render: {(time.perf_counter() - render_started) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
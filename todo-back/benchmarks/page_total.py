@@ -0,0 +1,74 @@
+"""
+A task list page view as the frontend issues it: /tasks/length plus a page, or one page
+with include_total. Measured in-process (no network), with and without the read cache.
+
+Usage (from todo-back/): python -m benchmarks.page_total --rows 100000 --views 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app import settings
+from app.cache import CachedDatabaseAPI, MemoryCacheBackend
+from app.database import AsyncDatabaseAPI, DatabaseAPI
+from app.log import configure_logging
+from benchmarks._common import asgi_client, print_latencies, seed_tasks
+import main
+
+
+async def page_views(client: httpx.AsyncClient, views: int, envelope: bool) -> list:
+    samples = []
+    for i in range(views):
+        # Browse the first 50 pages of the default listing, as the pagination control does
+        url = f"/tasks/?offset={(i % 50) * 3}&limit=3"
+        started = time.perf_counter()
+        if envelope:
+            response = await client.get(url + "&include_total=true")
+            assert response.json()["total"] > 0
+        else:
+            total = await client.get("/tasks/length")
+            response = await client.get(url)
+            assert total.json() > 0
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return samples
+
+
+async def run(rows: int, views: int) -> None:
+    configure_logging(settings.model_copy(update={"log_enabled": False}))
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        sync_db = DatabaseAPI(url)
+        seed_tasks(sync_db.engine, rows)
+        sync_db.engine.dispose()
+        db = AsyncDatabaseAPI(url)
+        await db.create_schema()
+        setups = {
+            "no cache": lambda: db,
+            "memory cache": lambda: CachedDatabaseAPI(
+                db, MemoryCacheBackend(max_bytes=32 * 1024 * 1024), ttl=60
+            ),
+        }
+        results = {}
+        async with asgi_client(main.app) as client:
+            for setup, make_db in setups.items():
+                main.app.state.db = make_db()
+                for envelope in (False, True):
+                    name = f"{setup}, {'one request' if envelope else 'two requests'}"
+                    results[name] = await page_views(client, views, envelope)
+        await db.engine.dispose()
+
+    print(f"\n{rows:,} rows, {views} page views, ms per page view")
+    print_latencies(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--views", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.views))
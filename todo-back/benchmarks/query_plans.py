@@ -0,0 +1,75 @@
+"""
+Query plans and latency of typical `query_tasks` calls. Exits non-zero when a query that
+should be served by an index is planned with a table scan or a temp B-tree sort.
+
+Usage (from todo-back/): python -m benchmarks.query_plans --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from sqlalchemy import text
+
+from app.database import DatabaseAPI, _prepare_query
+from benchmarks._common import median_ms, seed_tasks
+
+
+# name -> (filters, sort, whether every step of the plan must use an index)
+CASES = {
+    "open, by username": ({"status": False}, ["username"], True),
+    "done, by -email": ({"status": True}, ["-email"], True),
+    "user X, open": ({"username": "user00042", "status": False}, [], True),
+    # Sorts the ~200 tasks of one user after the index seek
+    "user X, by -status": ({"username": "user00042"}, ["-status"], False),
+    "exact email": ({"email": "user0000042@example.com"}, [], True),
+    "edited, by username": ({"edited_by_admin": True}, ["username"], True),
+    "status, username": ({}, ["status", "username"], True),
+    "newest first": ({}, ["-id"], True),
+    # Mixed directions after status: one index-ordered branch per status, merged
+    "status, -username": ({}, ["status", "-username"], True),
+    "-status, email": ({}, ["-status", "email"], True),
+}
+
+
+def plan(db: DatabaseAPI, filters: dict, sort: list) -> list:
+    statement = _prepare_query(filters, sort, None, 0, 10, None)
+    sql = str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    with db.engine.connect() as connection:
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def uses_index(steps: list) -> bool:
+    """No table scan, and no sort of task rows (sorting a branch's LIMITed output is fine)."""
+    for previous, step in zip(["", *steps], steps):
+        if step.startswith("SCAN task") and "INDEX" not in step:
+            return False
+        if "TEMP B-TREE" in step and previous.startswith(("SCAN task", "SEARCH task")):
+            return False
+    return True
+
+
+def run(rows: int, repeat: int) -> bool:
+    ok = True
+    print(f"\n{rows:,} rows (median of {repeat}, ms per page of 10)")
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseAPI(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        seed_tasks(db.engine, rows)
+        for name, (filters, sort, indexed) in CASES.items():
+            steps = plan(db, filters, sort)
+            latency = median_ms(lambda: db.query_tasks(filters, sort, limit=10), repeat)
+            flag = ""
+            if indexed and not uses_index(steps):
+                flag, ok = "  <-- not index-served", False
+            print(f"{name:<22}{latency:>8.2f}  {'; '.join(steps)}{flag}")
+        db.engine.dispose()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    results = [run(rows, args.repeat) for rows in args.rows]
+    sys.exit(0 if all(results) else 1)
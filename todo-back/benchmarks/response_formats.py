@@ -0,0 +1,67 @@
+"""
+Size and cost of a task page in each negotiated format (JSON, columnar JSON, msgpack), bare
+and compressed with gzip and brotli at the levels CompressionMiddleware uses. Decoding back to
+a list of task dicts stands in for the client's parse time.
+
+Usage (from todo-back/): python -m benchmarks.response_formats --pages 10 100 1000
+"""
+import argparse
+import json
+import zlib
+
+from app import settings
+from app.compression import ENCODINGS
+from app.responses import COLUMNAR, MSGPACK, RESPONSE_FORMATS, msgpack, rows_response
+from benchmarks._common import median_ms, task_rows
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def decode(media_type: str, body: bytes) -> list:
+    if media_type == MSGPACK:
+        return msgpack.unpackb(body)
+    value = json.loads(body)
+    if media_type == COLUMNAR:
+        names = list(value)
+        return [dict(zip(names, row)) for row in zip(*value.values())]
+    return value
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress(body) + compressor.flush()
+
+
+def run(page: int, repeat: int) -> None:
+    rows = task_rows(0, page)
+    print(f"\n{page:,} tasks per page")
+    header = f"{'':<36}{'bytes':>9}{'encode ms':>11}{'decode ms':>11}"
+    for encoding in ENCODINGS:
+        header += f"{encoding + ' bytes':>12}{encoding + ' ms':>10}"
+    print(header)
+    for media_type in RESPONSE_FORMATS:
+        body = rows_response(rows, {}, media_type).body
+        assert decode(media_type, body) == rows
+        line = f"{media_type:<36}{len(body):>9,}"
+        line += f"{median_ms(lambda: rows_response(rows, {}, media_type), repeat):>11.3f}"
+        line += f"{median_ms(lambda: decode(media_type, body), repeat):>11.3f}"
+        for encoding in ENCODINGS:
+            line += f"{len(compress(encoding, body)):>12,}"
+            line += f"{median_ms(lambda: compress(encoding, body), repeat):>10.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    if msgpack is None:
+        print("msgpack is not installed; its row is left out")
+    for size in args.pages:
+        run(size, args.repeat)
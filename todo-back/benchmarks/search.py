@@ -0,0 +1,91 @@
+"""
+Full-text search latency, and the cost of bulk writes with the search index in place.
+
+Usage (from todo-back/): python -m benchmarks.search --rows 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlmodel import SQLModel
+
+from app.database import DatabaseAPI, create_db_engine
+from app.migrations import run_migrations
+from app.models import Task
+from benchmarks._common import median_ms, seed_tasks, task_row, task_rows
+
+
+WORDS = (
+    "fix bug login report invoice deploy review meeting call design test release "
+    "migrate backup refactor docs support ticket customer payment"
+).split()
+
+
+def worded_row(rng: random.Random):
+    """Seeded tasks whose text is six random words and a word unique to the task."""
+
+    def row(i: int) -> dict:
+        return {**task_row(i), "text": " ".join(rng.choice(WORDS) for _ in range(6)) + f" case{i}"}
+
+    return row
+
+
+def deep_page(db: DatabaseAPI, query: str, pages: int) -> None:
+    after = None
+    for _ in range(pages):
+        found = db.search_tasks(query, after=after, limit=10)
+        after = found[-1][1]
+
+
+def run(count: int, repeat: int) -> None:
+    rng = random.Random(42)
+    probe = 10_000
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        seed_tasks(engine, count, worded_row(rng))
+        started = time.perf_counter()
+        run_migrations(engine)
+        backfill = time.perf_counter() - started
+        db = DatabaseAPI(engine=engine)
+        queries = {
+            "exact email": f"user{count // 2:07d}@example.com",
+            "username (~200 hits)": f"user{count // 2 % 5000:05d}",
+            "rare word": f"case{count // 3}",
+            "prefix 'refac'": "refac",
+            "two common words": "invoice deploy",
+            "common word": "bug",
+        }
+        results = {
+            name: median_ms(lambda: db.search_tasks(q, limit=10), repeat) for name, q in queries.items()
+        }
+        results["common word, page 10"] = median_ms(lambda: deep_page(db, "bug", 10), repeat) / 10
+
+        tasks = [Task(**row) for row in task_rows(count, count + probe, worded_row(rng))]
+        started = time.perf_counter()
+        db.create_tasks(tasks)
+        created = time.perf_counter() - started
+        assert db.search_tasks(f"case{count + probe - 1}")
+        updates = {task.id: {"text": f"edited {task.text}"} for task in tasks[:2000]}
+        started = time.perf_counter()
+        db.update_tasks(updates)
+        updated = time.perf_counter() - started
+        engine.dispose()
+
+    print(f"\n{count:,} rows (median of {repeat}, ms per page of 10)")
+    for name, value in results.items():
+        print(f"{name:<28}{value:>10.2f}")
+    print(f"migration with index backfill {backfill:>9.2f} s")
+    print(f"create_tasks {probe:,} rows     {created * 1000:>9.0f} ms")
+    print(f"update_tasks 2,000 rows      {updated * 1000:>9.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for count in args.rows:
+        run(count, args.repeat)
@@ -0,0 +1,65 @@
+"""
+Sorted-page latency with and without the composite sort indexes.
+
+Usage (from todo-back/): python -m benchmarks.sorted_pages --rows 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+
+from sqlalchemy import text
+
+from app.database import DatabaseAPI
+from app.models import Task
+from benchmarks._common import median_ms, seed_tasks
+
+
+SORT_INDEXES = tuple(index.name for index in Task.__table__.indexes)
+
+
+def measure(db: DatabaseAPI, rows: int, repeat: int) -> dict:
+    deep = rows - 10
+    last = db.query_tasks(sort=["username"], offset=deep, limit=1)[0]
+    return {
+        "first_page": median_ms(lambda: db.query_tasks(sort=["username"], limit=10), repeat),
+        "first_page_reverse": median_ms(lambda: db.query_tasks(sort=["-email"], limit=10), repeat),
+        "deep_offset_page": median_ms(
+            lambda: db.query_tasks(sort=["username"], offset=deep, limit=10), repeat
+        ),
+        "deep_cursor_page": median_ms(
+            lambda: db.query_tasks(
+                sort=["username"], limit=10, after=[last["username"], last["id"]]
+            ),
+            repeat,
+        ),
+    }
+
+
+def run(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseAPI(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        seed_tasks(db.engine, rows)
+        with db.engine.begin() as connection:
+            for name in SORT_INDEXES:
+                connection.execute(text(f"DROP INDEX {name}"))
+        before = measure(db, rows, repeat)
+        with db.engine.begin() as connection:
+            for index in Task.__table__.indexes:
+                index.create(connection)
+            connection.execute(text("ANALYZE"))
+        after = measure(db, rows, repeat)
+        db.engine.dispose()
+
+    print(f"\n{rows:,} rows (median of {repeat}, ms)")
+    print(f"{'query':<22}{'no index':>12}{'indexed':>12}")
+    for name in before:
+        print(f"{name:<22}{before[name]:>12.2f}{after[name]:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for rows in args.rows:
+        run(rows, args.repeat)
@@ -0,0 +1,320 @@
+"""
+Load-test suite for the API. For every dataset size it seeds a fresh SQLite database through
+DatabaseAPI, starts the app (in-process over ASGI, or a local uvicorn server), drives each route
+with a fixed number of requests from concurrent clients and records throughput, latency
+percentiles and server memory per scenario. Results are written as JSON, so runs on two commits
+can be compared with --compare.
+
+Usage (from todo-back/):
+    python -m benchmarks.suite --rows 1000 100000 --requests 500 --concurrency 20 --output run.json
+    python -m benchmarks.suite --target uvicorn --rows 1000000 --output run.json
+    python -m benchmarks.suite --compare before.json after.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from shortuuid import uuid
+
+from app import settings
+from app.database import DatabaseAPI
+from app.models import Task
+from benchmarks._common import asgi_client, free_port, latency_summary
+import main
+
+
+ADMIN = {"username": "bench-admin", "password": "bench-password"}
+
+
+@dataclass
+class Context:
+    """What scenarios draw on: the seeded ids, ids reserved for deletion and an admin token."""
+
+    rows: int
+    ids: List[str]
+    victims: List[str]
+    token: str = ""
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+
+    def task_id(self) -> str:
+        return self.ids[self.rng.randrange(len(self.ids))]
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    url: Callable[[Context, int], str]
+    body: Optional[Callable[[Context, int], Any]] = None
+    admin: bool = False
+
+
+def new_task(i: int) -> dict:
+    return {"username": f"user{i % 5000:05d}", "email": f"load{i}@example.com", "text": f"load task {i}"}
+
+
+def deep(ctx: Context) -> int:
+    """Offset of the last page of ten."""
+    return max(ctx.rows - 10, 0)
+
+
+# Reads first, so they see the seeded table; writes last, deletes at the very end
+SCENARIOS = [
+    Scenario("get task", "GET", lambda ctx, i: f"/task/{ctx.task_id()}"),
+    Scenario("list, shallow", "GET", lambda ctx, i: f"/tasks/?offset={i % 10 * 10}&limit=10"),
+    Scenario("list, deep offset", "GET", lambda ctx, i: f"/tasks/?offset={deep(ctx)}&limit=10"),
+    Scenario("list + total", "GET", lambda ctx, i: f"/tasks/?offset={i % 10 * 10}&limit=10&include_total=true"),
+    *(
+        Scenario(f"sorted by {key}, {depth}", "GET", url)
+        for key in ("username", "email", "status")
+        for depth, url in (
+            ("shallow", lambda ctx, i, key=key: f"/tasks/sorted/{key}?offset={i % 10 * 10}&limit=10"),
+            ("deep offset", lambda ctx, i, key=key: f"/tasks/sorted/{key}?offset={deep(ctx)}&limit=10&reverse=true"),
+        )
+    ),
+    Scenario("query", "GET", lambda ctx, i: "/tasks/query?status=false&sort=-username&limit=10"),
+    Scenario("search", "GET", lambda ctx, i: f"/tasks/search?q=user{i % 5000:05d}&limit=10"),
+    Scenario("length", "GET", lambda ctx, i: "/tasks/length"),
+    Scenario("login", "POST", lambda ctx, i: "/admins/auth", lambda ctx, i: ADMIN),
+    Scenario(
+        "patch task",
+        "PATCH",
+        lambda ctx, i: f"/task/{ctx.task_id()}",
+        lambda ctx, i: {**new_task(i), "status": i % 2 == 0},
+        admin=True,
+    ),
+    Scenario("create task", "POST", lambda ctx, i: "/task/", lambda ctx, i: new_task(i)),
+    Scenario(
+        "bulk create 100", "POST", lambda ctx, i: "/tasks/bulk",
+        lambda ctx, i: [new_task(i * 100 + j) for j in range(100)],
+    ),
+    Scenario("delete task", "DELETE", lambda ctx, i: f"/task/{ctx.victims.pop()}", admin=True),
+]
+
+
+def seed(db_url: str, rows: int, reserved: int, chunk: int = 10_000) -> tuple:
+    """Insert `rows` tasks plus `reserved` to be deleted, through DatabaseAPI.create_tasks."""
+    db = DatabaseAPI(db_url)
+    ids = []
+    total = rows + reserved
+    for start in range(0, total, chunk):
+        tasks = [
+            Task(
+                id=uuid(),
+                username=f"user{i % 5000:05d}",
+                email=f"user{i:07d}@example.com",
+                text=f"seeded task {i}",
+                status=i % 3 == 0,
+            )
+            for i in range(start, min(start + chunk, total))
+        ]
+        db.create_tasks(tasks)
+        ids.extend(task.id for task in tasks)
+    db.engine.dispose()
+    return ids[:rows], ids[rows:]
+
+
+def memory_mb(pid: Optional[int]) -> Dict[str, float]:
+    """Resident and peak resident memory of the server process, from /proc when available."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as status:
+            fields = dict(line.split(":", 1) for line in status)
+        return {
+            "rss_mb": round(int(fields["VmRSS"].split()[0]) / 1024, 1),
+            "peak_rss_mb": round(int(fields["VmHWM"].split()[0]) / 1024, 1),
+        }
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss_mb": None, "peak_rss_mb": round(peak / 1024, 1)}
+
+
+async def drive(
+    client: httpx.AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int
+) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    numbers = iter(range(requests))
+    headers = {"Authorization": f"Bearer {ctx.token}"} if scenario.admin else {}
+
+    async def worker() -> None:
+        for i in numbers:
+            url = scenario.url(ctx, i)
+            body = scenario.body(ctx, i) if scenario.body else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, url, json=body, headers=headers)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    summary = latency_summary(latencies)
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        **{name: round(summary[name], 3) for name in ("p50_ms", "p95_ms", "p99_ms", "max_ms")},
+    }
+
+
+@contextlib.asynccontextmanager
+async def in_process(db_url: str):
+    """The app with its real lifespan, served over ASGI in this process."""
+    settings.db_url = db_url
+    async with main.lifespan(main.app):
+        async with asgi_client(main.app) as client:
+            yield client, None
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_server(db_url: str):
+    """The app under a local uvicorn process on a free port."""
+    port = free_port()
+    env = {**os.environ, "DB_URL": db_url, "LOG_ENABLED": "false"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        # Own process group, so the password hashing workers go down with the server
+        start_new_session=True,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/tasks/length")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            yield client, server.pid
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(server.pid, signal.SIGTERM)
+
+
+async def run_dataset(args, rows: int) -> dict:
+    reserved = args.requests + args.warmup
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        started = time.perf_counter()
+        ids, victims = seed(db_url, rows, reserved)
+        seed_seconds = time.perf_counter() - started
+        print(f"\n{rows:,} rows seeded in {seed_seconds:.1f} s")
+        ctx = Context(rows=rows, ids=ids, victims=victims)
+        target = in_process if args.target == "inprocess" else uvicorn_server
+        results = {}
+        async with target(db_url) as (client, pid):
+            await client.post("/admins/", json=ADMIN)
+            login = await client.post("/admins/auth", json=ADMIN)
+            ctx.token = login.json()["access_token"]
+            for scenario in SCENARIOS:
+                if args.only and not any(name in scenario.name for name in args.only):
+                    continue
+                await drive(client, scenario, ctx, args.warmup, min(args.concurrency, args.warmup) or 1)
+                result = await drive(client, scenario, ctx, args.requests, args.concurrency)
+                result.update(memory_mb(pid))
+                results[scenario.name] = result
+                print(
+                    f"  {scenario.name:<30}{result['rps']:>9.1f} req/s"
+                    f"  p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}"
+                    f"  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}"
+                )
+    return {"rows": rows, "seed_seconds": round(seed_seconds, 2), "scenarios": results}
+
+
+def metadata(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": args.target,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "cpus": os.cpu_count(),
+        "cache_enabled": settings.cache_enabled,
+        "create_batch_enabled": settings.create_batch_enabled,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Per scenario change in throughput and p99 between two result files."""
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    print(f"{before['meta']['commit']} -> {after['meta']['commit']}")
+    previous = {dataset["rows"]: dataset["scenarios"] for dataset in before["datasets"]}
+    for dataset in after["datasets"]:
+        old = previous.get(dataset["rows"], {})
+        print(f"\n{dataset['rows']:,} rows{'':<22}{'req/s':>18}{'p99 ms':>22}")
+        for name, result in dataset["scenarios"].items():
+            if name not in old:
+                continue
+            rps = (result["rps"] / old[name]["rps"] - 1) * 100 if old[name]["rps"] else 0.0
+            p99 = (result["p99_ms"] / old[name]["p99_ms"] - 1) * 100 if old[name]["p99_ms"] else 0.0
+            print(
+                f"  {name:<30}{old[name]['rps']:>9.1f} {rps:>+7.1f}%"
+                f"{old[name]['p99_ms']:>12.2f} {p99:>+7.1f}%"
+            )
+
+
+async def run(args) -> dict:
+    # The lifespan installs the log sinks from settings
+    settings.log_enabled = False
+    report = {"meta": metadata(args), "datasets": []}
+    for rows in args.rows:
+        report["datasets"].append(await run_dataset(args, rows))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--only", nargs="*", help="run only scenarios whose name contains one of these")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        sys.exit(0)
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"\nResults written to {args.output}")
@@ -1,24 +1,129 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+
 from app.endpoints import router
+from app.database import AsyncDatabaseAPI
+from app.cache import CachedDatabaseAPI, create_cache_backend
+from app.batching import BatchedDatabaseAPI
+from app.events import EventBroker
+from app.replicas import PRIMARY_UNTIL_HEADER, ReadYourWritesMiddleware
+from app.passwords import PasswordHasher
+from app.auth import PrincipalCache
+from app.metrics import REGISTRY, MetricsMiddleware
+from app.compression import CompressionMiddleware
+from app.admission import AdmissionMiddleware
+from app.profiling import ProfileStore, ProfilingMiddleware, install_query_log
+from app.log import configure_logging
+from app import settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Sinks are installed here, not on import, so that importing the app opens no log file
+    configure_logging(settings)
+    REGISTRY.enabled = settings.metrics_enabled
     print("Starting up...")
+    hasher = PasswordHasher(
+        settings.password_workers, settings.password_max_pending, settings.bcrypt_rounds
+    )
+    app.state.password_hasher = hasher
+    app.state.principals = PrincipalCache(
+        ttl=settings.admin_cache_ttl_seconds, max_size=settings.admin_cache_max_size
+    )
+    if settings.profiling_enabled:
+        app.state.profiles = ProfileStore(max_size=settings.profile_max_artifacts)
+        install_query_log()
+    events = EventBroker(
+        history_size=settings.events_history_size,
+        queue_size=settings.events_queue_size,
+        max_subscribers=settings.events_max_subscribers,
+    )
+    app.state.events = events
+    db = AsyncDatabaseAPI(
+        settings.db_url, hasher=hasher, events=events, replica_urls=settings.db_replica_urls
+    )
+    await db.create_schema()
+    if db.replicas:
+        db.replicas.start(settings.db_replica_check_interval_seconds)
+    cache = create_cache_backend(settings) if settings.cache_enabled else None
+    if cache:
+        # Cache fills read from the primary for as long as a writer's own reads do
+        window = settings.db_read_your_writes_seconds if db.replicas else 0
+        api = CachedDatabaseAPI(db, cache, ttl=settings.cache_ttl_seconds, primary_window=window)
+    else:
+        api = db
+    batched = None
+    if settings.create_batch_enabled:
+        # Outermost, so batches go through the cache layer and invalidate it once committed
+        batched = BatchedDatabaseAPI(
+            api,
+            batch_size=settings.create_batch_size,
+            max_delay=settings.create_batch_max_delay_ms / 1000,
+            max_pending=settings.create_batch_max_pending,
+            durability=settings.create_batch_durability,
+        )
+        batched.start()
+        api = batched
+    app.state.db = api
     yield
     print("Shutting down...")
+    if batched:
+        await batched.close()
+    events.close()
+    if cache:
+        await cache.close()
+    await db.close()
+    hasher.shutdown()
+
+
+# Optional middlewares are chosen from settings when Starlette builds the stack, on the first
+# call (the lifespan included), not on import: each factory hands back `app` when its feature
+# is off, so importing main reads no settings.
+def admission_middleware(app):
+    return AdmissionMiddleware(app, config=settings) if settings.admission_enabled else app
+
+
+def read_your_writes_middleware(app):
+    if not settings.db_replica_urls:
+        return app
+    return ReadYourWritesMiddleware(app, window=settings.db_read_your_writes_seconds)
+
+
+def compression_middleware(app):
+    if not settings.compression_enabled:
+        return app
+    return CompressionMiddleware(
+        app,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+
+def profiling_middleware(app):
+    return ProfilingMiddleware(app, config=settings) if settings.profiling_enabled else app
+
+
+def metrics_middleware(app):
+    return MetricsMiddleware(app) if settings.metrics_enabled else app
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Innermost but for the routes: shed requests still get CORS headers and are counted by metrics
+app.add_middleware(admission_middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_UNTIL_HEADER, "Retry-After"],
 )
+app.add_middleware(read_your_writes_middleware)
+app.add_middleware(compression_middleware)
+app.add_middleware(profiling_middleware)
+app.add_middleware(metrics_middleware)
 
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
@@ -0,0 +1,42 @@
+import asyncio
+
+import httpx
+
+from app.admission import AdmissionMiddleware, route_class
+from app.config import Settings
+
+
+def test_exports_have_their_own_class():
+    assert route_class("GET", "/tasks/export") == "export"
+    assert route_class("GET", "/tasks") == "export"
+    assert route_class("GET", "/tasks/") == "list"
+    assert route_class("GET", "/tasks/query") == "list"
+
+
+async def pages_during_downloads() -> None:
+    started, finish = asyncio.Event(), asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/tasks/export":
+            started.set()
+            await finish.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+
+    # Default limits: two list slots, two export slots
+    middleware = AdmissionMiddleware(app, config=Settings.model_construct())
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        exports = [asyncio.create_task(client.get("/tasks/export")) for _ in range(2)]
+        await started.wait()
+        pages = await asyncio.gather(*(client.get("/tasks/?limit=10") for _ in range(4)))
+        assert [page.status_code for page in pages] == [200] * 4
+        assert middleware.limiters["export"].active == 2
+        # The downloads' duration does not count towards the pages' service time
+        assert middleware.limiters["list"].service_time < 1
+        finish.set()
+        assert [export.status_code for export in await asyncio.gather(*exports)] == [200, 200]
+
+
+def test_downloads_leave_page_slots_free():
+    asyncio.run(pages_during_downloads())
@@ -0,0 +1,24 @@
+import pytest
+from pydantic import ValidationError
+
+from app.endpoints import reject_duplicate_ids
+from app.schemas import TaskBulkUpdate
+
+
+def update(task_id: str, **fields) -> TaskBulkUpdate:
+    return TaskBulkUpdate(id=task_id, username="bob", email="bob@example.com", text="t", **fields)
+
+
+def test_update_rejects_null_status():
+    assert update("a").status is False
+    with pytest.raises(ValidationError):
+        update("a", status=None)
+
+
+def test_duplicate_ids_are_reported_per_item():
+    valid = list(enumerate([update("a"), update("b"), update("a", status=True)]))
+    unique, failed = reject_duplicate_ids(valid)
+    assert [(index, item.id) for index, item in unique] == [(1, "b")]
+    assert [(result.index, result.id, result.success) for result in failed] == [
+        (0, "a", False), (2, "a", False)
+    ]
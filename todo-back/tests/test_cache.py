@@ -0,0 +1,213 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.cache import CachedDatabaseAPI, MemoryCacheBackend, RedisCacheBackend
+from app.config import Settings
+from app.database import AsyncDatabaseAPI, create_async_db_engine
+from app.models import Task
+from app.replicas import ReplicaSet
+
+
+# A throwaway Redis database: the tests flush it
+REDIS_URL = os.environ.get("TODO_TEST_REDIS_URL")
+
+
+def new_task(number: int) -> Task:
+    return Task(username=f"user{number}", email=f"user{number}@example.com", text=f"task {number}")
+
+
+async def task_db(path) -> AsyncDatabaseAPI:
+    engine = create_async_db_engine(f"sqlite:///{path}", Settings.model_construct())
+    db = AsyncDatabaseAPI(engine=engine)
+    await db.create_schema()
+    return db
+
+
+# --- Backends ---
+
+async def memory_eviction() -> None:
+    backend = MemoryCacheBackend(max_bytes=10)
+    await backend.set("a", b"aaaa", ttl=60)
+    await backend.set("b", b"bbbb", ttl=60)
+    assert await backend.get("a") == b"aaaa"
+    # Over the byte budget the least recently used entry goes: b, since a was just read
+    await backend.set("c", b"cccc", ttl=60)
+    assert (await backend.get("a"), await backend.get("b"), await backend.get("c")) == (
+        b"aaaa", None, b"cccc"
+    )
+    assert backend.size == 8
+    # Larger than the whole budget: not stored, nothing evicted for it
+    await backend.set("d", b"d" * 11, ttl=60)
+    assert await backend.get("d") is None and backend.size == 8
+    # Replacing a value accounts for the old one
+    await backend.set("a", b"aa", ttl=60)
+    assert backend.size == 6
+    await backend.set("short", b"s", ttl=0.05)
+    time.sleep(0.1)
+    assert await backend.get("short") is None and backend.size == 6
+    # Counters take no part in eviction
+    for _ in range(3):
+        await backend.incr("version")
+    await backend.set("e", b"e" * 10, ttl=60)
+    assert await backend.get_counter("version") == 3
+    assert await backend.get("a") is None and backend.size == 10
+
+
+def test_memory_backend_evicts_by_lru_ttl_and_size():
+    asyncio.run(memory_eviction())
+
+
+async def redis_backend() -> None:
+    backend = RedisCacheBackend(REDIS_URL)
+    await backend.client.flushdb()
+    try:
+        await backend.set("a", b"aaaa", ttl=60)
+        await backend.set("short", b"s", ttl=0.05)
+        assert await backend.get("a") == b"aaaa"
+        await asyncio.sleep(0.1)
+        assert await backend.get("short") is None
+        await backend.delete("a")
+        assert await backend.get("a") is None
+        assert await backend.get_counter("version") == 0
+        assert [await backend.incr("version") for _ in range(2)] == [1, 2]
+        assert await backend.get_counter("version") == 2
+    finally:
+        await backend.client.flushdb()
+        await backend.close()
+
+
+# Size limits and LRU eviction are the server's maxmemory policy, not the backend's
+@pytest.mark.skipif(REDIS_URL is None, reason="TODO_TEST_REDIS_URL is not set")
+def test_redis_backend_expires_and_counts():
+    asyncio.run(redis_backend())
+
+
+# --- Invalidation ---
+
+async def create(api, ids):
+    await api.create_task(new_task(9))
+
+
+async def update(api, ids):
+    await api.update_task(ids[0], status=True)
+
+
+async def delete(api, ids):
+    await api.delete_task(ids[0])
+
+
+async def create_many(api, ids):
+    await api.create_tasks([new_task(8), new_task(9)], chunk_size=100)
+
+
+async def update_many(api, ids):
+    await api.update_tasks({ids[0]: {"status": True}, ids[1]: {"status": True}}, chunk_size=100)
+
+
+async def delete_many(api, ids):
+    await api.delete_tasks(ids[:2], chunk_size=100)
+
+
+WRITES = [create, update, delete, create_many, update_many, delete_many]
+
+
+async def reads(api, ids) -> tuple:
+    rows, total = await api.query_tasks_with_total(sort=["username"], limit=10)
+    task = await api.get_task(ids[0]) if ids[0] in [row["id"] for row in rows] else None
+    return (
+        [(row["id"], row["status"]) for row in rows],
+        total,
+        await api.count_tasks(status=True),
+        task and task.status,
+    )
+
+
+async def reads_after_write(tmp_path, write) -> None:
+    db = await task_db(tmp_path / "tasks.db")
+    api = CachedDatabaseAPI(db, MemoryCacheBackend(1 << 20), ttl=60)
+    tasks = await db.create_tasks([new_task(i) for i in range(3)], chunk_size=100)
+    ids = [task.id for task in tasks]
+    await reads(api, ids)
+    version = await api.version()
+    await write(api, ids)
+    assert await api.version() == version + 1
+    # Every cached read now answers as the database does
+    assert await reads(api, ids) == await reads(db, ids)
+    await db.close()
+
+
+@pytest.mark.parametrize("write", WRITES, ids=[write.__name__ for write in WRITES])
+def test_writes_invalidate_cached_reads(tmp_path, write):
+    asyncio.run(reads_after_write(tmp_path, write))
+
+
+# --- Replicas ---
+
+async def lagging_replica_api(tmp_path, primary_window: float) -> CachedDatabaseAPI:
+    """A cached API whose one replica has the schema but never receives a write."""
+    primary = await task_db(tmp_path / "primary.db")
+    replica = await task_db(tmp_path / "replica.db")
+    primary.replicas = ReplicaSet([replica.engine], retry_after=60)
+    backend = MemoryCacheBackend(1 << 20)
+    return CachedDatabaseAPI(primary, backend, ttl=60, primary_window=primary_window)
+
+
+async def fills_after_write(tmp_path) -> None:
+    api = await lagging_replica_api(tmp_path, primary_window=0.5)
+    task = await api.create_task(new_task(1))
+    # Inside the window entries are filled from the primary, which has the write
+    assert await api.count_tasks() == 1
+    assert [row["id"] for row in await api.query_tasks(limit=10)] == [task.id]
+    assert (await api.get_task(task.id)).id == task.id
+    time.sleep(0.6)
+    # Past it fills go back to the replica; what was cached inside the window stays correct
+    assert await api.count_tasks() == 1
+    assert await api.count_tasks(status=False) == 0
+    await api.db.close()
+
+
+def test_fills_read_the_primary_right_after_a_write(tmp_path):
+    asyncio.run(fills_after_write(tmp_path))
+
+
+# --- Backend failures ---
+
+class FlakyBackend(MemoryCacheBackend):
+    """Memory backend that fails every call while `down`, as Redis does when unreachable."""
+
+    down = False
+
+    def __getattribute__(self, name):
+        calls = ("get", "set", "delete", "get_counter", "incr")
+        if name in calls and object.__getattribute__(self, "down"):
+            raise ConnectionError("cache unreachable")
+        return object.__getattribute__(self, name)
+
+
+async def reads_without_backend(tmp_path) -> None:
+    db = await task_db(tmp_path / "tasks.db")
+    backend = FlakyBackend(1 << 20)
+    api = CachedDatabaseAPI(db, backend, ttl=60)
+    task = await api.create_task(new_task(1))
+    backend.down = True
+    # Reads and writes go on against the database; no version, so no ETag
+    assert await api.version_tag() is None
+    other = await api.create_task(new_task(2))
+    await api.update_task(task.id, status=True)
+    assert await api.count_tasks() == 2
+    assert (await api.get_task(task.id)).status is True
+    assert len(await api.query_tasks(limit=10)) == 2
+    rows, total = await api.query_tasks_with_total(limit=10)
+    assert (len(rows), total) == (2, 2)
+    backend.down = False
+    await api.delete_task(other.id)
+    assert await api.count_tasks() == 1
+    assert await api.version_tag() is not None
+    await db.close()
+
+
+def test_reads_fall_back_to_database_while_backend_is_down(tmp_path):
+    asyncio.run(reads_without_backend(tmp_path))
@@ -0,0 +1,45 @@
+"""
+`import main` in a fresh interpreter with no environment: it must succeed without loading
+settings, and stay within the import budget. benchmarks/cold_start.py measures the whole
+worker start.
+"""
+import json
+import os
+import subprocess
+import sys
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The median import on 1 CPU is ~1 s, almost all of it fastapi and sqlalchemy
+IMPORT_BUDGET_SECONDS = 1.5
+
+IMPORT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+from app.config import get_settings
+print(json.dumps({"seconds": seconds, "settings_loaded": get_settings.cache_info().currsize}))
+"""
+
+
+def import_main(cwd) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        env={"PYTHONPATH": BACKEND_DIR},
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_main_without_environment(tmp_path):
+    runs = [import_main(tmp_path) for _ in range(3)]
+    assert all(run["settings_loaded"] == 0 for run in runs)
+    # Nothing is written on import, e.g. no log file
+    assert list(tmp_path.iterdir()) == []
+    # Best of three, so one slow run on a busy machine does not fail the check
+    assert min(run["seconds"] for run in runs) < IMPORT_BUDGET_SECONDS
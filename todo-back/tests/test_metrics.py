@@ -0,0 +1,10 @@
+from app.metrics import _row_count
+
+
+def test_row_count():
+    assert _row_count(None) == 0
+    assert _row_count([{"id": "a"}, {"id": "b"}]) == 2
+    # query_tasks_with_total: two rows read, whatever the total
+    assert _row_count(([{"id": "a"}, {"id": "b"}], 1000)) == 2
+    assert _row_count(([], 0)) == 0
+    assert _row_count(5) == 1
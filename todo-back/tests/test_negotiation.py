@@ -0,0 +1,28 @@
+from app.compression import ENCODINGS, choose_encoding
+from app.responses import COLUMNAR, JSON, response_format
+from app.utils import parse_qvalues
+
+
+def test_parse_qvalues():
+    assert parse_qvalues("GZIP;q=0.5, br;Q=0, *;q=x, identity") == {
+        "gzip": 0.5, "br": 0.0, "*": 0.0, "identity": 1.0
+    }
+    assert parse_qvalues(None) == {} == parse_qvalues(" , ")
+
+
+def test_encoding_ratings():
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*") == ENCODINGS[0]
+    assert choose_encoding("*, gzip;q=0") == ("br" if "br" in ENCODINGS else None)
+    assert choose_encoding("identity") is None
+
+
+def test_media_type_ratings():
+    assert response_format(None) == JSON
+    assert response_format("*/*") == JSON
+    assert response_format(f"{COLUMNAR}, */*;q=0.5") == COLUMNAR
+    # Excluded explicitly, the wildcard picks the next format; nothing acceptable falls back to JSON
+    assert response_format(f"{JSON};q=0, application/*") == COLUMNAR
+    assert response_format(f"{COLUMNAR};q=0") == JSON
+    assert response_format("text/html") == JSON
@@ -0,0 +1,53 @@
+"""
+The per-status counters that /tasks/length and page totals read must match COUNT(*) after
+any mix of single and bulk writes, including ids that are missing or repeated.
+"""
+from sqlalchemy import func, select
+from sqlmodel import Session, SQLModel
+
+from app.config import Settings
+from app.database import DatabaseAPI, create_db_engine
+from app.migrations import run_migrations
+from app.models import Task, TaskCount
+
+
+def counters(db: DatabaseAPI) -> dict:
+    with Session(db.engine) as session:
+        statement = select(Task.status, func.count()).group_by(Task.status)
+        counted = dict(session.exec(statement).all())
+        kept = dict(session.exec(select(TaskCount.status, TaskCount.count)).all())
+    return {status: (kept.get(status, 0), counted.get(status, 0)) for status in (False, True)}
+
+
+def new_task(number: int) -> Task:
+    return Task(
+        username=f"user{number}",
+        email=f"user{number}@example.com",
+        text=f"task {number}",
+        status=number % 3 == 0,
+    )
+
+
+def test_counters_match_count_after_mixed_writes(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path}/tasks.db", Settings.model_construct())
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    db = DatabaseAPI(engine=engine)
+
+    ids = [task.id for task in db.create_tasks([new_task(i) for i in range(30)], chunk_size=7)]
+    db.create_task(new_task(30))
+    # Flips both ways, unchanged statuses, other fields only, and an id that doesn't exist
+    updates = {task_id: {"status": i % 2 == 0} for i, task_id in enumerate(ids[:12])}
+    updates[ids[12]] = {"text": "edited"}
+    updates["missing"] = {"status": True}
+    db.update_tasks(updates, chunk_size=5)
+    db.update_task(ids[13], status=not db.get_task(ids[13]).status)
+    # Repeated ids, in one chunk and across chunks, and a missing one
+    deleted = db.delete_tasks([ids[0], ids[0], ids[1], "missing", ids[1], ids[2]], chunk_size=2)
+    assert sorted(deleted) == sorted(ids[:3])
+    db.delete_task(ids[3])
+    assert db.delete_tasks([ids[0], ids[3]], chunk_size=10) == []
+
+    assert all(kept == counted for kept, counted in counters(db).values()), counters(db)
+    assert db.count_tasks() == 31 - 4
+    db.close()
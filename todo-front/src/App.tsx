@@ -14,7 +14,7 @@ import { Logout } from '@mui/icons-material';
 import TaskList from './components/TaskList';
 import CreateTaskForm from './components/CreateTaskForm';
 import AdminLogin from './components/AdminLogin';
-import { AuthProvider, useAuth, TaskProvider, useTask, UIProvider, useUI } from './contexts';
+import { AuthProvider, useAuth, TaskProvider, UIProvider, useUI } from './contexts';
 
 const theme = createTheme({
   palette: {
@@ -30,7 +30,6 @@ const theme = createTheme({
 const AppContent: React.FC = () => {
   const { isAdmin, logout, loading } = useAuth();
   const { showLoginModal, openLoginModal } = useUI();
-  const { refreshKey } = useTask();
 
   if (loading) {
     return null; 
@@ -73,7 +72,7 @@ const AppContent: React.FC = () => {
               <CreateTaskForm />
             </Box>
             <Box sx={{ flex: 1 }}>
-              <TaskList key={refreshKey} />
+              <TaskList />
             </Box>
           </Box>
         )}
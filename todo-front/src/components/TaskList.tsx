@@ -17,7 +17,7 @@ import TaskCard from './TaskCard';
 import LoadingSpinner from './LoadingSpinner';
 import ErrorMessage from './ErrorMessage';
 import InfoMessage from './InfoMessage';
-import { useAuth } from '../contexts';
+import { useAuth, useTask } from '../contexts';
 
 type SortOption = 'username' | 'email' | 'status' | 'none';
 type SortDirection = 'asc' | 'desc';
@@ -29,40 +29,37 @@ const TaskList: React.FC = () => {
   const [page, setPage] = useState(1);
   const [sortBy, setSortBy] = useState<SortOption>('none');
   const [sortDirection, setSortDirection] = useState<SortDirection>('asc');
-  const [totalPages, setTotalPages] = useState(1);
 
   const { isAdmin } = useAuth();
+  const { totalTasks, setTotalTasks, refreshKey } = useTask();
 
   const limit = 3;
   const offset = (page - 1) * limit;
+  const totalPages = Math.ceil((totalTasks ?? 0) / limit) || 1;
 
   const fetchTasks = async () => {
     try {
       setLoading(true);
       setError(null);
       
-      const totalTasks = await api.getTasksCount();
-      setTotalPages(Math.ceil(totalTasks / limit) || 1);
-      
-      let fetchedTasks: Task[];
-      
       const reverse = sortDirection === 'desc';
-      
-      switch (sortBy) {
-        case 'username':
-          fetchedTasks = await api.getTasksSortedByUsername(offset, limit, reverse);
-          break;
-        case 'email':
-          fetchedTasks = await api.getTasksSortedByEmail(offset, limit, reverse);
-          break;
-        case 'status':
-          fetchedTasks = await api.getTasksSortedByStatus(offset, limit, reverse);
-          break;
-        default:
-          fetchedTasks = await api.getTasksPaginated(offset, limit);
+      // Страница и общее количество задач приходят одним ответом
+      const result = await api.getTasksPage(
+        offset,
+        limit,
+        sortBy === 'none' ? undefined : sortBy,
+        reverse
+      );
+
+      const total = result.total ?? 0;
+      setTotalTasks(total);
+      setTasks(result.items);
+
+      // Задачи могли удалить, пока была открыта последняя страница
+      const lastPage = Math.ceil(total / limit) || 1;
+      if (page > lastPage) {
+        setPage(lastPage);
       }
-      
-      setTasks(fetchedTasks);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Ошибка при загрузке задач');
     } finally {
@@ -70,9 +67,10 @@ const TaskList: React.FC = () => {
     }
   };
 
+  // refreshKey меняется после изменений задач: своих или пришедших из ленты событий
   useEffect(() => {
     fetchTasks();
-  }, [page, sortBy, sortDirection]);
+  }, [page, sortBy, sortDirection, refreshKey]);
 
   const handlePageChange = (_: any, value: number) => {
     setPage(value);
@@ -88,7 +86,8 @@ const TaskList: React.FC = () => {
     setPage(1);
   };
 
-  if (loading) {
+  // Перечитывание по событиям ленты не прячет уже показанный список за спиннером
+  if (loading && tasks.length === 0) {
     return <LoadingSpinner />;
   }
 
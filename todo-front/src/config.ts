@@ -2,6 +2,8 @@ export const API_CONFIG = {
     BASE_URL: import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000/api',
     TIMEOUT: 10000, // 10 секунд
     RETRY_ATTEMPTS: 3,
+    // Списки задач в колоночном формате: имена полей один раз на страницу, а не в каждой задаче
+    COLUMNAR_LISTINGS: import.meta.env.VITE_API_COLUMNAR_LISTINGS === 'true',
 } as const;
 
 export const STORAGE_KEYS = {
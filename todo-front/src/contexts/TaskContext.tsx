@@ -1,8 +1,15 @@
-import React, { createContext, useContext, useState, useCallback, type ReactNode } from 'react';
+import React, { createContext, useContext, useState, useCallback, useEffect, useRef, type ReactNode } from 'react';
+import { api } from '../services';
+
+// Пачка событий (например, массовое создание) перечитывает список один раз
+const FEED_REFRESH_DELAY_MS = 300;
 
 interface TaskContextType {
   refreshTasks: () => void;
   refreshKey: number;
+  // Общее количество задач из последней загруженной страницы; null, пока страница не загружена
+  totalTasks: number | null;
+  setTotalTasks: (total: number) => void;
 }
 
 const TaskContext = createContext<TaskContextType | undefined>(undefined);
@@ -21,14 +28,46 @@ interface TaskProviderProps {
 
 export const TaskProvider: React.FC<TaskProviderProps> = ({ children }) => {
   const [refreshKey, setRefreshKey] = useState(0);
+  const [totalTasks, setTotalTasks] = useState<number | null>(null);
+  // Отложенное перечитывание по событиям ленты; null, если событий не было
+  const feedTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+
+  const cancelFeedRefresh = useCallback(() => {
+    if (feedTimerRef.current !== null) {
+      clearTimeout(feedTimerRef.current);
+      feedTimerRef.current = null;
+    }
+  }, []);
+
+  useEffect(() => {
+    const unsubscribe = api.subscribeToTaskEvents(() => {
+      if (feedTimerRef.current === null) {
+        feedTimerRef.current = setTimeout(() => {
+          feedTimerRef.current = null;
+          setRefreshKey(prev => prev + 1);
+        }, FEED_REFRESH_DELAY_MS);
+      }
+    });
 
+    return () => {
+      unsubscribe();
+      cancelFeedRefresh();
+    };
+  }, [cancelFeedRefresh]);
+
+  // После своего изменения список перечитывается сразу, даже при подключённой ленте:
+  // лента одного воркера не видит записей, обработанных другими. Уже пришедшие события
+  // (обычно и событие этого же изменения) покрываются этим чтением, их перечитывание отменяется
   const refreshTasks = useCallback(() => {
+    cancelFeedRefresh();
     setRefreshKey(prev => prev + 1);
-  }, []);
+  }, [cancelFeedRefresh]);
 
   const value = {
     refreshTasks,
-    refreshKey
+    refreshKey,
+    totalTasks,
+    setTotalTasks
   };
 
   return (
@@ -36,4 +75,4 @@ export const TaskProvider: React.FC<TaskProviderProps> = ({ children }) => {
       {children}
     </TaskContext.Provider>
   );
-}; 
\ No newline at end of file
+};
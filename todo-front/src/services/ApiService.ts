@@ -1,6 +1,10 @@
 import type {
     TaskCreate,
     Task,
+    TaskPage,
+    TaskSortField,
+    TaskEvent,
+    TaskEventType,
     Admin,
     TokenResponse,
     ApiErrorDetails
@@ -14,8 +18,32 @@ import {
 } from '../errors';
 import { API_CONFIG, STORAGE_KEYS, HTTP_STATUS, PAGINATION } from '../config';
 
+// Сервер с репликами чтения присылает этот заголовок после записи; пока он возвращается
+// в запросах, чтения идут в основную базу и видят собственные изменения
+const PRIMARY_UNTIL_HEADER = 'X-Primary-Until';
+
+const COLUMNAR_TYPE = 'application/vnd.todo.columnar+json';
+
+type TaskColumns = Partial<{ [K in keyof Task]: Task[K][] }>;
+
+// Колоночный ответ {поле: [значения]} обратно в массив задач
+function fromColumns(columns: TaskColumns): Task[] {
+    const names = Object.keys(columns) as (keyof Task)[];
+    const count = names.length ? columns[names[0]]!.length : 0;
+    const tasks: Task[] = [];
+    for (let i = 0; i < count; i++) {
+        const task: Record<string, unknown> = {};
+        names.forEach(name => {
+            task[name] = columns[name]![i];
+        });
+        tasks.push(task as unknown as Task);
+    }
+    return tasks;
+}
+
 export class ApiService {
     private static instance: ApiService;
+    private primaryUntil: string | null = null;
 
     private constructor() {}
 
@@ -78,8 +106,17 @@ export class ApiService {
             };
         }
 
+        // Истёкший заголовок не отправляем: лишний заголовок делает каждый запрос preflight
+        if (this.primaryUntil && Number(this.primaryUntil) * 1000 > Date.now()) {
+            config.headers = {
+                ...config.headers,
+                [PRIMARY_UNTIL_HEADER]: this.primaryUntil,
+            };
+        }
+
         try {
             const response = await fetch(url, config);
+            this.primaryUntil = response.headers.get(PRIMARY_UNTIL_HEADER) ?? this.primaryUntil;
             return await this.onResponse<T>(response);
         } catch (error) {
             if (error instanceof ApiError) {
@@ -91,6 +128,26 @@ export class ApiService {
         }
     }
 
+    // Списки задач: с API_CONFIG.COLUMNAR_LISTINGS запрашиваются в колоночном формате
+    private async requestTasks(endpoint: string): Promise<Task[]> {
+        if (!API_CONFIG.COLUMNAR_LISTINGS) {
+            return this.request<Task[]>(endpoint);
+        }
+        const columns = await this.request<TaskColumns>(endpoint, { headers: { Accept: COLUMNAR_TYPE } });
+        return fromColumns(columns);
+    }
+
+    private async requestTaskPage(endpoint: string): Promise<TaskPage> {
+        if (!API_CONFIG.COLUMNAR_LISTINGS) {
+            return this.request<TaskPage>(endpoint);
+        }
+        const page = await this.request<Omit<TaskPage, 'items'> & { items: TaskColumns }>(
+            endpoint,
+            { headers: { Accept: COLUMNAR_TYPE } }
+        );
+        return { ...page, items: fromColumns(page.items) };
+    }
+
     // Методы для работы с задачами
     public async createTask(task: TaskCreate): Promise<Task> {
         return this.request<Task>('/task/', {
@@ -121,19 +178,50 @@ export class ApiService {
     }
 
     public async getTasksPaginated(offset: number = PAGINATION.DEFAULT_OFFSET, limit: number = PAGINATION.DEFAULT_LIMIT): Promise<Task[]> {
-        return this.request<Task[]>(`/tasks/?offset=${offset}&limit=${limit}`);
+        return this.requestTasks(`/tasks/?offset=${offset}&limit=${limit}`);
     }
 
     public async getTasksSortedByUsername(offset: number = PAGINATION.DEFAULT_OFFSET, limit: number = PAGINATION.DEFAULT_LIMIT, reverse: boolean = false): Promise<Task[]> {
-        return this.request<Task[]>(`/tasks/sorted/username?offset=${offset}&limit=${limit}&reverse=${reverse}`);
+        return this.requestTasks(`/tasks/sorted/username?offset=${offset}&limit=${limit}&reverse=${reverse}`);
     }
 
     public async getTasksSortedByEmail(offset: number = PAGINATION.DEFAULT_OFFSET, limit: number = PAGINATION.DEFAULT_LIMIT, reverse: boolean = false): Promise<Task[]> {
-        return this.request<Task[]>(`/tasks/sorted/email?offset=${offset}&limit=${limit}&reverse=${reverse}`);
+        return this.requestTasks(`/tasks/sorted/email?offset=${offset}&limit=${limit}&reverse=${reverse}`);
     }
 
     public async getTasksSortedByStatus(offset: number = PAGINATION.DEFAULT_OFFSET, limit: number = PAGINATION.DEFAULT_LIMIT, reverse: boolean = false): Promise<Task[]> {
-        return this.request<Task[]>(`/tasks/sorted/status?offset=${offset}&limit=${limit}&reverse=${reverse}`);
+        return this.requestTasks(`/tasks/sorted/status?offset=${offset}&limit=${limit}&reverse=${reverse}`);
+    }
+
+    // Страница задач вместе с общим количеством за один запрос (вместо getTasksCount + страницы)
+    public async getTasksPage(
+        offset: number = PAGINATION.DEFAULT_OFFSET,
+        limit: number = PAGINATION.DEFAULT_LIMIT,
+        sortBy?: TaskSortField,
+        reverse: boolean = false
+    ): Promise<TaskPage> {
+        const params = `offset=${offset}&limit=${limit}&include_total=true`;
+        if (sortBy) {
+            return this.requestTaskPage(`/tasks/sorted/${sortBy}?${params}&reverse=${reverse}`);
+        }
+        return this.requestTaskPage(`/tasks/?${params}`);
+    }
+
+    // Подписка на ленту изменений задач (SSE). EventSource сам переподключается и передаёт
+    // Last-Event-ID, поэтому пропущенные за время обрыва события приходят после переподключения
+    public subscribeToTaskEvents(
+        onEvent: (event: TaskEvent) => void,
+        onConnectionChange?: (connected: boolean) => void
+    ): () => void {
+        const source = new EventSource(`${API_CONFIG.BASE_URL}/tasks/events`);
+        const types: TaskEventType[] = ['created', 'updated', 'deleted', 'reset'];
+        const listener = (message: MessageEvent) => onEvent(JSON.parse(message.data) as TaskEvent);
+
+        types.forEach(type => source.addEventListener(type, listener as EventListener));
+        source.onopen = () => onConnectionChange?.(true);
+        source.onerror = () => onConnectionChange?.(false);
+
+        return () => source.close();
     }
 
     public async getAllTasks(): Promise<Task[]> {
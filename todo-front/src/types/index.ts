@@ -7,6 +7,24 @@ export interface Task {
     edited_by_admin?: boolean;
 }
 
+export type TaskSortField = 'username' | 'email' | 'status';
+
+// Страница задач в конверте: total приходит при include_total=true
+export interface TaskPage {
+    items: Task[];
+    total?: number;
+    next_cursor?: string | null;
+}
+
+// Событие ленты изменений /tasks/events; reset — пропущенные события потеряны, список нужно перечитать
+export type TaskEventType = 'created' | 'updated' | 'deleted' | 'reset';
+
+export interface TaskEvent {
+    id: string;
+    type: TaskEventType;
+    task: Partial<Task> | null;
+}
+
 export interface TaskCreate {
     username: string;
     email: string;